@@ -1,7 +1,7 @@
 from typing import List, Dict, Any
-import feedparser
-import httpx
 from .base import RawDoc
+from app.ingestion.feeds import fetch_all_feeds
+from app.ingestion.feed_state import FeedPoll, feed_state
 from datetime import datetime
 import structlog
 
@@ -10,32 +10,45 @@ logger = structlog.get_logger()
 class NewsRSSAdapter:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        # responses of the last fetch, committed to the feed state by the caller once stored
+        self.polls: List[FeedPoll] = []
 
     async def fetch(self) -> List[RawDoc]:
         urls = self.config.get('urls') or []
         results = []
+        self.polls = []
 
-        for url in urls:
-            try:
-                logger.info('fetching_feed', feed=url)
-                feed = feedparser.parse(url)
-                for entry in feed.entries[:50]:
-                    published = None
-                    if entry.get('published_parsed'):
-                        published = datetime.fromtimestamp(
-                            int(datetime(*entry.published_parsed[:6]).timestamp())
-                        ).isoformat()
-
-                    raw = RawDoc(
-                        url=entry.get('link', ''),
-                        title=entry.get('title', '') or '',
-                        published=published,
-                        source=self.config.get('source_name') or url,
-                        content=None
-                    )
-                    results.append(raw)
-            except Exception as e:
-                logger.error('feed_error', feed=url, error=str(e))
+        feeds = await fetch_all_feeds(urls, timeout=self.config.get('timeout'), state=feed_state)
+
+        for result in feeds:
+            if not result.ok:
+                logger.error('feed_error', feed=result.url, error=result.error)
+                continue
+            if result.not_modified:
                 continue
+            emitted = result.entries[:50]
+            for entry in emitted:
+                published = None
+                if entry.get('published_parsed'):
+                    published = datetime.fromtimestamp(
+                        int(datetime(*entry.published_parsed[:6]).timestamp())
+                    ).isoformat()
+
+                raw = RawDoc(
+                    url=entry.get('link', ''),
+                    title=entry.get('title', '') or '',
+                    published=published,
+                    source=self.config.get('source_name') or result.url,
+                    content=None
+                )
+                results.append(raw)
+
+            self.polls.append(FeedPoll(
+                result.url,
+                emitted,
+                etag=result.etag,
+                last_modified=result.last_modified,
+                complete=len(emitted) == len(result.entries)
+            ))
 
         return results
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Request, Response, HTTPException, Depends
 from app.core.config import settings
-import redis
 import json
 from uuid import uuid4
 from typing import Optional
@@ -15,7 +14,16 @@ import re
 router = APIRouter()
 
 # Redis client (synchronous). For production consider using redis.asyncio.
-_redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Created on first use so importing the API does not build a client.
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
 
 # password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -25,7 +33,7 @@ def _get_session_data(session_id: str) -> Optional[dict]:
     if not session_id:
         return None
     key = f"session:{session_id}"
-    raw = _redis.get(key)
+    raw = _get_redis().get(key)
     if not raw:
         return None
     try:
@@ -97,7 +105,7 @@ async def login(request: Request, response: Response, db: Session = Depends(get_
 
     session_id = uuid4().hex
     key = f"session:{session_id}"
-    _redis.set(key, json.dumps(user_info), ex=int(settings.SESSION_EXPIRE_SECONDS) if hasattr(settings, 'SESSION_EXPIRE_SECONDS') else 86400)
+    _get_redis().set(key, json.dumps(user_info), ex=int(settings.SESSION_EXPIRE_SECONDS) if hasattr(settings, 'SESSION_EXPIRE_SECONDS') else 86400)
     response.set_cookie(key="session", value=session_id, httponly=True, path='/', max_age=int(settings.SESSION_EXPIRE_SECONDS) if hasattr(settings, 'SESSION_EXPIRE_SECONDS') else 86400)
     return {"status": "ok", "user": user_info}
 
@@ -133,6 +141,6 @@ async def get_me(request: Request):
 async def logout(request: Request, response: Response):
     sid = request.cookies.get("session")
     if sid:
-        _redis.delete(f"session:{sid}")
+        _get_redis().delete(f"session:{sid}")
     response.delete_cookie("session", path='/')
     return {"status": "ok"}
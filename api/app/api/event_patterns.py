@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict
+import asyncio
 import json
 from pathlib import Path
 import re
 
 from app.nlp.events import event_extractor
+from app.nlp.pattern_guard import check_patterns
 
 CONFIG_PATH = Path(__file__).parents[2] / "configs" / "event_patterns.json"
 
@@ -36,6 +38,12 @@ async def get_event_patterns():
     return _read_patterns()
 
 
+@router.get("/event-patterns/stats")
+async def get_event_pattern_stats():
+    """Per-pattern run, match and timing counters from the running extractor."""
+    return {"patterns": event_extractor.pattern_stats()}
+
+
 @router.put("/event-patterns")
 async def update_event_patterns(payload: Dict[str, list]):
     """Replace event extraction patterns and persist to disk."""
@@ -66,6 +74,15 @@ async def update_event_patterns(payload: Dict[str, list]):
         # return structured validation errors
         raise HTTPException(status_code=400, detail={"validation_errors": errors})
 
+    # benchmark against the sample corpus: a slow or backtracking pattern would stall ingestion
+    rejected = await asyncio.to_thread(check_patterns, [p for patterns in payload.values() for p in patterns])
+    if rejected:
+        for k, patterns in payload.items():
+            errs = [f"{p}: {rejected[p]}" for p in patterns if p in rejected]
+            if errs:
+                errors[k] = errs
+        raise HTTPException(status_code=400, detail={"validation_errors": errors})
+
     # all good -> persist and reload
     _write_patterns(payload)
     try:
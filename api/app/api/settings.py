@@ -4,11 +4,14 @@ from typing import Dict
 import json
 from pathlib import Path
 import re
+import structlog
 
 from app.services.fuse import signal_fuser
+from app.services.rescoring import signal_rescorer
 from app.api import auth as auth_api
 
 router = APIRouter()
+logger = structlog.get_logger()
 
 CONFIG_DIR = Path(__file__).resolve().parents[1] / 'configs'
 GLOBAL_CONFIG_PATH = CONFIG_DIR / 'fuser_settings.json'
@@ -78,7 +81,7 @@ def get_settings(request: Request):
 
 
 @router.put('/settings')
-def put_settings(request: Request, settings: SettingsModel):
+async def put_settings(request: Request, settings: SettingsModel):
     data = settings.dict()
     # basic sanity checks: weights sum maybe >0
     total = data['weights']['W_SRC'] + data['weights']['W_NOVEL'] + data['weights']['W_EVT'] + data['weights']['W_BUZZ']
@@ -105,4 +108,19 @@ def put_settings(request: Request, settings: SettingsModel):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return {'status': 'ok'}
+    if user.get('role') != 'admin':
+        return {'status': 'ok'}
+
+    # stored signals were scored with the old weights: rescore them in the background
+    try:
+        job_id = await signal_rescorer.start(data)
+    except Exception as e:
+        logger.warning("Could not start rescore job", error=str(e))
+        job_id = None
+    return {'status': 'ok', 'rescore_job_id': job_id}
+
+
+@router.get('/settings/rescore')
+def get_rescore_status():
+    """Progress of the newest signal rescoring job"""
+    return signal_rescorer.status() or {'status': 'none'}
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy import and_, tuple_
 from typing import Optional, List
 from datetime import datetime, date, timedelta
 from pydantic import BaseModel
 
 from app.core.deps import get_db_session
-from app.db.models import Ticker, Signal, SignalEvidence, Document, Price
+from app.db.models import Ticker, Signal, SignalEvidence, Document, DocumentTicker, Price
 
 router = APIRouter()
 
@@ -77,6 +77,47 @@ async def get_ticker_signals(
         "total": len(signal_list)
     }
 
+@router.get("/{symbol}/documents")
+async def get_ticker_documents(
+    symbol: str,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(50, ge=1),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Most recent documents mentioning a ticker, newest first. For the next page
+    pass `next_cursor` back as `before` / `before_id`; the document id breaks
+    ties between documents published at the same time.
+    """
+    
+    ticker = db.query(Ticker).filter(Ticker.symbol == symbol.upper()).first()
+    
+    if not ticker:
+        raise HTTPException(status_code=404, detail=f"Ticker {symbol} not found")
+    
+    # Range scan of the (ticker_id, published_at DESC, document_id DESC) index
+    query = db.query(Document.id, Document.title, Document.source, Document.url, DocumentTicker.published_at).join(
+        DocumentTicker, DocumentTicker.document_id == Document.id
+    ).filter(DocumentTicker.ticker_id == ticker.id)
+    if before and before_id is not None:
+        query = query.filter(tuple_(DocumentTicker.published_at, DocumentTicker.document_id) < tuple_(before, before_id))
+    elif before:
+        query = query.filter(DocumentTicker.published_at < before)
+    rows = query.order_by(
+        DocumentTicker.published_at.desc(), DocumentTicker.document_id.desc()
+    ).limit(min(limit, 200)).all()
+    
+    return {
+        "ticker": symbol.upper(),
+        "documents": [
+            {"id": r.id, "title": r.title, "source": r.source, "url": r.url, "published_at": r.published_at}
+            for r in rows
+        ],
+        "total": len(rows),
+        "next_cursor": {"before": rows[-1].published_at, "before_id": rows[-1].id} if rows else None
+    }
+
 @router.get("/{symbol}/prices")
 async def get_ticker_prices(
     symbol: str,
@@ -167,6 +208,13 @@ async def get_ticker_info(
         )
     ).count()
     
+    recent_documents = db.query(DocumentTicker).filter(
+        and_(
+            DocumentTicker.ticker_id == ticker.id,
+            DocumentTicker.published_at >= datetime.now() - timedelta(days=7)
+        )
+    ).count()
+    
     return {
         "id": ticker.id,
         "symbol": ticker.symbol,
@@ -179,5 +227,6 @@ async def get_ticker_info(
             "industry": ticker.company.industry,
             "market_cap": float(ticker.company.market_cap) if ticker.company.market_cap else None
         } if ticker.company else None,
-        "recent_signals": recent_signals
+        "recent_signals": recent_signals,
+        "recent_documents": recent_documents
     }
\ No newline at end of file
@@ -39,6 +39,10 @@ class Calibrator:
         
         return calibrated
     
+    def transform_array(self, raw_scores: np.ndarray) -> np.ndarray:
+        """Vectorized transform; element for element equal to transform"""
+        return np.clip(raw_scores, 0.0, 1.0)
+    
     def fit_transform(self, raw_scores: List[float], true_labels: List[bool]) -> List[float]:
         """Fit and transform in one step"""
         self.fit(raw_scores, true_labels)
@@ -14,6 +14,102 @@ class Settings(BaseSettings):
     API_BASE_URL: str = "http://api:8000"
     WEB_PUBLIC_API: str = "http://localhost:8000"
     SESSION_EXPIRE_SECONDS: int = 86400
+    SNAPSHOT_DIR: str = "/data/snapshots"
+
+    # Feed fetching
+    FEED_FETCH_TIMEOUT: float = 10.0
+    FEED_FETCH_CONCURRENCY: int = 16
+    FEED_STATE_PATH: str = "data/feed_state.json"
+    FEED_SEEN_MAX: int = 2000
+
+    # Article body fetching
+    ARTICLE_FETCH_TIMEOUT: float = 10.0
+    ARTICLE_FETCH_CONCURRENCY: int = 32
+    ARTICLE_FETCH_PER_HOST: int = 4
+    ARTICLE_FETCH_HTTP2: bool = False
+    ARTICLE_FETCH_KEEPALIVE_EXPIRY: float = 30.0
+
+    # HTML-to-text extraction (process pool; 0 workers = one per CPU)
+    EXTRACT_WORKERS: int = 0
+    EXTRACT_TIMEOUT: float = 15.0
+    EXTRACT_MAX_HTML_CHARS: int = 5_000_000
+
+    # Pre-download URL dedup (time-windowed Bloom filter)
+    URL_DEDUP_PATH: str = "data/url_index.bin"
+    URL_DEDUP_WINDOW_HOURS: float = 72.0
+    URL_DEDUP_CAPACITY: int = 100_000
+    URL_DEDUP_ERROR_RATE: float = 0.001
+
+    # Near-duplicate detection (MinHash-LSH over a sliding window)
+    NEAR_DUP_INDEX_PATH: str = "data/near_dup_index.pkl"
+    NEAR_DUP_WINDOW_HOURS: float = 72.0
+    NEAR_DUP_THRESHOLD: float = 0.9
+    NEAR_DUP_NUM_PERM: int = 128
+
+    # NLP batching
+    NLP_BATCH_SIZE: int = 16
+    SPACY_BATCH_SIZE: int = 32
+    SPACY_NER_ONLY: bool = True
+    SPACY_MAX_CHARS: int = 100_000
+    SPACY_MAX_TOKENS: int = 0  # 0 = no token budget
+    SPACY_N_PROCESS: int = 1
+    SPACY_MULTIPROCESS_MIN_DOCS: int = 256
+    FINBERT_BATCH_SIZE: int = 16
+    EMBED_BATCH_SIZE: int = 32
+    
+    NLP_WARMUP_PARALLEL: bool = True
+    
+    # Inference backends: "torch" or "onnx" (ONNX Runtime), per model
+    FINBERT_BACKEND: str = "torch"
+    EMBED_BACKEND: str = "torch"
+    ONNX_CACHE_DIR: str = "data/onnx"
+    ONNX_QUANTIZE: bool = True
+    ONNX_INTRA_OP_THREADS: int = 0  # 0 = ONNX Runtime default
+    ONNX_INTER_OP_THREADS: int = 0
+    ONNX_PARITY_CHECK: bool = True
+    ONNX_PARITY_ATOL: float = 0.05
+    ONNX_PARITY_MIN_COSINE: float = 0.98
+    
+    # Embedding storage: "float32" (vector), "halfvec" (half precision) or "int8" (scalar quantized)
+    EMBEDDING_STORAGE: str = "halfvec"
+    VECTOR_EF_SEARCH: int = 100  # HNSW search breadth (hnsw.ef_search)
+    NOVELTY_TOP_K: int = 20  # nearest neighbours novelty is derived from
+    NOVELTY_INDEX_ENABLED: bool = True  # in-process per-ticker window; assumes a single ingest writer
+    NOVELTY_INDEX_MAX_BYTES: int = 512 * 1024 ** 2
+    NOVELTY_INDEX_MAX_ARTICLE_AGE_DAYS: int = 7  # older articles are scored from the database
+    
+    # Buzz: z-score of the mentions in the last window against the preceding windows
+    BUZZ_WINDOW_HOURS: int = 24
+    BUZZ_HISTORY_DAYS: int = 30
+    BUZZ_MIN_STD: float = 1.0  # floor on the historical std, so sparse tickers do not explode
+    
+    # NLP result cache
+    NLP_CACHE_ENABLED: bool = True
+    NLP_CACHE_PATH: str = "data/nlp_cache.sqlite"
+    NLP_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    NLP_CACHE_REDIS: bool = False
+    NLP_CACHE_REDIS_TTL: int = 30 * 86400
+    
+    # Streaming ingest pipeline
+    INGEST_FETCH_WORKERS: int = 16
+    INGEST_NLP_WORKERS: int = 1
+    INGEST_STORE_WORKERS: int = 1
+    INGEST_STORE_BATCH_SIZE: int = 16
+    INGEST_QUEUE_SIZE: int = 64
+    INGEST_BATCH_LINGER: float = 0.5
+    INGEST_PROGRESS_INTERVAL: float = 5.0
+    
+    # Ticker / entity resolution cache
+    RESOLVER_CACHE_SIZE: int = 100_000
+    
+    # Ticker recognition
+    TICKER_MASTER_PATH: Optional[str] = None  # CSV with symbol,name,aliases (| separated)
+    TICKER_BARE_MIN_LEN: int = 3
+    
+    # Event pattern guard (PUT /event-patterns benchmarks candidates before accepting them)
+    EVENT_PATTERN_BUDGET_MS: float = 50.0  # per pattern over the whole sample corpus
+    EVENT_PATTERN_MAX_SCALING: float = 3.0  # time ratio allowed when the input doubles
+    EVENT_PATTERN_BENCH_TIMEOUT: float = 5.0  # seconds per pattern before it is killed
     
     # Confidence weights
     # Should have a interface to adjust these dynamically in the future
@@ -25,6 +121,10 @@ class Settings(BaseSettings):
     K_UNC: float = 0.15
     TAU: float = 86400.0
     
+    # Rescoring stored signals after the weights change (PUT /settings by an admin)
+    RESCORE_CHUNK_SIZE: int = 1000
+    RESCORE_DUTY_CYCLE: float = 0.5  # fraction of wall time the job works; it sleeps the rest
+    
     # Thresholds
     # Should have a interface to adjust these dynamically in the future
     MIN_CONFIDENCE_DEFAULT: float = 0.6
@@ -0,0 +1,23 @@
+"""Index documents.url for pre-download dedup lookups
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_documents_url'), 'documents', ['url'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_documents_url'), table_name='documents')
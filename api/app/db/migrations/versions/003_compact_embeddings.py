@@ -0,0 +1,43 @@
+"""Compact embedding storage (halfvec / int8)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-03-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.embedding_store import compact_embeddings
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # halfvec needs pgvector >= 0.7
+    op.execute('ALTER EXTENSION vector UPDATE')
+    op.add_column('documents', sa.Column('embedding_half', HALFVEC(768), nullable=True))
+    op.add_column('documents', sa.Column('embedding_int8', sa.LargeBinary(), nullable=True))
+
+    # Move existing rows to the configured storage mode
+    if settings.EMBEDDING_STORAGE == 'halfvec':
+        op.execute(
+            'UPDATE documents SET embedding_half = embedding::halfvec(768), embedding = NULL '
+            'WHERE embedding IS NOT NULL'
+        )
+    elif settings.EMBEDDING_STORAGE == 'int8':
+        compact_embeddings(Session(bind=op.get_bind()), 'int8')
+    # embedding_half gets its HNSW index in 004
+
+
+def downgrade() -> None:
+    compact_embeddings(Session(bind=op.get_bind()), 'float32')
+    op.drop_column('documents', 'embedding_int8')
+    op.drop_column('documents', 'embedding_half')
@@ -0,0 +1,35 @@
+"""Replace ivfflat embedding indexes with HNSW
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-03-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # HNSW needs no training data and keeps recall as rows are added; ivfflat lists
+    # were fixed when the (then empty) table was indexed
+    op.execute('DROP INDEX IF EXISTS idx_documents_embedding_ivfflat')
+    op.execute(
+        'CREATE INDEX idx_documents_embedding_hnsw ON documents '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)'
+    )
+    op.execute(
+        'CREATE INDEX idx_documents_embedding_half_hnsw ON documents '
+        'USING hnsw (embedding_half halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS idx_documents_embedding_half_hnsw')
+    op.execute('DROP INDEX IF EXISTS idx_documents_embedding_hnsw')
+    op.execute('CREATE INDEX idx_documents_embedding_ivfflat ON documents USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)')
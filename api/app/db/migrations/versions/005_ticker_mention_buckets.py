@@ -0,0 +1,42 @@
+"""Hourly ticker mention buckets for buzz
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-04-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ticker_mention_buckets',
+        sa.Column('ticker_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('mentions', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['ticker_id'], ['tickers.id'], ),
+        sa.PrimaryKeyConstraint('ticker_id', 'bucket_start')
+    )
+
+    # Backfill from stored documents: one count per document and ticker per hour
+    op.execute("""
+        INSERT INTO ticker_mention_buckets (ticker_id, bucket_start, mentions)
+        SELECT t.id, date_trunc('hour', d.published_at), count(*)
+        FROM documents d
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT json_array_elements_text(d.meta -> 'tickers') AS symbol
+        ) s
+        JOIN tickers t ON t.symbol = s.symbol
+        WHERE json_typeof(d.meta -> 'tickers') = 'array'
+        GROUP BY t.id, date_trunc('hour', d.published_at)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('ticker_mention_buckets')
@@ -0,0 +1,42 @@
+"""Document <-> ticker junction table
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-04-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_tickers',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('ticker_id', sa.Integer(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['ticker_id'], ['tickers.id'], ),
+        sa.PrimaryKeyConstraint('document_id', 'ticker_id')
+    )
+
+    # Backfill from the JSON ticker lists; symbols without a tickers row are skipped
+    op.execute("""
+        INSERT INTO document_tickers (document_id, ticker_id, published_at)
+        SELECT DISTINCT d.id, t.id, d.published_at
+        FROM documents d
+        CROSS JOIN LATERAL json_array_elements_text(d.meta -> 'tickers') AS s(symbol)
+        JOIN tickers t ON t.symbol = s.symbol
+        WHERE json_typeof(d.meta -> 'tickers') = 'array'
+    """)
+    op.execute('CREATE INDEX idx_document_tickers_ticker_published ON document_tickers (ticker_id, published_at DESC, document_id DESC)')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_document_tickers_ticker_published', table_name='document_tickers')
+    op.drop_table('document_tickers')
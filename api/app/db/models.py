@@ -1,10 +1,10 @@
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Text, JSON,
-    ForeignKey, UniqueConstraint, Index, Boolean, DECIMAL
+    ForeignKey, UniqueConstraint, Index, Boolean, DECIMAL, LargeBinary
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from datetime import datetime
 
 from app.db.base import Base
@@ -41,7 +41,7 @@ class Document(Base):
     
     id = Column(Integer, primary_key=True)
     source = Column(String(100), nullable=False, index=True)
-    url = Column(Text, nullable=False)
+    url = Column(Text, nullable=False, index=True)
     title = Column(Text)
     published_at = Column(DateTime, nullable=False, index=True)
     fetched_at = Column(DateTime, server_default=func.now())
@@ -49,7 +49,10 @@ class Document(Base):
     html_snapshot_path = Column(Text)
     content_hash = Column(String(64), unique=True, nullable=False, index=True)
     lang = Column(String(10), default="en")
+    # One of the three is set, per EMBEDDING_STORAGE (see app.services.embedding_store)
     embedding = Column(Vector(768))
+    embedding_half = Column(HALFVEC(768))
+    embedding_int8 = Column(LargeBinary)
     sentiment = Column(String(20))
     sentiment_score = Column(Float)
     meta = Column(JSON, default={})
@@ -62,6 +65,18 @@ class Document(Base):
         Index('idx_documents_published_desc', published_at.desc()),
     )
 
+class DocumentTicker(Base):
+    """Tickers a document mentions; published_at is copied so per-ticker time ranges are index scans"""
+    __tablename__ = "document_tickers"
+    
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    ticker_id = Column(Integer, ForeignKey("tickers.id"), primary_key=True)
+    published_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_document_tickers_ticker_published', ticker_id, published_at.desc(), document_id.desc()),
+    )
+
 class Entity(Base):
     __tablename__ = "entities"
     
@@ -161,6 +176,14 @@ class Price(Base):
         Index('idx_prices_ticker_ts', ticker_id, ts.desc()),
     )
 
+class TickerMentionBucket(Base):
+    """Documents mentioning a ticker per hour of publication, maintained on ingest"""
+    __tablename__ = "ticker_mention_buckets"
+    
+    ticker_id = Column(Integer, ForeignKey("tickers.id"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    mentions = Column(Integer, nullable=False, default=0)
+
 class Backtest(Base):
     __tablename__ = "backtests"
     
@@ -170,6 +193,25 @@ class Backtest(Base):
     result = Column(JSON)
     created_at = Column(DateTime, server_default=func.now())
 
+class RescoreJob(Base):
+    """Recomputation of stored signal confidences under new fuser settings; resumable from last_signal_id"""
+    __tablename__ = "rescore_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    status = Column(String(20), nullable=False, default="running")  # running, completed, superseded, failed
+    params = Column(JSON, nullable=False)  # fuser settings the signals are rescored with
+    last_signal_id = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('idx_rescore_jobs_status', status),
+    )
+
 class AuditLog(Base):
     __tablename__ = "audit_log"
     
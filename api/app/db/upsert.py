@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """INSERT construct for the session's dialect, which supports ON CONFLICT"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model)
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]]):
+    """Multi-row INSERT of plain column dicts"""
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def upsert_increment(db: Session, model, rows: List[Dict[str, Any]], index_elements: Sequence[str], column: str):
+    """
+    Multi-row INSERT ... ON CONFLICT DO UPDATE adding the new value of `column`
+    to the stored one. Rows must not repeat a conflict key.
+    """
+    if not rows:
+        return
+    stmt = dialect_insert(db, model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={column: getattr(model, column) + getattr(stmt.excluded, column)}
+    )
+    db.execute(stmt)
@@ -2,11 +2,8 @@
 import asyncio
 import hashlib
 from urllib.parse import urlparse
-import feedparser
-import httpx
-import trafilatura
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from prefect import flow, task
 from sqlalchemy.orm import Session
 import structlog
@@ -15,57 +12,87 @@ import sys
 
 from app.db.session import SessionLocal
 from app.db.models import (
-    Document, Entity, DocumentEntity, Event, 
-    Signal, SignalEvidence, Ticker, Company, AuditLog
+    Document, Event, 
+    Signal, SignalEvidence, AuditLog
 )
 from app.core.config import settings
 from app.nlp.pipeline import nlp_pipeline
+from app.nlp.tickers import ticker_matcher
 from app.nlp.events import event_extractor
 from app.nlp.novelty import novelty_calculator
+from app.nlp.novelty_index import novelty_index
+from app.services.embedding_store import document_embedding
 from app.services.fuse import signal_fuser
 from app.services.notifier import slack_notifier
 from app.services.snapshots import snapshot_service
+from app.services.article_fetcher import article_fetcher
 from app.flows.mock_articles import MOCK_ARTICLES
 from app.ingestion.pipeline import save_document_from_raw
+from app.ingestion.feeds import fetch_all_feeds, close_feed_client
+from app.ingestion.feed_state import FeedPoll, feed_state
+from app.ingestion.extraction import extract_article_text, shutdown_extract_executor
+from app.ingestion.url_index import url_index
+from app.ingestion.dedup import near_duplicate_index
+from app.ingestion.stages import Stage, StagedPipeline
+from app.services.persistence import PreparedDocument, persist_documents
+from app.services.resolver import entity_resolver
+from app.db.upsert import bulk_insert
 
 logger = structlog.get_logger()
 
 
 @task
-def fetch_feeds(feed_urls: List[str], use_mock: bool = False) -> List[Dict]:
-    """Fetch articles from RSS feeds or use mock data"""
+async def fetch_feeds(feed_urls: List[str], use_mock: bool = False) -> Tuple[List[Dict], List[FeedPoll]]:
+    """
+    Fetch articles from RSS feeds or use mock data. Also returns the feed
+    responses, to commit to the feed state once their articles are stored.
+    """
     
     if use_mock:
         logger.info("Using mock articles for testing")
-        return MOCK_ARTICLES
+        return MOCK_ARTICLES, []
     
     articles = []
+    polls = []
     
-    for feed_url in feed_urls:
-        try:
-            logger.info(f"Fetching feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
-            
-            for entry in feed.entries[:10]:  # Limit to recent articles
-                article = {
-                    "title": entry.get("title", ""),
-                    "url": entry.get("link", ""),
-                    "published": datetime.fromtimestamp(
-                        entry.get("published_parsed", datetime.now().timetuple())[:6]
-                    ) if entry.get("published_parsed") else datetime.now(),
-                    "source": _extract_source_from_url(feed_url), # may add mappings as function?
-                    "content": None  # Will be fetched separately
-                }
-                articles.append(article)
-                
-        except Exception as e:
-            logger.error(f"Failed to fetch feed {feed_url}: {e}")
-            # Fall back to mock if feed fails
-            if not articles:
-                logger.info("Falling back to mock articles due to feed failure")
-                return MOCK_ARTICLES
-    
-    return articles if articles else MOCK_ARTICLES
+    # Download all feeds concurrently; one slow feed no longer holds up the rest.
+    # Requests are conditional and only entries not seen before come back.
+    results = await fetch_all_feeds(feed_urls, state=feed_state)
+    
+    for result in results:
+        if not result.ok:
+            logger.error(f"Failed to fetch feed {result.url}: {result.error}")
+            continue
+        if result.not_modified:
+            continue
+        
+        emitted = result.entries[:10]  # Limit to recent articles
+        for entry in emitted:
+            article = {
+                "title": entry.get("title", ""),
+                "url": entry.get("link", ""),
+                "published": datetime(
+                    *entry.published_parsed[:6]
+                ) if entry.get("published_parsed") else datetime.now(),
+                "source": _extract_source_from_url(result.url), # may add mappings as function?
+                "content": None  # Will be fetched separately
+            }
+            articles.append(article)
+        
+        polls.append(FeedPoll(
+            result.url,
+            emitted,
+            etag=result.etag,
+            last_modified=result.last_modified,
+            complete=len(emitted) == len(result.entries)
+        ))
+    
+    if not articles and not any(r.ok for r in results):
+        # Fall back to mock only if every feed failed; an unchanged feed is not a failure
+        logger.info("Falling back to mock articles due to feed failure")
+        return MOCK_ARTICLES, []
+    
+    return articles, polls
 
 def _extract_source_from_url(url: str) -> str:
     """Extract source name from URL (broader mapping, domain-normalized)."""
@@ -133,63 +160,68 @@ async def extract_article_content(article: Dict) -> Dict:
     if article.get("content"):
         return article
     
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(article["url"], timeout=10.0)
-            html_content = response.text
-            
-            # Extract text using trafilatura
-            text = trafilatura.extract(html_content)
-            
-            if text:
-                article["content"] = text
-                article["html"] = html_content
-            else:
-                # Fallback to title if extraction fails
-                article["content"] = article["title"]
-                article["html"] = f"<html><body><h1>{article['title']}</h1></body></html>"
-                
-    except Exception as e:
-        logger.error(f"Failed to extract content from {article['url']}: {e}")
-        article["content"] = article["title"]
-        article["html"] = f"<html><body><h1>{article['title']}</h1></body></html>"
+    result = await article_fetcher.fetch(article["url"])
+    
+    if result.ok:
+        html_content = result.text
+        
+        # Extract text using trafilatura in the extraction process pool
+        text = await extract_article_text(html_content)
+        
+        if text:
+            article["content"] = text
+            article["html"] = html_content
+            return article
+    else:
+        logger.error(f"Failed to extract content from {article['url']}: {result.error}")
+    
+    # Fallback to title if download or extraction fails
+    article["content"] = article["title"]
+    article["html"] = f"<html><body><h1>{article['title']}</h1></body></html>"
     
     return article
 
+def _mark_failed(articles: List[Dict]):
+    """Keep the feed entries of articles that could not be stored unseen, so the next poll retries them"""
+    for article in articles:
+        article["ingest_failed"] = True
+
+def _existing_urls(db: Session, urls: List[str]) -> List[str]:
+    """URLs (raw or canonical) that already belong to a stored document"""
+    rows = db.query(Document.url).filter(Document.url.in_(urls)).all()
+    return [row.url for row in rows]
+
 def compute_content_hash(content: str) -> str:
     """Compute hash of content for deduplication"""
     return hashlib.sha256(content.encode()).hexdigest()
 
-def ensure_ticker_exists(db: Session, ticker_symbol: str) -> Optional[Ticker]:
-    """Ensure ticker exists in database"""
-    
-    ticker = db.query(Ticker).filter(Ticker.symbol == ticker_symbol).first()
-    
-    if not ticker:
-        # Create company first
-        company = Company(
-            name=f"{ticker_symbol} Company",
-            sector="Technology",  # Default, would be looked up in production
-            industry="Software"
-        )
-        db.add(company)
-        db.flush()
-        
-        # Create ticker
-        ticker = Ticker(
-            symbol=ticker_symbol,
-            company_id=company.id,
-            exchange="NASDAQ",  # Default
-            is_active=True
-        )
-        db.add(ticker)
-        db.flush()
-    
-    return ticker
+def _prepare_document(article: Dict, nlp_result: Dict, content_hash: str) -> PreparedDocument:
+    """Save the HTML snapshot and extract events for one analysed article"""
+    snapshot_path = snapshot_service.save_html_snapshot(
+        url=article["url"],
+        html_content=article.get("html", ""),
+        source=article["source"],
+        published_at=article["published"]
+    )
+    events = event_extractor.extract_events(
+        article.get("content", ""),
+        article["published"],
+        nlp_result["tickers"]
+    )
+    return PreparedDocument(
+        article=article,
+        nlp_result=nlp_result,
+        content_hash=content_hash,
+        snapshot_path=snapshot_path,
+        events=events
+    )
 
 @task
-async def process_document(article: Dict, db: Session) -> Optional[Document]:
-    """Process document through NLP pipeline and save to database"""
+async def process_document(article: Dict, db: Session, nlp_result: Optional[Dict] = None) -> Optional[Document]:
+    """
+    Process document through NLP pipeline and save to database.
+    `nlp_result` may be precomputed by a batched NLP call.
+    """
     
     content = article.get("content", "")
     if not content:
@@ -203,121 +235,26 @@ async def process_document(article: Dict, db: Session) -> Optional[Document]:
         logger.info(f"Document already exists: {article['title']}")
         return existing
     
-    # NLP processing
-    nlp_result = nlp_pipeline.process_document(content)
-    
-    # Save HTML snapshot
-    snapshot_path = snapshot_service.save_html_snapshot(
-        url=article["url"],
-        html_content=article.get("html", ""),
-        source=article["source"],
-        published_at=article["published"]
-    )
-    
-    # Create document
-    doc = Document(
-        source=article["source"],
-        url=article["url"],
-        title=article["title"],
-        published_at=article["published"],
-        raw_text=content,
-        html_snapshot_path=snapshot_path,
-        content_hash=content_hash,
-        lang="en",
-        embedding=nlp_result["embedding"],
-        sentiment=nlp_result["sentiment"],
-        sentiment_score=nlp_result["sentiment_score"],
-        meta={"tickers": nlp_result["tickers"]}
-    )
-    
-    db.add(doc)
-    db.flush()
-    
-    # Process entities
-    for entity_data in nlp_result["entities"]:
-        # Check if entity exists
-        seen_entity_ids = set()
-        entity = db.query(Entity).filter(Entity.name == entity_data["text"]).first()
-        
-        if not entity:
-            # Try to link to ticker if it's an ORG
-            ticker_id = None
-            if entity_data["type"] == "ORG":
-                for ticker_symbol in nlp_result["tickers"]:
-                    ticker = ensure_ticker_exists(db, ticker_symbol)
-                    if ticker:
-                        ticker_id = ticker.id
-                        break
-            
-            entity = Entity(
-                name=entity_data["text"],
-                entity_type=entity_data["type"],
-                ticker_id=ticker_id
-            )
-            db.add(entity)
-            db.flush()
-        
-        if entity.id in seen_entity_ids:
-            # 如果这轮已经添加过，就直接把已有记录的 mentions +1
-            existing_de = db.query(DocumentEntity).filter_by(
-               document_id=doc.id, entity_id=entity.id
-            ).first()
-            if existing_de:
-                existing_de.mentions = (existing_de.mentions or 0) + 1
-            continue
-
-        existing_de = db.query(DocumentEntity).filter_by(
-            document_id=doc.id, entity_id=entity.id
-        ).first()
-        if existing_de:
-            existing_de.mentions = (existing_de.mentions or 0) + 1
-        else:
-            db.add(DocumentEntity(
-                document_id=doc.id,
-                entity_id=entity.id,
-                mentions=1,
-                relevance_score=0.5
-            ))
-        seen_entity_ids.add(entity.id)
-
-    # Extract events
-    events = event_extractor.extract_events(
-        content,
-        doc.published_at,
-        nlp_result["tickers"]
-    )
-    
-    for event_data in events:
-        event = Event(
-            document_id=doc.id,
-            event_time=event_data["event_time"],
-            event_type=event_data["event_type"],
-            headline=event_data["headline"],
-            confidence_extraction=event_data["confidence_extraction"],
-            affected_ticker=event_data["affected_ticker"],
-            payload=event_data["payload"]
-        )
-        db.add(event)
-    
-    db.flush()
+    # Skip rewrites of a story already ingested within the near-duplicate window
+    duplicate_of = near_duplicate_index.find_duplicate(content)
+    if duplicate_of:
+        logger.info(f"Near-duplicate document skipped: {article['title']}", duplicate_of=duplicate_of)
+        return None
     
-    # Log audit
-    audit = AuditLog(
-        actor="ingest_flow",
-        action="ingest_doc",
-        target_type="document",
-        target_id=doc.id,
-        payload={"url": article["url"], "source": article["source"]}
-    )
-    db.add(audit)
+    # NLP processing
+    if nlp_result is None:
+        nlp_result = nlp_pipeline.process_document(content)
     
-    return doc
+    # Same write path as the batched store stage
+    docs = persist_documents(db, [_prepare_document(article, nlp_result, content_hash)])
+    return docs[0]
 
 @task
 async def generate_signals(doc: Document, db: Session) -> List[Signal]:
     """Generate signals from document and events"""
     
     signals = []
+    pending = []
     
     # Get events for this document
     events = db.query(Event).filter(Event.document_id == doc.id).all()
@@ -330,6 +267,19 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
             "confidence_extraction": doc.sentiment_score
         }]
     
+    # Novelty depends only on the document and the ticker: score each ticker once, in one batch
+    event_tickers = list(dict.fromkeys(
+        (e.affected_ticker if isinstance(e, Event) else e.get("affected_ticker")) for e in events
+    ))
+    event_tickers = [t for t in event_tickers if t]
+    embedding = document_embedding(doc)
+    if embedding is None and event_tickers:
+        embedding = nlp_pipeline.generate_embedding(doc.raw_text)
+    novelty_by_ticker = dict(zip(event_tickers, novelty_calculator.calculate_novelty_batch(
+        [(embedding, ticker, doc.published_at) for ticker in event_tickers], db
+    ))) if event_tickers else {}
+    
+    scored = []
     for event in events:
         if isinstance(event, Event):
             ticker_symbol = event.affected_ticker
@@ -344,35 +294,36 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
             continue
         
         # Ensure ticker exists
-        ticker = ensure_ticker_exists(db, ticker_symbol)
-        if not ticker:
+        ticker_id = entity_resolver.ticker_id(db, ticker_symbol)
+        if not ticker_id:
             continue
         
-        # Calculate novelty
-        novelty = novelty_calculator.calculate_novelty(
-            text=doc.raw_text,
-            ticker=ticker_symbol,
-            published_at=doc.published_at,
-            db=db,
-            embedding=doc.embedding
-        )
-        
         # Calculate buzz score
         buzz_score = novelty_calculator.calculate_buzz_score(
             ticker=ticker_symbol,
             published_at=doc.published_at,
             db=db
         )
-        
-        # Calculate confidence
-        confidence, base_score, components = signal_fuser.calculate_confidence(
-            source=doc.source,
-            novelty=novelty,
-            event_type=event_type,
-            buzz_score=buzz_score,
-            signal_time=doc.published_at,
-            current_time=datetime.now()
-        )
+        scored.append((event, ticker_symbol, ticker_id, event_type, evt_confidence, buzz_score))
+    
+    if not scored:
+        return signals
+    
+    # Calculate confidence for all events in one call
+    confidences, base_scores, component_arrays = signal_fuser.calculate_confidence_batch(
+        sources=[doc.source] * len(scored),
+        novelty=[novelty_by_ticker[row[1]] for row in scored],
+        event_types=[row[3] for row in scored],
+        buzz_scores=[row[5] for row in scored],
+        signal_times=doc.published_at,
+        current_time=datetime.now()
+    )
+    
+    for i, (event, ticker_symbol, ticker_id, event_type, evt_confidence, buzz_score) in enumerate(scored):
+        novelty = novelty_by_ticker[ticker_symbol]
+        confidence = float(confidences[i])
+        base_score = float(base_scores[i])
+        components = signal_fuser.component_dict(component_arrays, i)
         
         # Determine direction
         direction = signal_fuser.determine_signal_direction(
@@ -398,7 +349,7 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
         
         # Create signal
         signal = Signal(
-            ticker_id=ticker.id,
+            ticker_id=ticker_id,
             signal_time=doc.published_at,
             base_score=base_score,
             confidence=confidence,
@@ -407,57 +358,66 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
             decay_seconds=86400,
             meta={
                 "components": components,
+                # fuser inputs that are not components, so a rescore can look up new weights
+                "source": doc.source,
+                "event_type": event_type,
                 "alert_reason": alert_reason,
                 "requires_second_source": not should_alert or alert_reason == "Needs second source confirmation"
             }
         )
         
-        db.add(signal)
-        db.flush()
-        
+        signals.append(signal)
+        pending.append((signal, event, ticker_symbol, event_type, evt_confidence, novelty, should_alert, alert_reason))
+    
+    if not signals:
+        return signals
+    
+    # One flush assigns all signal ids; evidence and audit rows go in multi-row inserts
+    db.add_all(signals)
+    db.flush()
+    
+    evidence_rows = []
+    audit_rows = []
+    
+    for signal, event, ticker_symbol, event_type, evt_confidence, novelty, should_alert, alert_reason in pending:
         # Add evidence
-        evidence = SignalEvidence(
-            signal_id=signal.id,
-            kind="document",
-            ref_id=doc.id,
-            weight=1.0,
-            details={
+        evidence_rows.append({
+            "signal_id": signal.id,
+            "kind": "document",
+            "ref_id": doc.id,
+            "weight": 1.0,
+            "details": {
                 "title": doc.title,
                 "url": doc.url,
                 "sentiment": doc.sentiment,
                 "novelty": novelty
             }
-        )
-        db.add(evidence)
+        })
         
         if isinstance(event, Event):
-            event_evidence = SignalEvidence(
-                signal_id=signal.id,
-                kind="event",
-                ref_id=event.id,
-                weight=evt_confidence,
-                details={
+            evidence_rows.append({
+                "signal_id": signal.id,
+                "kind": "event",
+                "ref_id": event.id,
+                "weight": evt_confidence,
+                "details": {
                     "event_type": event_type,
                     "headline": event.headline
                 }
-            )
-            db.add(event_evidence)
+            })
         
         # Log audit
-        audit = AuditLog(
-            actor="ingest_flow",
-            action="create_signal",
-            target_type="signal",
-            target_id=signal.id,
-            payload={
+        audit_rows.append({
+            "actor": "ingest_flow",
+            "action": "create_signal",
+            "target_type": "signal",
+            "target_id": signal.id,
+            "payload": {
                 "ticker": ticker_symbol,
-                "confidence": confidence,
-                "label": label
+                "confidence": signal.confidence,
+                "label": signal.label
             }
-        )
-        db.add(audit)
-        
-        signals.append(signal)
+        })
         
         # Send alert if needed
         if should_alert:
@@ -476,9 +436,9 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
             asyncio.create_task(
                 slack_notifier.send_signal_alert(
                     ticker=ticker_symbol,
-                    signal_label=label,
-                    confidence=confidence,
-                    direction=direction,
+                    signal_label=signal.label,
+                    confidence=signal.confidence,
+                    direction=signal.direction,
                     sources=sources,
                     signal_time=doc.published_at,
                     evidence=evidence_data
@@ -486,92 +446,249 @@ async def generate_signals(doc: Document, db: Session) -> List[Signal]:
             )
             
             # Log alert
-            alert_audit = AuditLog(
-                actor="ingest_flow",
-                action="send_alert",
-                target_type="signal",
-                target_id=signal.id,
-                payload={
+            audit_rows.append({
+                "actor": "ingest_flow",
+                "action": "send_alert",
+                "target_type": "signal",
+                "target_id": signal.id,
+                "payload": {
                     "channel": "slack",
                     "reason": alert_reason
                 }
-            )
-            db.add(alert_audit)
+            })
+    
+    bulk_insert(db, SignalEvidence, evidence_rows)
+    bulk_insert(db, AuditLog, audit_rows)
     
     return signals
 
+def _drop_duplicates(articles: List[Dict], db: Session) -> List[Dict]:
+    """Drop articles whose content is already stored, repeated in the batch, or a near duplicate"""
+    hashes = {id(a): compute_content_hash(a["content"]) for a in articles if a.get("content")}
+    stored = {
+        row.content_hash for row in
+        db.query(Document.content_hash).filter(Document.content_hash.in_(set(hashes.values()))).all()
+    } if hashes else set()
+    
+    fresh = []
+    for article in articles:
+        content_hash = hashes.get(id(article))
+        if not content_hash or content_hash in stored:
+            continue
+        if near_duplicate_index.find_duplicate(article["content"]):
+            logger.info(f"Near-duplicate document skipped: {article['title']}")
+            continue
+        stored.add(content_hash)
+        fresh.append(article)
+    return fresh
+
+async def _analyze_batch(articles: List[Dict], session_factory: Callable[[], Session]) -> List[Tuple[Dict, Dict]]:
+    """NLP stage: drop duplicates, then run batched inference off the event loop"""
+    # A session of its own per batch, since the store stage's session is not safe to share,
+    # closed before inference so no connection is held while the models run
+    db = session_factory()
+    try:
+        articles = _drop_duplicates(articles, db)
+        if not articles:
+            return []
+        # Pick up tickers created since the last batch
+        ticker_matcher.refresh(db)
+    finally:
+        db.close()
+    nlp_results = await asyncio.to_thread(nlp_pipeline.process_documents, [a["content"] for a in articles])
+    return list(zip(articles, nlp_results))
+
+async def _write_documents(prepared: List[PreparedDocument], db: Session) -> List[Tuple[Document, List[Signal]]]:
+    docs = persist_documents(db, prepared)
+    doc_ids = [doc.id for doc in docs]
+    # Visible to novelty of the rest of the batch, as the flushed rows are to the DB path
+    novelty_index.add_documents(docs)
+    try:
+        results = []
+        for doc in docs:
+            signals = await generate_signals(doc, db)
+            results.append((doc, signals))
+        # Read what the indexes need before commit expires the instances
+        written = [(doc.id, doc.title, doc.url, doc.content_hash, doc.raw_text, len(signals)) for doc, signals in results]
+        db.commit()
+    except Exception:
+        novelty_index.discard(doc_ids)
+        raise
+    
+    for doc_id, title, url, content_hash, raw_text, signal_count in written:
+        url_index.add(url)
+        near_duplicate_index.add_text(content_hash, raw_text)
+        logger.info(
+            f"Processed document: {title}",
+            doc_id=doc_id,
+            signals_generated=signal_count
+        )
+    return results
+
+async def _store_batch(items: List[Tuple[Dict, Dict]], db: Session) -> List[Tuple[Document, List[Signal]]]:
+    """Store stage: write a batch of analysed documents and their signals in one transaction"""
+    hashes = [compute_content_hash(article["content"]) for article, _ in items]
+    # Another batch may have stored the same content while this one was in NLP
+    stored = {
+        row.content_hash for row in
+        db.query(Document.content_hash).filter(Document.content_hash.in_(hashes)).all()
+    }
+    prepared = []
+    for (article, nlp_result), content_hash in zip(items, hashes):
+        if content_hash in stored:
+            continue
+        stored.add(content_hash)
+        prepared.append(_prepare_document(article, nlp_result, content_hash))
+    
+    if not prepared:
+        return []
+    
+    try:
+        return await _write_documents(prepared, db)
+    except Exception as e:
+        db.rollback()  # <<< 关键：回滚当前事务
+        if len(prepared) == 1:
+            logger.error(f"Error processing article: {e}", article=prepared[0].article.get("title"))
+            _mark_failed([prepared[0].article])
+            return []
+        # Retry one by one so one bad article cannot discard the rest
+        logger.warning(f"Batch write failed, retrying per document: {e}", batch_size=len(prepared))
+        results = []
+        for p in prepared:
+            try:
+                results.extend(await _write_documents([p], db))
+            except Exception as e:
+                logger.error(f"Error processing article: {e}", article=p.article.get("title"))
+                db.rollback()
+                _mark_failed([p.article])
+        return results
+
+async def _save_mock_document(article: Dict) -> Optional[Dict]:
+    # Without DB, save documents to data/ via pipeline
+    saved = save_document_from_raw(article)
+    if saved:
+        logger.info('Processed mock document', title=saved.get('title'), url=saved.get('url'))
+    return saved
+
+def _build_pipeline(db: Optional[Session]) -> StagedPipeline:
+    """
+    fetch -> nlp -> store, each stage with its own worker count and a bounded
+    queue in front of it, so downloads cannot run far ahead of NLP.
+    """
+    if db is None:
+        return StagedPipeline("ingest_mock", [
+            Stage("fetch", extract_article_content, concurrency=settings.INGEST_FETCH_WORKERS),
+            Stage("store", _save_mock_document)
+        ])
+    
+    # A stage that raises drops its items; mark them so their feed entries are retried
+    async def fetch(article: Dict) -> Dict:
+        try:
+            return await extract_article_content(article)
+        except Exception:
+            _mark_failed([article])
+            raise
+    
+    async def analyze(articles: List[Dict]) -> List[Tuple[Dict, Dict]]:
+        try:
+            return await _analyze_batch(articles, SessionLocal)
+        except Exception:
+            _mark_failed(articles)
+            raise
+    
+    async def store(items: List[Tuple[Dict, Dict]]) -> List[Tuple[Document, List[Signal]]]:
+        try:
+            return await _store_batch(items, db)
+        except Exception:
+            _mark_failed([article for article, _ in items])
+            raise
+    
+    return StagedPipeline("ingest", [
+        Stage("fetch", fetch, concurrency=settings.INGEST_FETCH_WORKERS),
+        Stage(
+            "nlp",
+            analyze,
+            concurrency=settings.INGEST_NLP_WORKERS,
+            batch_size=settings.NLP_BATCH_SIZE,
+            batch_linger=settings.INGEST_BATCH_LINGER
+        ),
+        # The session is not safe for concurrent use, so keep a single writer by default
+        Stage(
+            "store",
+            store,
+            concurrency=settings.INGEST_STORE_WORKERS,
+            batch_size=settings.INGEST_STORE_BATCH_SIZE,
+            batch_linger=settings.INGEST_BATCH_LINGER
+        ),
+    ])
+
 @flow(name="ingest_flow")
 async def ingest_flow(use_mock: bool = False):
     """Main ingestion flow"""
     
     logger.info("Starting ingestion flow", use_mock=use_mock)
     
-    # Initialize NLP pipeline
-    nlp_pipeline.initialize()
+    # Load the NLP models (each in its own thread) while feeds download;
+    # the mock path never runs inference
+    warm_up = None if use_mock else asyncio.create_task(asyncio.to_thread(nlp_pipeline.warm_up))
     
     # Get feed URLs
     feed_urls = settings.news_feeds_list if not use_mock else []
     
     # Fetch articles
-    articles = fetch_feeds(feed_urls, use_mock=use_mock)
+    try:
+        articles, polls = await fetch_feeds(feed_urls, use_mock=use_mock)
+    except BaseException:
+        if warm_up is not None:
+            warm_up.cancel()
+        raise
+    finally:
+        await close_feed_client()
     logger.info(f"Fetched {len(articles)} articles")
     
-    # Process each article
-    db = None
+    db = None if use_mock else SessionLocal()
     try:
-        processed_docs = []
-        all_signals = []
+        if db is not None:
+            await warm_up
+            entity_resolver.warm(db)
+            if settings.NOVELTY_INDEX_ENABLED:
+                novelty_index.warm(db)
+            # Drop syndicated repeats before any HTTP request or NLP work
+            articles = url_index.filter_new(articles, confirm=lambda urls: _existing_urls(db, urls))
         
-        for article in articles:
-            try:
-                # Extract content
-                article = await extract_article_content(article)
-                # If running in mock mode without DB, save documents to data/ via pipeline
-                if use_mock:
-                    saved = save_document_from_raw(article)
-                    if saved:
-                        processed_docs.append(saved)
-                        logger.info('Processed mock document', title=saved.get('title'), url=saved.get('url'))
-                    continue
-
-                # Process document (DB path)
-                db = SessionLocal()
-                doc = await process_document(article, db)
-                
-                if doc:
-                    processed_docs.append(doc)
-                    
-                    # Generate signals
-                    signals = await generate_signals(doc, db)
-                    all_signals.extend(signals)
-                    
-                    logger.info(
-                        f"Processed document: {doc.title}",
-                        doc_id=doc.id,
-                        signals_generated=len(signals)
-                    )
-
-            except Exception as e:
-                logger.error(f"Error processing article: {e}", article=article.get("title"))
-                db.rollback()  # <<< 关键：回滚当前事务
-                continue
-
-        # Commit all changes
-        db.commit()
+        # Stream articles through download, NLP and storage concurrently;
+        # each document is committed as soon as it is stored.
+        pipeline = _build_pipeline(db)
+        results = await pipeline.run(articles)
+        
+        # Only now are the entries seen; those whose article failed stay unseen and are retried
+        feed_state.commit_polls(polls, failed={a["url"] for a in articles if a.get("ingest_failed")})
+        
+        if db is None:
+            documents, signals = len(results), 0
+        else:
+            documents = len(results)
+            signals = sum(len(s) for _, s in results)
         
         logger.info(
             "Ingestion flow completed",
-            documents_processed=len(processed_docs),
-            signals_generated=len(all_signals)
+            documents_processed=documents,
+            signals_generated=signals,
+            stages=[stats.to_dict(name) for name, stats in pipeline.stats.items()]
         )
         
         return {
-            "documents": len(processed_docs),
-            "signals": len(all_signals)
+            "documents": documents,
+            "signals": signals
         }
         
     finally:
-        db.close()
+        if db is not None:
+            db.close()
+        await article_fetcher.aclose()
+        shutdown_extract_executor()
+        url_index.save()
+        near_duplicate_index.save()
 
 if __name__ == "__main__":
     # Support running directly for testing
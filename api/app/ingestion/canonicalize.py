@@ -1,8 +1,6 @@
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 from datetime import datetime
 import re
-import trafilatura
-from bs4 import BeautifulSoup
 
 TRACKING_PARAMS = ['utm_source','utm_medium','utm_campaign','utm_term','utm_content','fbclid']
 
@@ -19,9 +17,12 @@ def canonicalize_url(url: str) -> str:
 def extract_text(html: str) -> str:
     if not html:
         return ''
+    # Imported on first use: both are slow to import and most callers never extract
+    import trafilatura
     text = trafilatura.extract(html) or ''
     if not text:
         # fallback to bs4
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         for s in soup(['script','style','header','footer','nav','aside']):
             s.decompose()
@@ -1,19 +1,215 @@
 import hashlib
-from typing import Optional
-try:
-    from datasketch import MinHash
-except Exception:
-    MinHash = None
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_minhash_cls = None
+_minhash_checked = False
+
+
+def _minhash():
+    """datasketch.MinHash, imported on first use; None when datasketch is not installed"""
+    global _minhash_cls, _minhash_checked
+    if not _minhash_checked:
+        try:
+            from datasketch import MinHash
+            _minhash_cls = MinHash
+        except Exception:
+            _minhash_cls = None
+        _minhash_checked = True
+    return _minhash_cls
+
+_TOKEN_RE = re.compile(r"\w+")
+
 
 def content_hash(text: str) -> str:
     return hashlib.sha256(text.encode('utf8')).hexdigest()
 
-def is_near_duplicate(text: str, threshold: float = 0.9) -> bool:
-    # Placeholder: if datasketch present, implement MinHash Jaccard; else return False
-    if MinHash is None:
+
+def _shingles(text: str, size: int) -> Set[bytes]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return {" ".join(tokens).encode('utf8')} if tokens else set()
+    return {" ".join(tokens[i:i + size]).encode('utf8') for i in range(len(tokens) - size + 1)}
+
+
+def _band_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH threshold
+    (1/b)^(1/r) sits just below `threshold`, favouring recall at the threshold.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Sliding-window MinHash-LSH index over recently ingested texts.
+
+    Texts are shingled into word n-grams and summarised by a MinHash
+    signature; the signature is split into bands and each band is hashed into
+    a bucket, so only texts sharing a bucket are compared. Entries older than
+    the window are evicted, and the index is persisted to disk.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_hours: Optional[float] = None,
+        threshold: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        shingle_size: int = 5
+    ):
+        self.path = path or settings.NEAR_DUP_INDEX_PATH
+        self.window_seconds = (window_hours or settings.NEAR_DUP_WINDOW_HOURS) * 3600
+        self.threshold = threshold or settings.NEAR_DUP_THRESHOLD
+        self.num_perm = num_perm or settings.NEAR_DUP_NUM_PERM
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _band_params(self.threshold, self.num_perm)
+        self._lock = threading.Lock()
+        self._loaded = False
+        # key -> (added_at, signature), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._buckets: List[Dict[bytes, Set[str]]] = [dict() for _ in range(self.bands)]
+
+    @property
+    def available(self) -> bool:
+        return _minhash() is not None
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        MinHash = _minhash()
+        if MinHash is None or not text:
+            return None
+        shingles = _shingles(text, self.shingle_size)
+        if not shingles:
+            return None
+        m = MinHash(num_perm=self.num_perm)
+        m.update_batch(list(shingles))
+        return m.hashvalues.copy()
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, key: str, added_at: float, sig: np.ndarray):
+        self._entries[key] = (added_at, sig)
+        for band, bkey in zip(self._buckets, self._band_keys(sig)):
+            band.setdefault(bkey, set()).add(key)
+
+    def _remove(self, key: str):
+        _, sig = self._entries.pop(key)
+        for band, bkey in zip(self._buckets, self._band_keys(sig)):
+            bucket = band.get(bkey)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del band[bkey]
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("num_perm") != self.num_perm or data.get("bands") != self.bands:
+                logger.info("Near-duplicate index parameters changed, starting empty", path=self.path)
+                return
+            for key, added_at, sig in data["entries"]:
+                self._insert(key, added_at, np.frombuffer(sig, dtype=np.uint64))
+        except Exception as e:
+            logger.warning("near_dup_index_load_failed", path=self.path, error=str(e))
+
+    def _expire(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._entries:
+            key, (added_at, _) = next(iter(self._entries.items()))
+            if added_at >= cutoff:
+                break
+            self._remove(key)
+
+    def query(self, sig: Optional[np.ndarray], threshold: Optional[float] = None, now: Optional[float] = None) -> Optional[str]:
+        """Key of an indexed text whose estimated Jaccard similarity is >= threshold"""
+        if sig is None:
+            return None
+        threshold = threshold or self.threshold
+        with self._lock:
+            self._load()
+            self._expire(now or time.time())
+            candidates = set()
+            for band, bkey in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(band.get(bkey, ()))
+            best_key, best_sim = None, 0.0
+            for key in candidates:
+                sim = float(np.mean(self._entries[key][1] == sig))
+                if sim >= threshold and sim > best_sim:
+                    best_key, best_sim = key, sim
+            return best_key
+
+    def add(self, key: str, sig: Optional[np.ndarray], now: Optional[float] = None):
+        if sig is None or not key:
+            return
+        now = now or time.time()
+        with self._lock:
+            self._load()
+            self._expire(now)
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, now, sig)
+
+    def find_duplicate(self, text: str, threshold: Optional[float] = None) -> Optional[str]:
+        return self.query(self.signature(text), threshold=threshold)
+
+    def add_text(self, key: str, text: str):
+        self.add(key, self.signature(text))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self):
+        with self._lock:
+            if not self._loaded:
+                return
+            data = {
+                "num_perm": self.num_perm,
+                "bands": self.bands,
+                "entries": [(key, added_at, sig.tobytes()) for key, (added_at, sig) in self._entries.items()],
+            }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning("near_dup_index_save_failed", path=self.path, error=str(e))
+
+# Global instance
+near_duplicate_index = NearDuplicateIndex()
+
+
+def is_near_duplicate(text: str, threshold: Optional[float] = None) -> bool:
+    # Without datasketch there are no signatures, so nothing is ever a near duplicate
+    if _minhash() is None:
         return False
-    m = MinHash()
-    for token in text.split():
-        m.update(token.encode('utf8'))
-    # In production, compare against sliding window index in Redis/DB
-    return False
+    return near_duplicate_index.find_duplicate(text, threshold=threshold) is not None
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+import structlog
+
+from app import metrics
+from app.core.config import settings
+from app.ingestion.canonicalize import extract_text
+
+logger = structlog.get_logger()
+
+# HTML-to-text extraction is CPU bound (trafilatura / BeautifulSoup), so it runs
+# in a process pool and the event loop only awaits the result.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _article_text(html: str) -> Optional[str]:
+    """Worker: main-content extraction only, None when nothing was found"""
+    import trafilatura
+    return trafilatura.extract(html)
+
+
+def get_extract_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = settings.EXTRACT_WORKERS or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            logger.info("Started extraction process pool", workers=workers)
+        return _executor
+
+
+def shutdown_extract_executor(kill: bool = False):
+    """Stop the pool; with `kill`, terminate workers stuck on a page instead of waiting"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return
+    if kill:
+        # a worker cannot be interrupted mid-parse, so the only way to reclaim it is to kill it
+        for proc in list(getattr(executor, "_processes", {}).values()):
+            proc.terminate()
+    executor.shutdown(wait=not kill, cancel_futures=True)
+
+
+async def run_extraction(
+    func: Callable[[str], Optional[str]],
+    html: str,
+    timeout: Optional[float] = None
+) -> Optional[str]:
+    """
+    Run `func(html)` in the extraction pool within a per-document time budget.
+    Returns None if the document timed out or the extractor failed.
+    """
+    if not html:
+        return None
+    timeout = timeout or settings.EXTRACT_TIMEOUT
+    html = html[:settings.EXTRACT_MAX_HTML_CHARS]
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(2):
+        executor = get_extract_executor()
+        try:
+            text = await asyncio.wait_for(loop.run_in_executor(executor, func, html), timeout=timeout)
+            metrics.inc_counter("extract_total", {"result": "ok"})
+            return text
+        except asyncio.TimeoutError:
+            logger.warning("Extraction exceeded time budget, recycling pool", timeout=timeout)
+            metrics.inc_counter("extract_total", {"result": "timeout"})
+            shutdown_extract_executor(kill=True)
+            return None
+        except BrokenProcessPool:
+            # another document's timeout recycled the pool under us; retry once
+            if attempt == 0:
+                continue
+            metrics.inc_counter("extract_total", {"result": "error"})
+            return None
+        except Exception as e:
+            logger.warning("Extraction failed", error=str(e))
+            metrics.inc_counter("extract_total", {"result": "error"})
+            return None
+    return None
+
+
+async def extract_article_text(html: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Main article text via trafilatura, off the event loop"""
+    return await run_extraction(_article_text, html, timeout=timeout)
+
+
+async def extract_text_async(html: str, timeout: Optional[float] = None) -> str:
+    """`canonicalize.extract_text` (trafilatura with BeautifulSoup fallback), off the event loop"""
+    return await run_extraction(extract_text, html, timeout=timeout) or ''
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+def entry_key(entry: Dict[str, Any]) -> Optional[str]:
+    """Stable identity of a feed entry: GUID if the feed provides one, else its link"""
+    return entry.get("id") or entry.get("guid") or entry.get("link") or None
+
+
+@dataclass
+class FeedPoll:
+    """Entries emitted from one feed response, committed once they have been stored"""
+    url: str
+    entries: List[Dict[str, Any]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    complete: bool = True
+
+
+class FeedStateStore:
+    """
+    Persistent per-feed polling state: HTTP validators (ETag / Last-Modified)
+    for conditional requests, and a bounded, insertion-ordered set of entry
+    keys that have already been emitted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_seen: Optional[int] = None):
+        self.path = path or settings.FEED_STATE_PATH
+        self.max_seen = max_seen or settings.FEED_SEEN_MAX
+        self._lock = threading.Lock()
+        self._feeds: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _state(self) -> Dict[str, Dict[str, Any]]:
+        # Loaded lazily so importing the module never touches the disk
+        if self._feeds is None:
+            self._feeds = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf8") as f:
+                        raw = json.load(f)
+                    for url, st in raw.items():
+                        self._feeds[url] = {
+                            "etag": st.get("etag"),
+                            "last_modified": st.get("last_modified"),
+                            "seen": OrderedDict.fromkeys(st.get("seen") or []),
+                        }
+                except Exception as e:
+                    logger.warning("feed_state_load_failed", path=self.path, error=str(e))
+        return self._feeds
+
+    def _feed(self, url: str) -> Dict[str, Any]:
+        feeds = self._state()
+        if url not in feeds:
+            feeds[url] = {"etag": None, "last_modified": None, "seen": OrderedDict()}
+        return feeds[url]
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            st = self._feed(url)
+            headers = {}
+            if st["etag"]:
+                headers["If-None-Match"] = st["etag"]
+            if st["last_modified"]:
+                headers["If-Modified-Since"] = st["last_modified"]
+            return headers
+
+    def unseen(self, url: str, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Entries not emitted before, in feed order"""
+        with self._lock:
+            seen = self._feed(url)["seen"]
+            return [e for e in entries if entry_key(e) not in seen]
+
+    def commit(
+        self,
+        url: str,
+        emitted: Iterable[Dict[str, Any]],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        complete: bool = True
+    ):
+        """
+        Record emitted entries as seen and store the feed's validators.
+        When only part of the new entries were emitted (`complete=False`) the
+        validators are dropped, so the next poll fetches the feed in full
+        instead of getting a 304 and losing the rest.
+        """
+        with self._lock:
+            st = self._feed(url)
+            seen = st["seen"]
+            for entry in emitted:
+                key = entry_key(entry)
+                if key:
+                    seen[key] = None
+                    seen.move_to_end(key)
+            while len(seen) > self.max_seen:
+                seen.popitem(last=False)
+            st["etag"] = etag if complete else None
+            st["last_modified"] = last_modified if complete else None
+
+    def commit_polls(self, polls: Iterable[FeedPoll], failed: AbstractSet[str] = frozenset()):
+        """
+        Commit the entries of `polls` after they were processed, except those
+        whose link is in `failed`: they stay unseen, and their feed loses its
+        validators so the next poll downloads it again and retries them.
+        """
+        for poll in polls:
+            done = [e for e in poll.entries if e.get("link", "") not in failed]
+            self.commit(
+                poll.url,
+                done,
+                etag=poll.etag,
+                last_modified=poll.last_modified,
+                complete=poll.complete and len(done) == len(poll.entries)
+            )
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if self._feeds is None:
+                return
+            data = {
+                url: {
+                    "etag": st["etag"],
+                    "last_modified": st["last_modified"],
+                    "seen": list(st["seen"].keys()),
+                }
+                for url, st in self._feeds.items()
+            }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning("feed_state_save_failed", path=self.path, error=str(e))
+
+# Global instance
+feed_state = FeedStateStore()
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import feedparser
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.ingestion.feed_state import FeedStateStore
+
+logger = structlog.get_logger()
+
+# One pooled client per event loop; re-created when a new loop (e.g. a new
+# `asyncio.run` from the CLI) starts using it.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+@dataclass
+class FeedResult:
+    url: str
+    status: Optional[int] = None
+    feed: Optional[feedparser.FeedParserDict] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    # Entries to emit: all of them, or only unseen ones when polled with state
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def ok(self) -> bool:
+        return self.feed is not None or self.not_modified
+
+
+def get_feed_client() -> httpx.AsyncClient:
+    """Return the shared feed client, creating it for the running loop if needed"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.FEED_FETCH_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.FEED_FETCH_CONCURRENCY,
+                max_keepalive_connections=settings.FEED_FETCH_CONCURRENCY,
+            ),
+            follow_redirects=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_feed_client():
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+async def fetch_feed(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    timeout: Optional[float] = None,
+    state: Optional[FeedStateStore] = None
+) -> FeedResult:
+    """
+    Download a single feed and parse it.
+    `timeout` bounds the whole request (connect + slow body), not just each read.
+    With `state`, the request is conditional and only unseen entries are returned;
+    a 304 yields an ok result with no entries.
+    """
+    client = client or get_feed_client()
+    timeout = timeout or settings.FEED_FETCH_TIMEOUT
+    started = time.perf_counter()
+    result = FeedResult(url=url)
+
+    try:
+        headers = state.conditional_headers(url) if state else {}
+        response = await asyncio.wait_for(client.get(url, headers=headers), timeout=timeout)
+        result.status = response.status_code
+        if not result.not_modified:
+            response.raise_for_status()
+            result.etag = response.headers.get("ETag")
+            result.last_modified = response.headers.get("Last-Modified")
+            # feedparser is pure-python; keep it off the event loop
+            result.feed = await asyncio.to_thread(
+                feedparser.parse,
+                response.content,
+                response_headers=dict(response.headers)
+            )
+            result.entries = state.unseen(url, result.feed.entries) if state else list(result.feed.entries)
+    except asyncio.TimeoutError:
+        result.error = f"timed out after {timeout}s"
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    if result.not_modified:
+        logger.info("feed_not_modified", feed=url, elapsed_ms=round(result.elapsed_ms, 1))
+    elif result.error:
+        logger.warning("feed_fetch_failed", feed=url, error=result.error, elapsed_ms=round(result.elapsed_ms, 1))
+    else:
+        logger.info("feed_fetched", feed=url, status=result.status, entries=len(result.feed.entries), new_entries=len(result.entries), elapsed_ms=round(result.elapsed_ms, 1))
+    return result
+
+
+async def fetch_all_feeds(
+    urls: List[str],
+    timeout: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    state: Optional[FeedStateStore] = None
+) -> List[FeedResult]:
+    """
+    Fetch all feeds concurrently, at most `max_concurrency` at a time.
+    Results are returned in the same order as `urls`; failures are reported
+    on the result rather than raised.
+    """
+    urls = [u for u in urls if u]
+    if not urls:
+        return []
+
+    client = client or get_feed_client()
+    semaphore = asyncio.Semaphore(max_concurrency or settings.FEED_FETCH_CONCURRENCY)
+
+    async def _bounded(url: str) -> FeedResult:
+        async with semaphore:
+            return await fetch_feed(url, client=client, timeout=timeout, state=state)
+
+    return await asyncio.gather(*[_bounded(u) for u in urls])
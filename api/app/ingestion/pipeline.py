@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Dict, Any
 from app.ingestion.canonicalize import canonicalize_url, extract_text, parse_date
 from app import metrics
-from app.ingestion.dedup import content_hash, is_near_duplicate
+from app.ingestion.dedup import content_hash, near_duplicate_index
 from app.services.snapshots import snapshot_service
 import structlog
 
@@ -28,8 +28,10 @@ def save_document_from_raw(raw: Dict[str, Any]) -> Dict[str, Any]:
 
     chash = content_hash(text)
 
-    if is_near_duplicate(text):
-        logger.info('near_duplicate', url=url, hash=chash)
+    signature = near_duplicate_index.signature(text)
+    duplicate_of = near_duplicate_index.query(signature)
+    if duplicate_of:
+        logger.info('near_duplicate', url=url, hash=chash, duplicate_of=duplicate_of)
         metrics.inc_counter('ingest_fetch_total', {'result': 'duplicate'})
         return None
 
@@ -56,6 +58,8 @@ def save_document_from_raw(raw: Dict[str, Any]) -> Dict[str, Any]:
     with open(out_path, 'w', encoding='utf8') as f:
         json.dump(doc, f, ensure_ascii=False, indent=2)
 
+    near_duplicate_index.add(chash, signature)
+
     logger.info('saved_document', url=url, path=out_path)
     metrics.inc_counter('ingest_fetch_total', {'result': 'saved'})
     metrics.inc_counter('ingest_saved_total', {'source': raw.get('source') or 'unknown'})
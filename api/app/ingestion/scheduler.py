@@ -4,6 +4,9 @@ import asyncio
 from app.configs import sources as sources_cfg
 from app.adapters.news_rss import NewsRSSAdapter
 from app.ingestion.pipeline import save_document_from_raw
+from app.ingestion.extraction import extract_text_async, shutdown_extract_executor
+from app.ingestion.dedup import near_duplicate_index
+from app.ingestion.feed_state import feed_state
 import structlog
 
 logger = structlog.get_logger()
@@ -24,8 +27,18 @@ async def run_once(source_name: str):
                 return
 
             docs = await adapter.fetch()
-            for raw in docs:
-                save_document_from_raw(raw.__dict__ if hasattr(raw, '__dict__') else raw)
+            try:
+                for raw in docs:
+                    raw = raw.__dict__ if hasattr(raw, '__dict__') else raw
+                    if raw.get('html') and not raw.get('content'):
+                        # keep HTML parsing off the event loop
+                        raw['content'] = await extract_text_async(raw['html'])
+                    save_document_from_raw(raw)
+                # entries count as seen only once they are saved
+                feed_state.commit_polls(adapter.polls)
+            finally:
+                shutdown_extract_executor()
+                near_duplicate_index.save()
             return
 
     logger.error('source_not_found', source=source_name)
@@ -0,0 +1,197 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import structlog
+
+from app import metrics
+from app.core.config import settings
+from app.services import ingest_events
+
+logger = structlog.get_logger()
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    One step of a streaming pipeline.
+
+    `func` is awaited with one item, or with a list of up to `batch_size` items
+    when batching. It returns the item to pass downstream (None drops it); a
+    batched stage returns an iterable of items instead. Each stage reads from
+    its own bounded queue, so a slow stage blocks the stages upstream of it.
+    """
+    name: str
+    func: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+    batch_size: int = 1
+    batch_linger: float = 0.0
+    queue_size: Optional[int] = None
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    queue_depth: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def to_dict(self, name: str) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "stage": name,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "items_per_sec": round(self.processed / elapsed, 2),
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class StagedPipeline:
+    """
+    Stages connected by bounded asyncio queues.
+
+    Items flow through as soon as each stage finishes with them, every stage
+    runs its own pool of workers, and a full queue makes the upstream stage
+    wait, which caps the number of items held in memory. Per-stage throughput
+    and queue depth are exported as metrics and published as ingest events.
+    """
+
+    def __init__(self, name: str, stages: List[Stage], progress_interval: Optional[float] = None):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.name = name
+        self.stages = stages
+        self.progress_interval = progress_interval or settings.INGEST_PROGRESS_INTERVAL
+        self.stats: Dict[str, StageStats] = {}
+        self._queues: List[asyncio.Queue] = []
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """Push `items` through all stages; returns what the last stage emitted"""
+        self.stats = {s.name: StageStats() for s in self.stages}
+        self._queues = [asyncio.Queue(maxsize=s.queue_size or settings.INGEST_QUEUE_SIZE) for s in self.stages]
+        results: List[Any] = []
+
+        workers = []
+        for i, stage in enumerate(self.stages):
+            out = self._queues[i + 1] if i + 1 < len(self.stages) else None
+            workers.append([
+                asyncio.create_task(self._worker(stage, self._queues[i], out, results))
+                for _ in range(max(1, stage.concurrency))
+            ])
+        reporter = asyncio.create_task(self._report_loop())
+
+        try:
+            for item in items:
+                await self._queues[0].put(item)
+            # Drain stage by stage: once a stage's workers are done, nothing more
+            # can reach the next queue, so its workers can be told to stop.
+            for i, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    await self._queues[i].put(_DONE)
+                await asyncio.gather(*stage_workers)
+        except BaseException:
+            for task in [t for stage_workers in workers for t in stage_workers]:
+                task.cancel()
+            raise
+        finally:
+            reporter.cancel()
+            self._report(final=True)
+
+        return results
+
+    async def _next_batch(self, stage: Stage, queue: asyncio.Queue) -> List[Any]:
+        item = await queue.get()
+        if item is _DONE:
+            return [item]
+        batch = [item]
+        deadline = time.perf_counter() + stage.batch_linger
+        while len(batch) < stage.batch_size:
+            try:
+                if queue.empty():
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                else:
+                    item = queue.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                # leave the stop marker for this or another worker to pick up
+                queue.put_nowait(item)
+                break
+            batch.append(item)
+        return batch
+
+    async def _worker(self, stage: Stage, queue: asyncio.Queue, out: Optional[asyncio.Queue], results: List[Any]):
+        stats = self.stats[stage.name]
+        while True:
+            if stage.batch_size > 1:
+                batch = await self._next_batch(stage, queue)
+                if batch[0] is _DONE:
+                    return
+                payload = batch
+            else:
+                payload = await queue.get()
+                if payload is _DONE:
+                    return
+                batch = [payload]
+
+            started = time.perf_counter()
+            try:
+                output = await stage.func(payload)
+                outputs = list(output or []) if stage.batch_size > 1 else [output]
+            except Exception as e:
+                logger.error("Pipeline stage failed", pipeline=self.name, stage=stage.name, error=str(e), items=len(batch))
+                stats.errors += len(batch)
+                outputs = []
+            stats.busy_seconds += time.perf_counter() - started
+            stats.processed += len(batch)
+
+            for value in outputs:
+                if value is None:
+                    continue
+                stats.emitted += 1
+                if out is None:
+                    results.append(value)
+                else:
+                    await out.put(value)
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            self._report()
+
+    def _report(self, final: bool = False):
+        snapshot = []
+        for stage, queue in zip(self.stages, self._queues):
+            stats = self.stats[stage.name]
+            stats.queue_depth = queue.qsize()
+            labels = {"pipeline": self.name, "stage": stage.name}
+            metrics.set_gauge("ingest_stage_queue_depth", stats.queue_depth, labels)
+            metrics.set_gauge("ingest_stage_items_per_second", stats.to_dict(stage.name)["items_per_sec"], labels)
+            snapshot.append(stats.to_dict(stage.name))
+
+        if final:
+            for stage in self.stages:
+                stats = self.stats[stage.name]
+                labels = {"pipeline": self.name, "stage": stage.name}
+                metrics.inc_counter("ingest_stage_items_total", {**labels, "result": "ok"}, stats.processed - stats.errors)
+                metrics.inc_counter("ingest_stage_items_total", {**labels, "result": "error"}, stats.errors)
+                metrics.inc_counter("ingest_stage_busy_ms_total", labels, int(stats.busy_seconds * 1000))
+
+        ingest_events.publish_event({
+            "type": "pipeline_progress",
+            "pipeline": self.name,
+            "final": final,
+            "stages": snapshot,
+        })
+        logger.info("Pipeline progress", pipeline=self.name, final=final, stages=snapshot)
@@ -0,0 +1,220 @@
+import hashlib
+import math
+import os
+import pickle
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import structlog
+
+from app.core.config import settings
+from app.ingestion.canonicalize import canonicalize_url
+
+logger = structlog.get_logger()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def to_dict(self) -> Dict:
+        return {"capacity": self.capacity, "error_rate": self.error_rate, "count": self.count, "bits": bytes(self.bits)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BloomFilter":
+        bf = cls(data["capacity"], data["error_rate"])
+        bf.bits = bytearray(data["bits"])
+        bf.count = data["count"]
+        return bf
+
+
+class ScalableBloomFilter:
+    """
+    Chain of Bloom filters that grows as items are added. Each new filter is
+    twice as large with a tighter error rate, so the compound false-positive
+    rate stays bounded by the configured rate.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity: int, error_rate: float):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in f for f in self.filters)
+
+    def add(self, key: str):
+        if key in self:
+            return
+        if not self.filters or self.filters[-1].is_full:
+            n = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * (self.GROWTH ** n),
+                self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING ** n)
+            ))
+        self.filters[-1].add(key)
+
+    def to_dict(self) -> Dict:
+        return {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "filters": [f.to_dict() for f in self.filters],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScalableBloomFilter":
+        sbf = cls(data["initial_capacity"], data["error_rate"])
+        sbf.filters = [BloomFilter.from_dict(f) for f in data["filters"]]
+        return sbf
+
+
+class UrlDedupIndex:
+    """
+    Time-windowed membership index of canonical article URLs.
+
+    URLs are added to the current generation; generations older than the
+    window are dropped whole, so the index forgets URLs after roughly
+    `window_hours`. A hit is only "probably seen": callers that cannot afford
+    false positives should confirm hits against the database.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_hours: Optional[float] = None,
+        generations: int = 3,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None
+    ):
+        self.path = path or settings.URL_DEDUP_PATH
+        self.window_seconds = (window_hours or settings.URL_DEDUP_WINDOW_HOURS) * 3600
+        self.generation_seconds = self.window_seconds / generations
+        self.capacity = capacity or settings.URL_DEDUP_CAPACITY
+        self.error_rate = error_rate or settings.URL_DEDUP_ERROR_RATE
+        self._lock = threading.Lock()
+        # [(generation start timestamp, filter)], oldest first
+        self._generations: Optional[List[list]] = None
+
+    def _load(self):
+        if self._generations is not None:
+            return
+        self._generations = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    data = pickle.load(f)
+                self._generations = [
+                    [g["start"], ScalableBloomFilter.from_dict(g["filter"])] for g in data["generations"]
+                ]
+            except Exception as e:
+                logger.warning("url_index_load_failed", path=self.path, error=str(e))
+
+    def _expire(self, now: float):
+        cutoff = now - self.window_seconds
+        self._generations = [g for g in self._generations if g[0] + self.generation_seconds > cutoff]
+
+    def might_contain(self, url: str, now: Optional[float] = None) -> bool:
+        key = canonicalize_url(url)
+        with self._lock:
+            self._load()
+            self._expire(now or time.time())
+            return any(key in bf for _, bf in self._generations)
+
+    def add(self, url: str, now: Optional[float] = None):
+        if not url:
+            return
+        key = canonicalize_url(url)
+        now = now or time.time()
+        with self._lock:
+            self._load()
+            self._expire(now)
+            if not self._generations or now - self._generations[-1][0] >= self.generation_seconds:
+                self._generations.append([now, ScalableBloomFilter(self.capacity, self.error_rate)])
+            self._generations[-1][1].add(key)
+
+    def filter_new(
+        self,
+        articles: List[Dict],
+        confirm: Optional[Callable[[List[str]], Iterable[str]]] = None
+    ) -> List[Dict]:
+        """
+        Drop articles whose URL was already ingested (or repeats within the batch).
+        `confirm` receives the candidate raw and canonical URLs of index hits and
+        returns those that really exist; without it, index hits are trusted.
+        """
+        hits = [a for a in articles if a.get("url") and self.might_contain(a["url"])]
+        known: Optional[Set[str]] = None
+        if hits and confirm is not None:
+            candidates = set()
+            for a in hits:
+                candidates.update({a["url"], canonicalize_url(a["url"])})
+            known = set(confirm(sorted(candidates)))
+        hit_ids = {id(a) for a in hits}
+
+        fresh = []
+        batch_seen = set()
+        for a in articles:
+            url = a.get("url")
+            if not url:
+                fresh.append(a)
+                continue
+            canonical = canonicalize_url(url)
+            if canonical in batch_seen:
+                continue
+            if id(a) in hit_ids and (known is None or url in known or canonical in known):
+                continue
+            batch_seen.add(canonical)
+            fresh.append(a)
+
+        dropped = len(articles) - len(fresh)
+        if dropped:
+            logger.info("Dropped already-ingested URLs", dropped=dropped, remaining=len(fresh))
+        return fresh
+
+    def save(self):
+        with self._lock:
+            if self._generations is None:
+                return
+            data = {"generations": [{"start": start, "filter": bf.to_dict()} for start, bf in self._generations]}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning("url_index_save_failed", path=self.path, error=str(e))
+
+# Global instance
+url_index = UrlDedupIndex()
@@ -5,6 +5,7 @@ import structlog
 
 from app.api import signals, documents, tickers, health, backtest, metrics as metrics_api, sources as sources_api, event_patterns, auth, settings as settings_api
 from app.services import ingest_events
+from app.services.rescoring import signal_rescorer
 from fastapi import Request
 from fastapi.responses import StreamingResponse
 import asyncio
@@ -17,7 +18,12 @@ logger = structlog.get_logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up API server")
+    try:
+        await signal_rescorer.resume()
+    except Exception as e:
+        logger.warning("Could not resume rescore jobs", error=str(e))
     yield
+    signal_rescorer.stop()
     logger.info("Shutting down API server")
 
 app = FastAPI(
@@ -1,9 +1,12 @@
-from typing import Dict, Tuple
+from typing import Callable, Dict, Iterable, List, Tuple
 import threading
 
 # Simple in-memory metrics registry for MVP (Prometheus text exposition)
 _metrics_lock = threading.Lock()
 _counters: Dict[Tuple[str, Tuple[Tuple[str,str], ...]], int] = {}
+_gauges: Dict[Tuple[str, Tuple[Tuple[str,str], ...]], float] = {}
+# Callables returning (name, labels, value) samples, read at scrape time
+_collectors: List[Callable[[], Iterable[Tuple[str, Dict[str,str], float]]]] = []
 
 def _labels_key(labels: Dict[str,str]) -> Tuple[Tuple[str,str], ...]:
     if not labels:
@@ -15,14 +18,32 @@ def inc_counter(name: str, labels: Dict[str,str]=None, amount: int=1):
     with _metrics_lock:
         _counters[key] = _counters.get(key, 0) + amount
 
+def set_gauge(name: str, value: float, labels: Dict[str,str]=None):
+    key = (name, _labels_key(labels or {}))
+    with _metrics_lock:
+        _gauges[key] = value
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, Dict[str,str], float]]]):
+    # For components that keep their own statistics and only need exporting on scrape
+    with _metrics_lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
 def get_metrics_text() -> str:
-    # Render counters in Prometheus exposition format
+    # Render counters and gauges in Prometheus exposition format
     lines = []
+    collected = []
+    for collector in list(_collectors):
+        try:
+            collected.extend((name, _labels_key(labels or {}), val) for name, labels, val in collector())
+        except Exception:
+            continue
     with _metrics_lock:
-        for (name, labels), val in _counters.items():
-            if labels:
-                lbls = ",".join([f'{k}="{v}"' for k,v in labels])
-                lines.append(f"{name}{{{lbls}}} {val}")
-            else:
-                lines.append(f"{name} {val}")
+        samples = [(name, labels, val) for (name, labels), val in list(_counters.items()) + list(_gauges.items())]
+    for name, labels, val in samples + collected:
+        if labels:
+            lbls = ",".join([f'{k}="{v}"' for k,v in labels])
+            lines.append(f"{name}{{{lbls}}} {val}")
+        else:
+            lines.append(f"{name} {val}")
     return "\n".join(lines) + "\n"
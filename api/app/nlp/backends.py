@@ -0,0 +1,326 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Inference backends for the transformer models of the NLP pipeline.
+# "torch" serves them through transformers / sentence-transformers as before;
+# "onnx" exports them once to ONNX (optionally int8-quantized) and serves them
+# through ONNX Runtime. Heavy libraries are imported only by the backend in use.
+
+PARITY_SAMPLES = [
+    "Acme Corp raises full-year revenue guidance after record quarterly sales.",
+    "Globex shares plunge as the company misses earnings estimates and cuts its dividend.",
+    "The board will meet on Tuesday to review the quarterly report.",
+    "Regulators opened an investigation into the bank's lending practices.",
+    "Initech announced a $2.1 billion acquisition of a cloud software rival.",
+]
+
+MAX_SEQ_LENGTH = 512
+
+
+class TorchSentimentBackend:
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self._pipe = pipeline("sentiment-analysis", model=self.model, tokenizer=self.tokenizer, device=-1)
+
+    def predict(self, texts: Sequence[str], batch_size: Optional[int] = None) -> List[Dict]:
+        """Top label and its probability per text"""
+        return self._pipe(list(texts), batch_size=batch_size or 1, truncation=True, padding=True)
+
+
+class TorchEmbeddingBackend:
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        return self.model.encode(list(texts), batch_size=batch_size or 32, convert_to_numpy=True)
+
+
+def _onnx_session(path: str):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if settings.ONNX_INTRA_OP_THREADS:
+        options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+    if settings.ONNX_INTER_OP_THREADS:
+        options.inter_op_num_threads = settings.ONNX_INTER_OP_THREADS
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def _feed(session, encoded: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {i.name: encoded[i.name].astype(np.int64) for i in session.get_inputs() if i.name in encoded}
+
+
+class OnnxSentimentBackend:
+    name = "onnx"
+
+    def __init__(self, export_dir: str, model_file: str):
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(export_dir, "backend.json"), "r", encoding="utf8") as f:
+            meta = json.load(f)
+        self.id2label = {int(k): v for k, v in meta["id2label"].items()}
+        self.max_length = meta.get("max_length", MAX_SEQ_LENGTH)
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.session = _onnx_session(os.path.join(export_dir, model_file))
+
+    def probabilities(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        texts = list(texts)
+        batch_size = batch_size or len(texts) or 1
+        out = []
+        for i in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[i:i + batch_size], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            logits = self.session.run(None, _feed(self.session, encoded))[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            out.append(exp / exp.sum(axis=1, keepdims=True))
+        return np.concatenate(out) if out else np.zeros((0, len(self.id2label)))
+
+    def predict(self, texts: Sequence[str], batch_size: Optional[int] = None) -> List[Dict]:
+        probs = self.probabilities(texts, batch_size)
+        return [{"label": self.id2label[int(p.argmax())], "score": float(p.max())} for p in probs]
+
+
+class OnnxEmbeddingBackend:
+    name = "onnx"
+
+    def __init__(self, export_dir: str, model_file: str):
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(export_dir, "backend.json"), "r", encoding="utf8") as f:
+            meta = json.load(f)
+        self.pooling = meta["pooling"]
+        self.normalize = meta["normalize"]
+        self.max_length = meta["max_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.session = _onnx_session(os.path.join(export_dir, model_file))
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        elif self.pooling == "max":
+            pooled = np.where(mask[..., None] > 0, hidden, -1e9).max(axis=1)
+        else:
+            weights = mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batch_size = batch_size or 32
+        # Same length ordering as sentence-transformers, so padded batches stay tight
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        result: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in idx], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            hidden = self.session.run(None, _feed(self.session, encoded))[0]
+            for i, vec in zip(idx, self._pool(hidden, encoded["attention_mask"])):
+                result[i] = vec
+        return np.stack(result).astype(np.float32)
+
+
+def _export_dir(kind: str, model_name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_")
+    return os.path.join(settings.ONNX_CACHE_DIR, kind, slug)
+
+
+def _model_file() -> str:
+    return "model.int8.onnx" if settings.ONNX_QUANTIZE else "model.onnx"
+
+
+def export_onnx(model, tokenizer, path: str, output_name: str, opset: int = 14):
+    """Export a transformers model with dynamic batch and sequence axes"""
+    import torch
+
+    model.eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {n: {0: "batch", 1: "sequence"} for n in input_names}
+    dynamic_axes[output_name] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            ({n: sample[n] for n in input_names},),
+            path,
+            input_names=input_names,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+
+
+def quantize_onnx(src: str, dst: str):
+    """Dynamic int8 quantization of the weights (activations stay float)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+
+
+def _build(export_dir: str, export, meta: Dict):
+    os.makedirs(export_dir, exist_ok=True)
+    fp32 = os.path.join(export_dir, "model.onnx")
+    export(fp32)
+    if settings.ONNX_QUANTIZE:
+        quantize_onnx(fp32, os.path.join(export_dir, "model.int8.onnx"))
+    with open(os.path.join(export_dir, "backend.json"), "w", encoding="utf8") as f:
+        json.dump(meta, f)
+
+
+def _read_meta(export_dir: str) -> Dict:
+    path = os.path.join(export_dir, "backend.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def _record_parity(export_dir: str, ok: bool):
+    meta = _read_meta(export_dir)
+    meta.setdefault("parity", {})[_model_file()] = ok
+    with open(os.path.join(export_dir, "backend.json"), "w", encoding="utf8") as f:
+        json.dump(meta, f)
+
+
+def sentiment_parity(reference, candidate, texts: Iterable[str] = PARITY_SAMPLES, atol: Optional[float] = None) -> bool:
+    """Same top label and a top-label probability within `atol` on every sample"""
+    atol = settings.ONNX_PARITY_ATOL if atol is None else atol
+    texts = list(texts)
+    for text, ref, cand in zip(texts, reference.predict(texts), candidate.predict(texts)):
+        if ref["label"].lower() != cand["label"].lower() or abs(ref["score"] - cand["score"]) > atol:
+            logger.warning("Sentiment backend parity mismatch", text=text[:80], reference=ref, candidate=cand)
+            return False
+    return True
+
+
+def embedding_parity(reference, candidate, texts: Iterable[str] = PARITY_SAMPLES, min_cosine: Optional[float] = None) -> bool:
+    """Cosine similarity between reference and candidate embeddings of at least `min_cosine`"""
+    min_cosine = settings.ONNX_PARITY_MIN_COSINE if min_cosine is None else min_cosine
+    texts = list(texts)
+    ref = np.asarray(reference.encode(texts), dtype=np.float64)
+    cand = np.asarray(candidate.encode(texts), dtype=np.float64)
+    if ref.shape != cand.shape:
+        logger.warning("Embedding backend parity mismatch", reference_shape=ref.shape, candidate_shape=cand.shape)
+        return False
+    cos = (ref * cand).sum(axis=1) / np.clip(np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1), 1e-12, None)
+    if cos.min() < min_cosine:
+        logger.warning("Embedding backend parity mismatch", min_cosine=float(cos.min()), required=min_cosine)
+        return False
+    return True
+
+
+def _load_onnx(kind: str, model_name: str, onnx_cls, torch_cls, build, parity):
+    """
+    Serve `model_name` from its ONNX export, building and parity-checking it
+    against the torch model on first use. Falls back to torch if the export
+    is unavailable or did not match.
+    """
+    export_dir = _export_dir(kind, model_name)
+    model_file = _model_file()
+    try:
+        meta = _read_meta(export_dir)
+        if meta.get("parity", {}).get(model_file) is False:
+            logger.warning("ONNX export failed its parity check earlier, using torch", model=model_name)
+            return torch_cls(model_name)
+
+        if not os.path.exists(os.path.join(export_dir, model_file)):
+            logger.info("Exporting model to ONNX", model=model_name, quantize=settings.ONNX_QUANTIZE)
+            reference = torch_cls(model_name)
+            build(reference, export_dir)
+            backend = onnx_cls(export_dir, model_file)
+            if settings.ONNX_PARITY_CHECK:
+                ok = parity(reference, backend)
+                _record_parity(export_dir, ok)
+                if not ok:
+                    logger.error("ONNX backend failed parity check, using torch", model=model_name)
+                    return reference
+            return backend
+
+        return onnx_cls(export_dir, model_file)
+    except Exception as e:
+        logger.warning("ONNX backend unavailable, using torch", model=model_name, error=str(e))
+        return torch_cls(model_name)
+
+
+def _build_sentiment(reference: TorchSentimentBackend, export_dir: str):
+    model, tokenizer = reference.model, reference.tokenizer
+    tokenizer.save_pretrained(export_dir)
+    _build(
+        export_dir,
+        lambda path: export_onnx(model, tokenizer, path, "logits"),
+        {
+            "id2label": {str(k): v for k, v in model.config.id2label.items()},
+            "max_length": min(tokenizer.model_max_length or MAX_SEQ_LENGTH, MAX_SEQ_LENGTH),
+        }
+    )
+
+
+def _build_embedding(reference: TorchEmbeddingBackend, export_dir: str):
+    from sentence_transformers import models as st_models
+
+    st = reference.model
+    transformer = st[0]
+    pooling = next((m for m in st if isinstance(m, st_models.Pooling)), None)
+    if pooling is None or pooling.pooling_mode_mean_tokens:
+        mode = "mean"
+    elif pooling.pooling_mode_cls_token:
+        mode = "cls"
+    elif pooling.pooling_mode_max_tokens:
+        mode = "max"
+    else:
+        raise ValueError("unsupported sentence-transformers pooling mode")
+    if any(not isinstance(m, (st_models.Transformer, st_models.Pooling, st_models.Normalize)) for m in st):
+        raise ValueError("unsupported sentence-transformers module")
+
+    transformer.tokenizer.save_pretrained(export_dir)
+    _build(
+        export_dir,
+        lambda path: export_onnx(transformer.auto_model, transformer.tokenizer, path, "last_hidden_state"),
+        {
+            "pooling": mode,
+            "normalize": any(isinstance(m, st_models.Normalize) for m in st),
+            "max_length": st.max_seq_length,
+        }
+    )
+
+
+def load_sentiment_backend(model_name: str, backend: Optional[str] = None):
+    backend = backend or settings.FINBERT_BACKEND
+    if backend == "onnx":
+        return _load_onnx("sentiment", model_name, OnnxSentimentBackend, TorchSentimentBackend, _build_sentiment, sentiment_parity)
+    return TorchSentimentBackend(model_name)
+
+
+def load_embedding_backend(model_name: str, backend: Optional[str] = None):
+    backend = backend or settings.EMBED_BACKEND
+    if backend == "onnx":
+        return _load_onnx("embedding", model_name, OnnxEmbeddingBackend, TorchEmbeddingBackend, _build_embedding, embedding_parity)
+    return TorchEmbeddingBackend(model_name)
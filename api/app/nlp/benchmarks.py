@@ -0,0 +1,114 @@
+"""
+Throughput benchmarks for the NLP stages.
+
+    python -m app.nlp.benchmarks ner --docs 500 --n-process 4
+    python -m app.nlp.benchmarks events --docs 500
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.nlp import ner
+
+logger = structlog.get_logger()
+
+
+def sample_corpus(n_docs: int) -> List[str]:
+    """`n_docs` news-like texts built from the mock articles"""
+    from app.flows.mock_articles import MOCK_ARTICLES
+
+    bodies = [" ".join(a["content"].split()) for a in MOCK_ARTICLES]
+    return [" ".join(bodies[(i + j) % len(bodies)] for j in range(3)) for i in range(n_docs)]
+
+
+def _time(run: Callable[[], List[List[Dict]]], n_docs: int) -> Dict:
+    started = time.perf_counter()
+    output = run()
+    elapsed = time.perf_counter() - started
+    return {"seconds": round(elapsed, 3), "docs_per_sec": round(n_docs / elapsed, 1) if elapsed else None, "output": output}
+
+
+def benchmark_ner(n_docs: int = 500, n_process: int = 2, batch_size: Optional[int] = None) -> Dict:
+    """
+    docs/sec of entity extraction for the full en_core_web_sm pipeline (as
+    before), the NER-only pipeline, and the NER-only pipeline fanned out over
+    `n_process` processes, plus whether the entities agree with the baseline.
+    """
+    texts = sample_corpus(n_docs)
+    batch_size = batch_size or settings.SPACY_BATCH_SIZE
+    full = ner.load_ner(ner_only=False)
+    trimmed = ner.load_ner(ner_only=True)
+
+    runs = {
+        "full": _time(lambda: [ner.entities_from_doc(d) for d in full.pipe(texts, batch_size=batch_size)], n_docs),
+        "ner_only": _time(lambda: ner.extract_entities_batch(trimmed, texts, batch_size=batch_size, n_process=1), n_docs),
+        f"ner_only_x{n_process}": _time(
+            lambda: ner.extract_entities_batch(trimmed, texts, batch_size=batch_size, n_process=n_process), n_docs
+        ),
+    }
+    baseline = runs["full"]["output"]
+    report = {"docs": n_docs, "batch_size": batch_size, "pipelines": {}}
+    for name, run in runs.items():
+        report["pipelines"][name] = {
+            "seconds": run["seconds"],
+            "docs_per_sec": run["docs_per_sec"],
+            "speedup": round(runs["full"]["seconds"] / run["seconds"], 2) if run["seconds"] else None,
+            "same_entities": run["output"] == baseline,
+        }
+    return report
+
+
+def benchmark_events(n_docs: int = 500) -> Dict:
+    """
+    docs/sec of event extraction scanning every pattern over the whole text
+    (as before), with the literal prefilter only skipping patterns, and with
+    scans restricted to the literal hits, plus whether the events agree.
+    """
+    from datetime import datetime
+    from app.nlp.events import EventExtractor
+
+    texts = sample_corpus(n_docs)
+    now = datetime(2024, 1, 2)
+    full = EventExtractor()
+    full._required = {key: None for key in full._required}
+    prefilter = EventExtractor()
+    prefilter._offsets = {key: None for key in prefilter._offsets}
+    windowed = EventExtractor()
+
+    runs = {
+        name: _time(lambda e=extractor: [e.extract_events(t, now) for t in texts], n_docs)
+        for name, extractor in (("full", full), ("prefilter", prefilter), ("windowed", windowed))
+    }
+    baseline = runs["full"]["output"]
+    report = {"docs": n_docs, "extractors": {}}
+    for name, run in runs.items():
+        report["extractors"][name] = {
+            "seconds": run["seconds"],
+            "docs_per_sec": run["docs_per_sec"],
+            "speedup": round(runs["full"]["seconds"] / run["seconds"], 2) if run["seconds"] else None,
+            "same_events": run["output"] == baseline,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLP throughput benchmarks")
+    parser.add_argument("stage", choices=["ner", "events"])
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--n-process", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.stage == "events":
+        report = benchmark_events(n_docs=args.docs)
+    else:
+        report = benchmark_ner(n_docs=args.docs, n_process=args.n_process, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
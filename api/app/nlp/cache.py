@@ -0,0 +1,228 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import structlog
+
+from app import metrics
+from app.core.config import settings
+from app.nlp.ner import SPACY_MODEL
+
+logger = structlog.get_logger()
+
+# Bump when the shape or meaning of cached results changes
+CACHE_VERSION = 1
+
+
+def _backend_tag(backend: str) -> str:
+    # the ONNX backend runs model.int8.onnx or model.onnx, whose outputs differ
+    if backend == "onnx":
+        return f"onnx:{'int8' if settings.ONNX_QUANTIZE else 'fp32'}"
+    return backend
+
+
+def model_fingerprint() -> str:
+    """Identifies the models (and backends) that produced a result"""
+    return "|".join([
+        f"v{CACHE_VERSION}",
+        f"{SPACY_MODEL}:{settings.SPACY_MAX_CHARS}:{settings.SPACY_MAX_TOKENS}",
+        f"{settings.FINBERT_MODEL}@{_backend_tag(settings.FINBERT_BACKEND)}",
+        f"{settings.EMBED_MODEL}@{_backend_tag(settings.EMBED_BACKEND)}",
+    ])
+
+
+def _encode(result: Dict) -> bytes:
+    # Embeddings are stored as float32 bytes: exact for model output, a fraction of the JSON size
+    payload = dict(result)
+    payload["embedding"] = base64.b64encode(np.asarray(result["embedding"], dtype=np.float32).tobytes()).decode("ascii")
+    return json.dumps(payload, separators=(",", ":")).encode("utf8")
+
+
+def _decode(raw: bytes) -> Dict:
+    payload = json.loads(raw)
+    payload["embedding"] = np.frombuffer(base64.b64decode(payload["embedding"]), dtype=np.float32).tolist()
+    return payload
+
+
+class NLPResultCache:
+    """
+    Content-addressed cache of NLP pipeline results.
+
+    Results are keyed by the SHA-256 of the text plus the model fingerprint, so
+    a model change never serves stale output. The disk tier is a SQLite file
+    bounded to `max_bytes` (least recently used rows are evicted); the
+    optional Redis tier is shared between workers and expires entries by TTL.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        use_redis: Optional[bool] = None,
+        redis_ttl: Optional[int] = None
+    ):
+        self.path = path or settings.NLP_CACHE_PATH
+        self.max_bytes = max_bytes or settings.NLP_CACHE_MAX_BYTES
+        self.use_redis = settings.NLP_CACHE_REDIS if use_redis is None else use_redis
+        self.redis_ttl = redis_ttl or settings.NLP_CACHE_REDIS_TTL
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._redis = None
+        self._size: Optional[int] = None
+
+    def key(self, text: str) -> str:
+        content_hash = hashlib.sha256(text.encode("utf8")).hexdigest()
+        return hashlib.sha256(f"{content_hash}|{model_fingerprint()}".encode("utf8")).hexdigest()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_results ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_nlp_results_accessed ON nlp_results (accessed_at)")
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM nlp_results").fetchone()[0]
+        return self._conn
+
+    def _redis_client(self):
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                self._redis = redis.from_url(settings.REDIS_URL)
+            except Exception as e:
+                logger.warning("NLP cache Redis tier unavailable", error=str(e))
+                self.use_redis = False
+                return None
+        return self._redis
+
+    def get_many(self, texts: List[str]) -> List[Optional[Dict]]:
+        """Cached results in input order, None for misses"""
+        keys = [self.key(t) for t in texts]
+        found: Dict[str, bytes] = {}
+
+        try:
+            with self._lock:
+                db = self._db()
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    rows = db.execute(
+                        f"SELECT key, payload FROM nlp_results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    found.update(rows)
+                if found:
+                    db.executemany("UPDATE nlp_results SET accessed_at = ? WHERE key = ?", [(time.time(), k) for k in found])
+                    db.commit()
+        except Exception as e:
+            logger.warning("NLP cache disk read failed", error=str(e))
+        disk_hits = len(found)
+
+        redis_hits = {}
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        client = self._redis_client() if missing else None
+        if client is not None:
+            try:
+                for k, raw in zip(missing, client.mget([f"nlp:{k}" for k in missing])):
+                    if raw is not None:
+                        redis_hits[k] = raw
+                if redis_hits:
+                    # promote to the local tier
+                    self._put_disk(redis_hits)
+                    found.update(redis_hits)
+            except Exception as e:
+                logger.warning("NLP cache Redis read failed", error=str(e))
+
+        metrics.inc_counter("nlp_cache_total", {"tier": "disk", "result": "hit"}, disk_hits)
+        metrics.inc_counter("nlp_cache_total", {"tier": "redis", "result": "hit"}, len(redis_hits))
+        metrics.inc_counter("nlp_cache_total", {"result": "miss"}, len(set(keys)) - len(found))
+
+        results = []
+        for k in keys:
+            raw = found.get(k)
+            try:
+                results.append(_decode(raw) if raw is not None else None)
+            except Exception:
+                results.append(None)
+        return results
+
+    def get(self, text: str) -> Optional[Dict]:
+        return self.get_many([text])[0]
+
+    def put_many(self, texts: List[str], results: List[Dict]):
+        entries = {}
+        for text, result in zip(texts, results):
+            try:
+                entries[self.key(text)] = _encode(result)
+            except Exception as e:
+                logger.warning("NLP cache could not encode result", error=str(e))
+        if not entries:
+            return
+        self._put_disk(entries)
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for k, raw in entries.items():
+                    pipe.set(f"nlp:{k}", raw, ex=self.redis_ttl)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("NLP cache Redis write failed", error=str(e))
+
+    def put(self, text: str, result: Dict):
+        self.put_many([text], [result])
+
+    def _put_disk(self, entries: Dict[str, bytes]):
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                for k, raw in entries.items():
+                    old = db.execute("SELECT size FROM nlp_results WHERE key = ?", (k,)).fetchone()
+                    db.execute(
+                        "INSERT OR REPLACE INTO nlp_results (key, payload, size, accessed_at) VALUES (?, ?, ?, ?)",
+                        (k, raw, len(raw), now)
+                    )
+                    self._size += len(raw) - (old[0] if old else 0)
+                if self._size > self.max_bytes:
+                    self._evict(db)
+                db.commit()
+        except Exception as e:
+            logger.warning("NLP cache disk write failed", error=str(e))
+
+    def _evict(self, db: sqlite3.Connection):
+        # Drop least recently used rows until 90% of the budget, leaving room before the next eviction
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        # other workers may share the file, so recount before deciding what to drop
+        self._size = db.execute("SELECT COALESCE(SUM(size), 0) FROM nlp_results").fetchone()[0]
+        rows = db.execute("SELECT key, size FROM nlp_results ORDER BY accessed_at").fetchall()
+        for k, size in rows:
+            if self._size <= target:
+                break
+            db.execute("DELETE FROM nlp_results WHERE key = ?", (k,))
+            self._size -= size
+            evicted += 1
+        metrics.inc_counter("nlp_cache_evictions_total", amount=evicted)
+        logger.info("Evicted NLP cache entries", evicted=evicted, size_bytes=self._size)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Global instance
+nlp_cache = NLPResultCache()
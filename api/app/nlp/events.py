@@ -1,10 +1,20 @@
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 import structlog
 import json
 from pathlib import Path
 
+from app import metrics
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
 logger = structlog.get_logger()
 
 CONFIG_PATH = Path(__file__).parents[1] / "configs" / "event_patterns.json"
@@ -29,8 +39,135 @@ def _save_patterns(data: Dict[str, List[str]]):
         logger.exception("Failed to save event patterns")
 
 
+# Characters that IGNORECASE matches but str.lower() leaves alone (dotless i, long s);
+# folded before the literal prefilter so it never misses a regex match
+_PREFILTER_FOLD = str.maketrans({"\u0131": "i", "\u017f": "s"})
+
+
+# Literal offsets (from the match start) wider than this are treated as unbounded
+_MAX_LITERAL_OFFSET = 1000
+
+
+def _trie_regex(literals: Set[str]) -> str:
+    """
+    Alternation over `literals` with common prefixes factored out, so the
+    cost per position grows with literal length rather than literal count.
+    Greedy optional suffixes make it match the longest literal at a position.
+    """
+    trie: Dict[str, dict] = {}
+    for lit in literals:
+        node = trie
+        for ch in lit:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def _literal_char(code: int) -> Optional[str]:
+    ch = chr(code)
+    return ch.lower() if ch.isascii() else None
+
+
+def _required_literals(items) -> Optional[Tuple[Set[str], Optional[Tuple[int, int]]]]:
+    """
+    A set of lowercase literals such that any match of the parsed pattern
+    `items` contains at least one of them, with the (min, max) offset from
+    the match start at which that literal begins, None when unbounded; or
+    None when no such set is known. Prefers candidates with a bounded offset,
+    then the most selective (longest shortest literal).
+    """
+    candidates: List[Tuple[Set[str], Optional[Tuple[int, int]]]] = []
+    run = ""
+    run_start = 0
+
+    def shifted(k: int, literals: Set[str], offsets: Optional[Tuple[int, int]]):
+        # offsets relative to items[k] -> relative to the start of items
+        if offsets is None:
+            return literals, None
+        lo, hi = items[:k].getwidth() if k else (0, 0)
+        lo, hi = lo + offsets[0], hi + offsets[1]
+        return literals, ((lo, hi) if hi <= _MAX_LITERAL_OFFSET else None)
+
+    def close_run():
+        nonlocal run
+        if run:
+            candidates.append(shifted(run_start, {run}, (0, 0)))
+        run = ""
+
+    for k, (op, av) in enumerate(items):
+        if op is sre_constants.LITERAL:
+            ch = _literal_char(av)
+            if ch is not None:
+                if not run:
+                    run_start = k
+                run += ch
+                continue
+            close_run()
+        elif op is sre_constants.SUBPATTERN:
+            close_run()
+            sub = _required_literals(av[-1])
+            if sub:
+                candidates.append(shifted(k, *sub))
+        elif op is sre_constants.BRANCH:
+            close_run()
+            alternatives: Set[str] = set()
+            offsets: Optional[Tuple[int, int]] = None
+            bounded = True
+            for branch in av[1]:
+                sub = _required_literals(branch)
+                if not sub:
+                    alternatives = set()
+                    break
+                alternatives |= sub[0]
+                if sub[1] is None:
+                    bounded = False
+                elif offsets is None:
+                    offsets = sub[1]
+                else:
+                    offsets = (min(offsets[0], sub[1][0]), max(offsets[1], sub[1][1]))
+            if alternatives:
+                candidates.append(shifted(k, alternatives, offsets if bounded else None))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) or op.name == "POSSESSIVE_REPEAT":
+            close_run()
+            low, _, body = av
+            if low >= 1:
+                # the first repetition holds one at the body's own offset
+                sub = _required_literals(body)
+                if sub:
+                    candidates.append(shifted(k, *sub))
+        elif op is sre_constants.ASSERT or op.name == "ATOMIC_GROUP":
+            # a positive lookaround / atomic group still needs its text to be present
+            close_run()
+            lookbehind = op is sre_constants.ASSERT and av[0] < 0
+            sub = _required_literals(av[-1] if op is sre_constants.ASSERT else av)
+            if sub:
+                candidates.append(shifted(k, sub[0], None if lookbehind else sub[1]))
+        elif op is sre_constants.AT:
+            # zero-width anchors do not break a literal run
+            continue
+        else:
+            close_run()
+    close_run()
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (c[1] is not None, min(len(x) for x in c[0])))
+
+
 class EventExtractor:
     def __init__(self):
+        # (event_type, pattern) -> [runs, skipped, matches, seconds]; kept across reloads
+        self._stats: Dict[Tuple[str, str], List[float]] = {}
+        self._stats_lock = threading.Lock()
+        
         # Load patterns from config; fallback to built-ins if missing
         loaded = _load_patterns()
         if loaded:
@@ -127,7 +264,80 @@ class EventExtractor:
                 ]
             except re.error:
                 logger.exception("Invalid regex in patterns for %s", event_type)
-
+        self._compile_prefilter()
+        
+        current = {(t, p.pattern) for t, compiled in self.compiled_patterns.items() for p in compiled}
+        with self._stats_lock:
+            self._stats = {key: self._stats.get(key, [0, 0, 0, 0.0]) for key in current}
+    
+    def _compile_prefilter(self):
+        """
+        One trigger regex over the required literals of every pattern. A pattern
+        whose literals do not occur in the text cannot match, so it is skipped;
+        a pattern whose literal sits at a bounded offset from the match start
+        is only tried at the starts its literal hits allow (see
+        _windowed_finditer). Results are identical to running every pattern
+        over the whole text.
+        """
+        self._required: Dict[Tuple[str, int], Optional[Set[str]]] = {}
+        self._offsets: Dict[Tuple[str, int], Optional[Tuple[int, int]]] = {}
+        literals: Set[str] = set()
+        for event_type, compiled in self.compiled_patterns.items():
+            for i, pattern in enumerate(compiled):
+                try:
+                    required, offsets = _required_literals(sre_parse.parse(pattern.pattern, pattern.flags)) or (None, None)
+                except Exception:
+                    required, offsets = None, None
+                self._required[(event_type, i)] = required
+                self._offsets[(event_type, i)] = offsets
+                literals |= required or set()
+        
+        # Lookahead reports a literal at every position, overlaps included; the
+        # longest literal wins at a position, and the shorter literals that are
+        # its prefixes are recovered through the prefix closure.
+        self._trigger = re.compile("(?=(" + _trie_regex(literals) + "))") if literals else None
+        self._prefix_closure = {
+            lit: {other for other in literals if lit.startswith(other)} for lit in literals
+        }
+    
+    def _literal_positions(self, text_lower: str) -> Dict[str, List[int]]:
+        """Start positions of every required literal in the text, ascending"""
+        if self._trigger is None:
+            return {}
+        positions: Dict[str, List[int]] = {}
+        for match in self._trigger.finditer(text_lower.translate(_PREFILTER_FOLD)):
+            start = match.start()
+            for lit in self._prefix_closure[match.group(1)]:
+                positions.setdefault(lit, []).append(start)
+        return positions
+    
+    @staticmethod
+    def _windowed_finditer(pattern, text: str, hits: List[int], offsets: Tuple[int, int]):
+        """
+        The matches of pattern.finditer(text), trying only the starts that
+        literal hits allow: a match whose literal begins at `hit` starts within
+        [hit - max offset, hit - min offset]. Candidate starts are tried in
+        ascending order with pattern.match, which decides exactly as the
+        search does at that position, over the whole text.
+        """
+        windows: List[List[int]] = []
+        for lo, hi in sorted((max(0, hit - offsets[1]), hit - offsets[0]) for hit in hits):
+            if windows and lo <= windows[-1][1] + 1:
+                windows[-1][1] = max(windows[-1][1], hi)
+            else:
+                windows.append([lo, hi])
+        
+        pos = 0
+        for lo, hi in windows:
+            start = max(lo, pos)
+            while start <= hi:
+                match = pattern.match(text, start)
+                if match is None:
+                    start += 1
+                    continue
+                yield match
+                pos = start = match.end() if match.end() > start else start + 1
+    
     def reload_patterns(self):
         loaded = _load_patterns()
         if loaded:
@@ -143,10 +353,25 @@ class EventExtractor:
     def extract_events(self, text: str, document_time: datetime, tickers: List[str] = None) -> List[Dict]:
         events = []
         text_lower = text.lower()
+        positions = self._literal_positions(text_lower)
+        timings = []
         
         for event_type, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                matches = pattern.finditer(text_lower)
+            for i, pattern in enumerate(patterns):
+                required = self._required.get((event_type, i))
+                offsets = self._offsets.get((event_type, i))
+                hits = None
+                if required is not None:
+                    hits = [pos for lit in required for pos in positions.get(lit, ())]
+                    if not hits:
+                        timings.append((event_type, pattern.pattern, None, 0))
+                        continue
+                started = time.perf_counter()
+                if hits and offsets is not None:
+                    matches = list(self._windowed_finditer(pattern, text_lower, hits, offsets))
+                else:
+                    matches = list(pattern.finditer(text_lower))
+                timings.append((event_type, pattern.pattern, time.perf_counter() - started, len(matches)))
                 for match in matches:
                     # Extract context around match
                     start = max(0, match.start() - 100)
@@ -174,11 +399,58 @@ class EventExtractor:
                     
                     events.append(event)
         
+        self._record(timings)
+        
         # Deduplicate similar events
         events = self._deduplicate_events(events)
         
         return events
     
+    def _record(self, timings: List[Tuple[str, str, Optional[float], int]]):
+        with self._stats_lock:
+            for event_type, pattern, elapsed, matched in timings:
+                stats = self._stats.get((event_type, pattern))
+                if stats is None:
+                    continue
+                if elapsed is None:
+                    stats[1] += 1
+                else:
+                    stats[0] += 1
+                    stats[2] += matched
+                    stats[3] += elapsed
+    
+    def pattern_stats(self) -> List[Dict]:
+        """Per-pattern counters since start (or since the pattern was added), most expensive first"""
+        with self._stats_lock:
+            items = [(key, list(values)) for key, values in self._stats.items()]
+        rows = [
+            {
+                "event_type": event_type,
+                "pattern": pattern,
+                "runs": runs,
+                "skipped": skipped,
+                "matches": matches,
+                "total_ms": round(seconds * 1000, 3),
+                "mean_us": round(seconds * 1e6 / runs, 2) if runs else 0.0
+            }
+            for (event_type, pattern), (runs, skipped, matches, seconds) in items
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+    
+    def collect_metrics(self):
+        # Pattern text is unbounded, so series are labelled by position within the event type
+        index = {
+            (event_type, p.pattern): str(i)
+            for event_type, compiled in self.compiled_patterns.items()
+            for i, p in enumerate(compiled)
+        }
+        for row in self.pattern_stats():
+            labels = {"event_type": row["event_type"], "pattern": index.get((row["event_type"], row["pattern"]), "")}
+            yield "event_pattern_runs_total", labels, row["runs"]
+            yield "event_pattern_skipped_total", labels, row["skipped"]
+            yield "event_pattern_matches_total", labels, row["matches"]
+            yield "event_pattern_seconds_total", labels, round(row["total_ms"] / 1000, 6)
+    
     def _extract_ticker_from_context(self, context: str, known_tickers: List[str] = None) -> Optional[str]:
         if not known_tickers:
             return None
@@ -253,4 +525,5 @@ class EventExtractor:
         return unique_events
 
 # Global instance
-event_extractor = EventExtractor()
\ No newline at end of file
+event_extractor = EventExtractor()
+metrics.register_collector(event_extractor.collect_metrics)
\ No newline at end of file
@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+SPACY_MODEL = "en_core_web_sm"
+
+ENTITY_LABELS = {"ORG", "PERSON", "GPE", "MONEY", "PERCENT", "DATE"}
+
+# Components of en_core_web_sm that do not feed the entity recognizer. The NER
+# has its own internal tok2vec; the shared tok2vec only feeds tagger and parser,
+# so dropping all of these leaves doc.ents unchanged.
+NON_NER_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+
+def load_ner(ner_only: Optional[bool] = None):
+    """Load the spaCy model, trimmed to tokenizer + ner unless `ner_only` is False"""
+    import spacy
+
+    ner_only = settings.SPACY_NER_ONLY if ner_only is None else ner_only
+    exclude = NON_NER_COMPONENTS if ner_only else []
+    try:
+        return spacy.load(SPACY_MODEL, exclude=exclude)
+    except OSError:
+        logger.warning("spaCy model not found, downloading...")
+        import subprocess
+        subprocess.run(["python", "-m", "spacy", "download", SPACY_MODEL])
+        return spacy.load(SPACY_MODEL, exclude=exclude)
+
+
+def apply_budget(nlp, text: str, max_chars: Optional[int] = None, max_tokens: Optional[int] = None):
+    """
+    Cut a document to the per-document budget: `max_chars` characters, then
+    `max_tokens` tokens. Returns the text, or a tokenized prefix Doc when the
+    token budget applies; either way entity offsets match the original text.
+    """
+    max_chars = max_chars or settings.SPACY_MAX_CHARS
+    max_tokens = settings.SPACY_MAX_TOKENS if max_tokens is None else max_tokens
+    text = text[:max_chars]
+    if not max_tokens:
+        return text
+    doc = nlp.make_doc(text)
+    if len(doc) <= max_tokens:
+        return doc
+    return doc[:max_tokens].as_doc()
+
+
+def entities_from_doc(doc) -> List[Dict]:
+    return [
+        {
+            "text": ent.text,
+            "type": ent.label_,
+            "start": ent.start_char,
+            "end": ent.end_char
+        }
+        for ent in doc.ents
+        if ent.label_ in ENTITY_LABELS
+    ]
+
+
+def extract_entities(nlp, text: str) -> List[Dict]:
+    return entities_from_doc(nlp(apply_budget(nlp, text)))
+
+
+def extract_entities_batch(
+    nlp,
+    texts: Iterable[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None
+) -> List[List[Dict]]:
+    """
+    Entities for many texts through one nlp.pipe. Jobs of at least
+    SPACY_MULTIPROCESS_MIN_DOCS texts fan out to `n_process` worker processes;
+    smaller batches stay in process, where forking would cost more than it saves.
+    """
+    texts = list(texts)
+    batch_size = batch_size or settings.SPACY_BATCH_SIZE
+    if n_process is None:
+        n_process = settings.SPACY_N_PROCESS if len(texts) >= settings.SPACY_MULTIPROCESS_MIN_DOCS else 1
+    inputs = (apply_budget(nlp, t) for t in texts)
+    return [entities_from_doc(doc) for doc in nlp.pipe(inputs, batch_size=batch_size, n_process=max(1, n_process))]
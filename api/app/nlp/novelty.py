@@ -1,13 +1,18 @@
 import numpy as np
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import select
 import structlog
 
-from app.db.models import Document
-from sqlalchemy import true
+from app.db.models import Document, DocumentTicker, Ticker
 from app.nlp.pipeline import nlp_pipeline
+from app.core.config import settings
+from app.nlp.novelty_index import novelty_index
+from app.services.buzz import buzz_zscore
+from app.services.resolver import entity_resolver
+from app.services.embedding_store import cosine_matrix, load_embedding, similar_documents, storage_mode
 
 logger = structlog.get_logger()
 
@@ -15,6 +20,7 @@ class NoveltyCalculator:
     def __init__(self):
         self.lookback_days = 30
         self.min_similarity_threshold = 0.3
+        self.top_k = settings.NOVELTY_TOP_K
     
     def calculate_novelty(
         self,
@@ -32,34 +38,37 @@ class NoveltyCalculator:
         if embedding is None:
             embedding = nlp_pipeline.generate_embedding(text)
         
-        # Get recent documents for the same ticker
+        # Nearest recent documents for the same ticker, from the vector index
         lookback_date = published_at - timedelta(days=self.lookback_days)
         
-        recent_docs = db.query(Document).filter(
-            and_(
-                Document.published_at >= lookback_date,
-                Document.published_at < published_at,
-                Document.meta['tickers'].contains([ticker]) if ticker else true()
-            )
-        ).limit(100).all()
-        
-        if not recent_docs:
+        similarities = None
+        if settings.NOVELTY_INDEX_ENABLED and ticker:
+            similarities = novelty_index.similarities(ticker, embedding, lookback_date, published_at, self.top_k)
+        if similarities is None:
+            where = [Document.published_at >= lookback_date, Document.published_at < published_at]
+            if ticker:
+                # the ticker's documents in the window, from the (ticker_id, published_at) index
+                ticker_id = entity_resolver.lookup_ticker_id(db, ticker)
+                if ticker_id is None:
+                    # never mentioned before: nothing to be similar to
+                    return self._score([], ticker)
+                where.append(Document.id.in_(
+                    select(DocumentTicker.document_id).where(
+                        DocumentTicker.ticker_id == ticker_id,
+                        DocumentTicker.published_at >= lookback_date,
+                        DocumentTicker.published_at < published_at
+                    )
+                ))
+            neighbours = similar_documents(db, embedding, k=self.top_k, where=where)
+            similarities = [similarity for _, similarity in neighbours]
+        
+        return self._score(similarities, ticker)
+    
+    def _score(self, similarities: Sequence[float], ticker: Optional[str]) -> float:
+        if not len(similarities):
             # No recent documents, maximum novelty
             return 1.0
         
-        # Calculate cosine similarity with recent documents
-        similarities = []
-        
-        for doc in recent_docs:
-            if doc.embedding is not None:
-                # Calculate cosine similarity
-                doc_embedding = np.array(doc.embedding)
-                similarity = self._cosine_similarity(embedding, doc_embedding)
-                similarities.append(similarity)
-        
-        if not similarities:
-            return 1.0
-        
         # Calculate novelty score
         # Higher similarity means lower novelty
         max_similarity = max(similarities)
@@ -85,6 +94,109 @@ class NoveltyCalculator:
         
         return novelty
     
+    def calculate_novelty_batch(
+        self,
+        items: Sequence[Tuple[np.ndarray, Optional[str], datetime]],
+        db: Session
+    ) -> List[float]:
+        """
+        Novelty for many (embedding, ticker, published_at) items, equal to
+        calculate_novelty for each. Items the in-process index cannot answer
+        use the vector index on Postgres; elsewhere the embeddings of the
+        batch's tickers over the combined window are loaded with one query and
+        scored with one matrix multiply per ticker.
+        """
+        scores: List[Optional[float]] = [None] * len(items)
+        lookback = timedelta(days=self.lookback_days)
+        
+        remaining = []
+        for i, (embedding, ticker, published_at) in enumerate(items):
+            if settings.NOVELTY_INDEX_ENABLED and ticker:
+                similarities = novelty_index.similarities(ticker, embedding, published_at - lookback, published_at, self.top_k)
+                if similarities is not None:
+                    scores[i] = self._score(similarities, ticker)
+                    continue
+            remaining.append(i)
+        
+        if remaining and db.get_bind().dialect.name == "postgresql":
+            for i in remaining:
+                embedding, ticker, published_at = items[i]
+                scores[i] = self.calculate_novelty("", ticker, published_at, db, embedding=embedding)
+            remaining = []
+        
+        if remaining:
+            for i, score in self._score_batch_scan([items[i] for i in remaining], db).items():
+                scores[remaining[i]] = score
+        return scores
+    
+    def _score_batch_scan(
+        self,
+        items: Sequence[Tuple[np.ndarray, Optional[str], datetime]],
+        db: Session
+    ) -> Dict[int, float]:
+        lookback = timedelta(days=self.lookback_days)
+        column = {
+            "float32": Document.embedding, "halfvec": Document.embedding_half, "int8": Document.embedding_int8
+        }[storage_mode()]
+        columns = (Document.id, Document.published_at,
+                   Document.embedding, Document.embedding_half, Document.embedding_int8)
+        
+        groups: Dict[Optional[str], List[int]] = defaultdict(list)
+        for i, (_, ticker, _) in enumerate(items):
+            groups[ticker].append(i)
+        
+        def window(members: List[int]) -> Tuple[datetime, datetime]:
+            times = [items[i][2] for i in members]
+            return min(times) - lookback, max(times)
+        
+        # Only the documents of the batch's tickers, joined in SQL on the
+        # (ticker_id, published_at) index; items without a ticker compare with every document
+        candidates: Dict[Optional[str], List] = defaultdict(list)
+        symbols = [ticker for ticker in groups if ticker]
+        if symbols:
+            since, until = window([i for ticker in symbols for i in groups[ticker]])
+            for row in db.execute(
+                select(Ticker.symbol, *columns)
+                .select_from(DocumentTicker)
+                .join(Ticker, Ticker.id == DocumentTicker.ticker_id)
+                .join(Document, Document.id == DocumentTicker.document_id)
+                .where(
+                    Ticker.symbol.in_(symbols),
+                    DocumentTicker.published_at >= since,
+                    DocumentTicker.published_at < until,
+                    Document.published_at >= since,
+                    Document.published_at < until,
+                    column.isnot(None)
+                )
+            ):
+                candidates[row.symbol].append(row)
+        if None in groups:
+            since, until = window(groups[None])
+            candidates[None] = db.execute(
+                select(*columns)
+                .where(column.isnot(None), Document.published_at >= since, Document.published_at < until)
+            ).all()
+        
+        scores: Dict[int, float] = {}
+        for ticker, members in groups.items():
+            rows = candidates.get(ticker)
+            if not rows:
+                scores.update({i: self._score([], ticker) for i in members})
+                continue
+            matrix = np.stack([load_embedding(r.embedding, r.embedding_half, r.embedding_int8) for r in rows])
+            group_ids = np.array([r.id for r in rows])
+            group_times = np.array([r.published_at.timestamp() for r in rows])
+            queries = np.stack([np.asarray(items[i][0], dtype=np.float32) for i in members])
+            # one GEMM for every document of the ticker
+            sims = cosine_matrix(matrix, queries)
+            for col, i in enumerate(members):
+                published_at = items[i][2]
+                in_window = (group_times >= (published_at - lookback).timestamp()) & (group_times < published_at.timestamp())
+                candidate = sims[in_window, col]
+                order = np.lexsort((group_ids[in_window], -candidate))[:self.top_k]
+                scores[i] = self._score([float(s) for s in candidate[order]], ticker)
+        return scores
+    
     def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors"""
         dot_product = np.dot(vec1, vec2)
@@ -112,36 +224,20 @@ class NoveltyCalculator:
         ticker: str,
         published_at: datetime,
         db: Session,
-        window_hours: int = 24
+        window_hours: Optional[int] = None
     ) -> float:
         """
         Calculate buzz score based on document frequency for a ticker
         Returns normalized score between 0 and 1
         """
         
-        # Count documents in the time window
-        window_start = published_at - timedelta(hours=window_hours)
-        
-        doc_count = db.query(Document).filter(
-            and_(
-                Document.published_at >= window_start,
-                Document.published_at <= published_at,
-                Document.meta['tickers'].contains([ticker]) if ticker else true()
-            )
-        ).count()
-        
-        # Calculate z-score (simplified without historical mean/std)
-        # Use empirical thresholds
-        if doc_count <= 1:
-            buzz_z = -1.0
-        elif doc_count <= 3:
-            buzz_z = 0.0
-        elif doc_count <= 5:
-            buzz_z = 0.5
-        elif doc_count <= 10:
-            buzz_z = 1.0
-        else:
-            buzz_z = 2.0
+        # z-score of the mentions in the window against the ticker's recent history,
+        # from the hourly mention buckets maintained on ingest
+        ticker_id = entity_resolver.lookup_ticker_id(db, ticker) if ticker else None
+        if ticker and not ticker_id:
+            # never mentioned: no buzz either way
+            return 0.5
+        buzz_z = buzz_zscore(db, ticker_id, published_at, window_hours=window_hours)
         
         # Apply sigmoid to get score in [0, 1]
         buzz_score = 1 / (1 + np.exp(-buzz_z))
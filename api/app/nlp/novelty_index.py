@@ -0,0 +1,234 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.core.config import settings
+from app.db.models import Document
+from app.services.embedding_store import load_embedding, stored_embedding
+
+logger = structlog.get_logger()
+
+_EXPIRE_EVERY = timedelta(hours=1)
+
+
+class _Window:
+    """Normalized embeddings of one ticker's recent documents, in insertion order"""
+
+    __slots__ = ("ids", "times", "matrix", "size")
+
+    def __init__(self, dim: int, capacity: int = 16):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.times.nbytes + self.matrix.nbytes
+
+    def append(self, doc_id: int, ts: float, vec: np.ndarray):
+        if self.size == len(self.ids):
+            capacity = len(self.ids) * 2
+            self.ids = np.resize(self.ids, capacity)
+            self.times = np.resize(self.times, capacity)
+            matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+            matrix[:self.size] = self.matrix[:self.size]
+            self.matrix = matrix
+        self.ids[self.size] = doc_id
+        self.times[self.size] = ts
+        self.matrix[self.size] = vec
+        self.size += 1
+
+    def keep(self, mask: np.ndarray):
+        n = int(mask.sum())
+        self.ids[:n] = self.ids[:self.size][mask]
+        self.times[:n] = self.times[:self.size][mask]
+        self.matrix[:n] = self.matrix[:self.size][mask]
+        self.size = n
+
+
+def _normalize(vec: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+
+class NoveltyIndex:
+    """
+    In-process rolling window of document embeddings per ticker, so novelty
+    is one matrix-vector product instead of a database query.
+
+    The index is authoritative only after `warm` loaded the lookback window
+    from the database, for times after its horizon, and for tickers it has
+    not evicted; `similarities` returns None otherwise and the caller falls
+    back to the database. The horizon trails the newest document by the
+    lookback plus `max_article_age`, so articles published up to that long
+    before they are ingested still find their whole window in memory. It only sees documents written by this process, so
+    enable it where a single ingest worker writes documents.
+    """
+
+    def __init__(
+        self,
+        lookback_days: int = 30,
+        max_bytes: Optional[int] = None,
+        max_article_age_days: Optional[int] = None
+    ):
+        self.lookback = timedelta(days=lookback_days)
+        if max_article_age_days is None:
+            max_article_age_days = settings.NOVELTY_INDEX_MAX_ARTICLE_AGE_DAYS
+        self.max_article_age = timedelta(days=max_article_age_days)
+        self.max_bytes = max_bytes or settings.NOVELTY_INDEX_MAX_BYTES
+        self._lock = threading.Lock()
+        # ticker -> window, least recently used first
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self._evicted: Set[str] = set()
+        self._horizon: Optional[datetime] = None
+        self._newest: Optional[datetime] = None
+        self._bytes = 0
+
+    @property
+    def warmed(self) -> bool:
+        return self._horizon is not None
+
+    def warm(self, db: Session, now: Optional[datetime] = None, force: bool = False) -> int:
+        """Load the documents of the lookback window (once per process unless `force`)"""
+        if self.warmed and not force:
+            return 0
+        now = now or datetime.utcnow()
+        horizon = now - self.lookback - self.max_article_age
+        rows = db.execute(
+            select(Document.id, Document.published_at, Document.meta,
+                   Document.embedding, Document.embedding_half, Document.embedding_int8)
+            .where(Document.published_at >= horizon)
+            .order_by(Document.published_at, Document.id)
+            .execution_options(yield_per=1000)
+        )
+        with self._lock:
+            self._windows.clear()
+            self._evicted.clear()
+            self._bytes = 0
+            count = 0
+            for row in rows:
+                vec = load_embedding(row.embedding, row.embedding_half, row.embedding_int8)
+                tickers = (row.meta or {}).get("tickers") or []
+                if vec is not None and tickers:
+                    self._add(row.id, row.published_at, vec, tickers)
+                    count += 1
+            self._horizon = horizon
+            self._newest = max(self._newest or now, now)
+            self._enforce_cap()
+        logger.info("Novelty index warmed", documents=count, tickers=len(self._windows), bytes=self._bytes)
+        return count
+
+    def add(self, doc_id: int, published_at: datetime, embedding, tickers: Iterable[str]):
+        """Add a newly written document; `embedding` as stored (see stored_embedding)"""
+        if embedding is None or not self.warmed:
+            return
+        with self._lock:
+            self._add(doc_id, published_at, np.asarray(embedding, dtype=np.float32), tickers)
+            # a bad future timestamp must not expire the whole window
+            published_at = min(published_at, datetime.utcnow())
+            if self._newest is None or published_at > self._newest:
+                self._newest = published_at
+                self._expire()
+            self._enforce_cap()
+
+    def add_documents(self, docs: Iterable[Document]):
+        for doc in docs:
+            self.add(doc.id, doc.published_at, stored_embedding(doc), (doc.meta or {}).get("tickers") or [])
+
+    def discard(self, doc_ids: Iterable[int]):
+        """Remove documents whose transaction was rolled back"""
+        ids = np.fromiter(doc_ids, dtype=np.int64)
+        if not ids.size:
+            return
+        with self._lock:
+            for window in self._windows.values():
+                window.keep(~np.isin(window.ids[:window.size], ids))
+
+    def _add(self, doc_id: int, published_at: datetime, vec: np.ndarray, tickers: Iterable[str]):
+        vec = _normalize(vec)
+        ts = published_at.timestamp()
+        for ticker in dict.fromkeys(tickers):
+            if ticker in self._evicted:
+                continue
+            window = self._windows.get(ticker)
+            if window is None:
+                window = self._windows[ticker] = _Window(len(vec))
+                self._bytes += window.nbytes
+            else:
+                self._windows.move_to_end(ticker)
+            before = window.nbytes
+            window.append(doc_id, ts, vec)
+            self._bytes += window.nbytes - before
+
+    def _expire(self):
+        cutoff = self._newest - self.lookback - self.max_article_age
+        # Expired rows are only filtered out of queries, so sweeping once an hour is enough
+        if cutoff < self._horizon + _EXPIRE_EVERY:
+            return
+        # Documents older than the cutoff are dropped, so earlier windows are no longer covered
+        self._horizon = cutoff
+        ts = cutoff.timestamp()
+        for window in self._windows.values():
+            expired = window.times[:window.size] < ts
+            if expired.any():
+                window.keep(~expired)
+
+    def _enforce_cap(self):
+        while self._bytes > self.max_bytes and self._windows:
+            ticker, window = self._windows.popitem(last=False)
+            self._bytes -= window.nbytes
+            self._evicted.add(ticker)
+            logger.info("Novelty index evicted ticker", ticker=ticker, documents=window.size)
+        metrics.set_gauge("novelty_index_bytes", self._bytes)
+
+    def similarities(
+        self,
+        ticker: str,
+        embedding,
+        since: datetime,
+        until: datetime,
+        k: int
+    ) -> Optional[List[float]]:
+        """
+        Top-k cosine similarities to the ticker's documents published in
+        [since, until), best first, ties broken by document id; None when the
+        index cannot answer for this ticker and window.
+        """
+        with self._lock:
+            if not self.warmed or since < self._horizon or ticker in self._evicted:
+                metrics.inc_counter("novelty_index_total", {"result": "fallback"})
+                return None
+            metrics.inc_counter("novelty_index_total", {"result": "hit"})
+            window = self._windows.get(ticker)
+            if window is None or not window.size:
+                return []
+            self._windows.move_to_end(ticker)
+            times = window.times[:window.size]
+            mask = (times >= since.timestamp()) & (times < until.timestamp())
+            if not mask.any():
+                return []
+            sims = window.matrix[:window.size][mask] @ _normalize(np.asarray(embedding, dtype=np.float32))
+            ids = window.ids[:window.size][mask]
+        order = np.lexsort((ids, -sims))[:k]
+        return [float(s) for s in sims[order]]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "tickers": len(self._windows),
+                "documents": sum(w.size for w in self._windows.values()),
+                "bytes": self._bytes,
+                "evicted": len(self._evicted),
+                "horizon": self._horizon.isoformat() if self._horizon else None
+            }
+
+# Global instance
+novelty_index = NoveltyIndex()
@@ -0,0 +1,142 @@
+import json
+import multiprocessing
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+CORPUS_PATH = Path(__file__).parents[1] / "configs" / "event_pattern_corpus.json"
+
+# Input sizes (in copies of the base input) used to measure how cost grows with length
+_SCALES = (1, 2, 4)
+# Below this the timings are noise and no scaling verdict is drawn
+_SCALING_FLOOR_S = 0.002
+# Probe strings: a run of one character followed by a character that breaks the match,
+# the classic trigger for nested-quantifier backtracking such as (a+)+$
+_PROBE_LENGTH = 512
+_PROBE_CHARS = " a0.-"
+
+
+def load_corpus(path: Optional[Path] = None) -> List[str]:
+    try:
+        with open(path or CORPUS_PATH, "r", encoding="utf-8") as f:
+            return [str(t) for t in json.load(f)]
+    except Exception as e:
+        logger.warning("event_pattern_corpus_load_failed", error=str(e))
+        return []
+
+
+def _best_time(compiled, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in compiled.finditer(text):
+            pass
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _probes(pattern: str) -> List[str]:
+    chars = dict.fromkeys(_PROBE_CHARS + "".join(c for c in pattern.lower() if c.isalnum()))
+    return [c * _PROBE_LENGTH + "\n!" for c in list(chars)[:16]]
+
+
+def _measure(pattern: str, corpus: List[str]) -> Dict:
+    """Time over the corpus, and the worst time ratio when an input doubles in length"""
+    compiled = re.compile(pattern, re.IGNORECASE)
+    corpus_s = sum(_best_time(compiled, text.lower()) for text in corpus)
+
+    scaling = 1.0
+    inputs = ["\n".join(t.lower() for t in corpus)] + _probes(pattern)
+    for base in inputs:
+        times = [_best_time(compiled, base * n) for n in _SCALES]
+        for smaller, larger in zip(times, times[1:]):
+            if larger >= _SCALING_FLOOR_S:
+                scaling = max(scaling, larger / max(smaller, 1e-9))
+    return {"corpus_ms": round(corpus_s * 1000, 3), "scaling": round(scaling, 2)}
+
+
+def _bench_worker(conn, patterns: List[str], corpus: List[str]):
+    for pattern in patterns:
+        try:
+            conn.send((pattern, _measure(pattern, corpus)))
+        except Exception as e:
+            conn.send((pattern, {"error": str(e)}))
+    conn.close()
+
+
+def benchmark_patterns(
+    patterns: Iterable[str],
+    corpus: Optional[List[str]] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Dict]:
+    """
+    Benchmark regexes in a child process, so a pattern that backtracks
+    catastrophically can be killed instead of hanging the caller. A pattern
+    that runs longer than `timeout` seconds is reported with timed_out=True
+    and the remaining patterns continue in a fresh process.
+    """
+    remaining = list(dict.fromkeys(patterns))
+    corpus = load_corpus() if corpus is None else corpus
+    timeout = timeout or settings.EVENT_PATTERN_BENCH_TIMEOUT
+    results: Dict[str, Dict] = {}
+    ctx = multiprocessing.get_context("spawn")
+
+    while remaining:
+        parent, child = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_bench_worker, args=(child, remaining, corpus), daemon=True)
+        proc.start()
+        child.close()
+        try:
+            while remaining:
+                # the first wait also covers the child's start-up
+                wait = timeout * 2 if not results else timeout
+                if not parent.poll(wait):
+                    results[remaining.pop(0)] = {"timed_out": True}
+                    break
+                try:
+                    pattern, result = parent.recv()
+                except EOFError:
+                    # the child died on its own (not a slow pattern); do not retry endlessly
+                    results.update({p: {"error": "benchmark process exited"} for p in remaining})
+                    remaining = []
+                    break
+                results[pattern] = result
+                remaining.remove(pattern)
+        finally:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join(1)
+            parent.close()
+    return results
+
+
+def check_patterns(
+    patterns: Iterable[str],
+    budget_ms: Optional[float] = None,
+    max_scaling: Optional[float] = None
+) -> Dict[str, str]:
+    """Rejection reason for every pattern that is too slow or scales super-linearly"""
+    budget_ms = budget_ms or settings.EVENT_PATTERN_BUDGET_MS
+    max_scaling = max_scaling or settings.EVENT_PATTERN_MAX_SCALING
+    rejected = {}
+    for pattern, result in benchmark_patterns(patterns).items():
+        if result.get("timed_out"):
+            rejected[pattern] = "Timed out while benchmarking (catastrophic backtracking?)"
+        elif "error" in result:
+            rejected[pattern] = f"Benchmark failed: {result['error']}"
+        elif result["corpus_ms"] > budget_ms:
+            rejected[pattern] = f"Too slow: {result['corpus_ms']}ms over the sample corpus (budget {budget_ms}ms)"
+        elif result["scaling"] > max_scaling:
+            rejected[pattern] = (
+                f"Super-linear: time grows {result['scaling']}x when the input doubles (limit {max_scaling}x)"
+            )
+    if rejected:
+        logger.info("Rejected event patterns", rejected=len(rejected))
+    return rejected
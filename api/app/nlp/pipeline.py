@@ -1,109 +1,110 @@
-import spacy
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-from sentence_transformers import SentenceTransformer
-import torch
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 import structlog
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from app import metrics
 from app.core.config import settings
+from app.nlp.backends import load_embedding_backend, load_sentiment_backend
+from app.nlp.cache import nlp_cache
+from app.nlp import ner
+from app.nlp.tickers import ticker_matcher
 
 logger = structlog.get_logger()
 
+# spaCy, torch, transformers and sentence-transformers are imported when the
+# models are loaded, not at module import, so the API, the CLI and tests that
+# never run inference do not pay for them.
+
 class NLPPipeline:
     def __init__(self):
         self.nlp = None
         self.finbert = None
         self.embedder = None
+        self.load_times: Dict[str, float] = {}
         self._initialized = False
+        self._init_lock = threading.Lock()
     
-    def initialize(self):
-        if self._initialized:
-            return
-        
-        try:
-            # Load spaCy model
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-            except:
-                logger.warning("spaCy model not found, downloading...")
-                import subprocess
-                subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-                self.nlp = spacy.load("en_core_web_sm")
+    def _load(self, name: str, loader):
+        started = time.perf_counter()
+        model = loader()
+        elapsed = time.perf_counter() - started
+        self.load_times[name] = round(elapsed, 3)
+        metrics.set_gauge("nlp_model_load_seconds", round(elapsed, 3), {"model": name})
+        logger.info("Loaded NLP model", model=name, seconds=round(elapsed, 3))
+        return model
+    
+    def warm_up(self, parallel: Optional[bool] = None) -> Dict[str, float]:
+        """
+        Load all models now instead of on the first document. With `parallel`
+        the models load in separate threads; model loading is mostly file IO
+        and native code, so the loads overlap. Returns load times in seconds.
+        """
+        with self._init_lock:
+            if self._initialized:
+                return self.load_times
             
-            # Load FinBERT for sentiment analysis
-            logger.info("Loading FinBERT model", model=settings.FINBERT_MODEL)
-            tokenizer = AutoTokenizer.from_pretrained(settings.FINBERT_MODEL)
-            model = AutoModelForSequenceClassification.from_pretrained(settings.FINBERT_MODEL)
-            self.finbert = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=-1)
+            parallel = settings.NLP_WARMUP_PARALLEL if parallel is None else parallel
+            started = time.perf_counter()
+            loaders = {
+                "spacy": ner.load_ner,
+                # FinBERT for sentiment analysis
+                "finbert": lambda: load_sentiment_backend(settings.FINBERT_MODEL),
+                # Sentence embedder
+                "embedder": lambda: load_embedding_backend(settings.EMBED_MODEL),
+            }
+            logger.info(
+                "Loading NLP models",
+                finbert=settings.FINBERT_MODEL,
+                finbert_backend=settings.FINBERT_BACKEND,
+                embedder=settings.EMBED_MODEL,
+                embedder_backend=settings.EMBED_BACKEND,
+                parallel=parallel
+            )
             
-            # Load sentence embedder
-            logger.info("Loading sentence transformer", model=settings.EMBED_MODEL)
-            self.embedder = SentenceTransformer(settings.EMBED_MODEL)
+            try:
+                if parallel:
+                    with ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="nlp-warmup") as pool:
+                        futures = {name: pool.submit(self._load, name, loader) for name, loader in loaders.items()}
+                        models = {name: f.result() for name, f in futures.items()}
+                else:
+                    models = {name: self._load(name, loader) for name, loader in loaders.items()}
+            except Exception as e:
+                logger.error("Failed to initialize NLP pipeline", error=str(e))
+                raise
             
+            self.nlp = models["spacy"]
+            self.finbert = models["finbert"]
+            self.embedder = models["embedder"]
+            self.load_times["total"] = round(time.perf_counter() - started, 3)
             self._initialized = True
-            logger.info("NLP pipeline initialized successfully")
-        except Exception as e:
-            logger.error("Failed to initialize NLP pipeline", error=str(e))
-            raise
+            logger.info("NLP pipeline initialized successfully", load_times=self.load_times)
+            return self.load_times
+    
+    def initialize(self):
+        if self._initialized:
+            return
+        self.warm_up()
     
     def extract_entities(self, text: str) -> List[Dict]:
         if not self._initialized:
             self.initialize()
         
-        doc = self.nlp(text[:1000000])  # Limit text length for spaCy
-        entities = []
-        
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PERSON", "GPE", "MONEY", "PERCENT", "DATE"]:
-                entities.append({
-                    "text": ent.text,
-                    "type": ent.label_,
-                    "start": ent.start_char,
-                    "end": ent.end_char
-                })
+        return ner.extract_entities(self.nlp, text)
+    
+    def extract_entities_batch(self, texts: List[str], n_process: Optional[int] = None) -> List[List[Dict]]:
+        if not self._initialized:
+            self.initialize()
         
-        return entities
+        return ner.extract_entities_batch(self.nlp, texts, n_process=n_process)
     
     def extract_tickers(self, text: str, entities: List[Dict]) -> List[str]:
-        # Extract potential stock tickers from text
-        tickers = set()
-        
-        # Pattern for stock tickers (1-5 uppercase letters)
-        ticker_pattern = r'\b[A-Z]{1,5}\b'
-        
-        # Common words to exclude
-        exclude_words = {
-            'I', 'A', 'THE', 'AND', 'OR', 'BUT', 'IF', 'THEN', 'CEO', 'CFO', 'CTO',
-            'USA', 'US', 'UK', 'EU', 'NYSE', 'NASDAQ', 'SP', 'DJ', 'AI', 'ML',
-            'API', 'HTTP', 'URL', 'HTML', 'JSON', 'XML', 'PDF', 'CSV'
-        }
-        
-        # Look for ticker patterns in parentheses (common in financial text)
-        paren_pattern = r'\(([A-Z]{1,5})\)'
-        for match in re.finditer(paren_pattern, text):
-            ticker = match.group(1)
-            if ticker not in exclude_words:
-                tickers.add(ticker)
-        
-        # Look for tickers after company names
-        for entity in entities:
-            if entity["type"] == "ORG":
-                # Check text immediately after organization name
-                start_pos = entity["end"]
-                snippet = text[start_pos:start_pos+20]
-                for match in re.finditer(ticker_pattern, snippet):
-                    ticker = match.group(0)
-                    if ticker not in exclude_words and len(ticker) <= 5:
-                        tickers.add(ticker)
-        
-        # Look for common patterns like "ticker: XXXX" or "$XXXX"
-        dollar_pattern = r'\$([A-Z]{1,5})\b'
-        for match in re.finditer(dollar_pattern, text):
-            tickers.add(match.group(1))
-        
-        return list(tickers)
+        # Known symbols and company names in one automaton pass, plus unknown
+        # symbols only where the text states them explicitly ("(NASDAQ: XYZ)")
+        found = ticker_matcher.find(text)
+        return found + [s for s in ticker_matcher.discover(text) if s not in found]
     
     def analyze_sentiment(self, text: str) -> Tuple[str, float]:
         if not self._initialized:
@@ -113,34 +114,87 @@ class NLPPipeline:
         truncated_text = text[:2000]
         
         try:
-            results = self.finbert(truncated_text)
+            results = self.finbert.predict([truncated_text])
             if results:
-                result = results[0]
-                label = result['label'].lower()
-                score = result['score']
-                
-                # Map FinBERT labels to our schema
-                label_map = {
-                    'positive': 'positive',
-                    'negative': 'negative',
-                    'neutral': 'neutral'
-                }
-                
-                return label_map.get(label, 'neutral'), score
+                return self._map_sentiment(results[0])
         except Exception as e:
             logger.warning("Sentiment analysis failed", error=str(e))
         
         return 'neutral', 0.5
     
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        if not self._initialized:
+            self.initialize()
+        
+        if not texts:
+            return []
+        
+        # Length bucketing: sorting by length keeps each padded batch tight
+        truncated = [t[:2000] for t in texts]
+        order = sorted(range(len(truncated)), key=lambda i: len(truncated[i]))
+        
+        batch_size = max(1, settings.FINBERT_BATCH_SIZE)
+        sentiments: List[Tuple[str, float]] = [('neutral', 0.5)] * len(texts)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            try:
+                results = self.finbert.predict([truncated[i] for i in batch], batch_size=batch_size)
+            except Exception as e:
+                # only this batch is rescored one by one
+                logger.warning("Batched sentiment analysis failed, falling back to per-document",
+                               error=str(e), batch_size=len(batch))
+                for i in batch:
+                    sentiments[i] = self.analyze_sentiment(texts[i])
+                continue
+            for i, result in zip(batch, results):
+                sentiments[i] = self._map_sentiment(result)
+        return sentiments
+    
+    def _map_sentiment(self, result: Dict) -> Tuple[str, float]:
+        label = result['label'].lower()
+        score = result['score']
+        
+        # Map FinBERT labels to our schema
+        label_map = {
+            'positive': 'positive',
+            'negative': 'negative',
+            'neutral': 'neutral'
+        }
+        
+        return label_map.get(label, 'neutral'), score
+    
     def generate_embedding(self, text: str) -> np.ndarray:
         if not self._initialized:
             self.initialize()
         
         # Generate embedding for text
-        embedding = self.embedder.encode(text[:5000], convert_to_numpy=True)
+        embedding = self.embedder.encode([text[:5000]])[0]
         return embedding
     
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        if not self._initialized:
+            self.initialize()
+        
+        # encode() already sorts inputs by length before batching
+        return self.embedder.encode(
+            [t[:5000] for t in texts],
+            batch_size=settings.EMBED_BATCH_SIZE
+        )
+    
     def process_document(self, text: str) -> Dict:
+        if settings.NLP_CACHE_ENABLED:
+            cached = nlp_cache.get(text)
+            if cached is not None:
+                # tickers depend on the current ticker dictionary, not only on the models
+                cached["tickers"] = self.extract_tickers(text, cached["entities"])
+                return cached
+        
+        result = self._process_document(text)
+        if settings.NLP_CACHE_ENABLED:
+            nlp_cache.put(text, result)
+        return result
+    
+    def _process_document(self, text: str) -> Dict:
         if not self._initialized:
             self.initialize()
         
@@ -164,5 +218,49 @@ class NLPPipeline:
             "embedding": embedding.tolist()
         }
 
+    def process_documents(self, texts: List[str]) -> List[Dict]:
+        """
+        Batched equivalent of process_document: one spaCy pipe, batched FinBERT
+        and one embedding encode for all texts. Results are in input order.
+        Texts seen before with the same models are served from the result cache.
+        """
+        if not settings.NLP_CACHE_ENABLED:
+            return self._process_documents(texts)
+        
+        results = nlp_cache.get_many(texts)
+        missing = [i for i, r in enumerate(results) if r is None]
+        for i, result in enumerate(results):
+            if result is not None:
+                # tickers depend on the current ticker dictionary, not only on the models
+                result["tickers"] = self.extract_tickers(texts[i], result["entities"])
+        if missing:
+            computed = self._process_documents([texts[i] for i in missing])
+            nlp_cache.put_many([texts[i] for i in missing], computed)
+            for i, result in zip(missing, computed):
+                results[i] = result
+        return results
+    
+    def _process_documents(self, texts: List[str]) -> List[Dict]:
+        if not self._initialized:
+            self.initialize()
+        
+        if not texts:
+            return []
+        
+        entities_list = self.extract_entities_batch(texts)
+        sentiments = self.analyze_sentiment_batch(texts)
+        embeddings = self.generate_embeddings(texts)
+        
+        results = []
+        for text, entities, (sentiment, sentiment_score), embedding in zip(texts, entities_list, sentiments, embeddings):
+            results.append({
+                "entities": entities,
+                "tickers": self.extract_tickers(text, entities),
+                "sentiment": sentiment,
+                "sentiment_score": sentiment_score,
+                "embedding": embedding.tolist()
+            })
+        return results
+
 # Global instance
 nlp_pipeline = NLPPipeline()
\ No newline at end of file
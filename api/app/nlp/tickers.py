@@ -0,0 +1,249 @@
+import csv
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Company, Ticker
+
+logger = structlog.get_logger()
+
+# Uppercase words that are also tickers; a bare mention is not enough for these
+AMBIGUOUS_SYMBOLS = {
+    'I', 'A', 'THE', 'AND', 'OR', 'BUT', 'IF', 'THEN', 'CEO', 'CFO', 'CTO',
+    'USA', 'US', 'UK', 'EU', 'NYSE', 'NASDAQ', 'SP', 'DJ', 'AI', 'ML',
+    'API', 'HTTP', 'URL', 'HTML', 'JSON', 'XML', 'PDF', 'CSV', 'IT', 'ON', 'ALL', 'NOW', 'ONE'
+}
+
+# Legal suffixes stripped from company names to derive aliases ("Apple Inc." -> "Apple")
+_COMPANY_SUFFIX = re.compile(
+    r"[\s,]+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|llc|lp|sa|ag|nv|holdings?|group)\.?$",
+    re.IGNORECASE
+)
+_EXCHANGE_PREFIX = re.compile(r"(?:NASDAQ|NYSE|AMEX|NYSEARCA|OTC)\s*:\s*$", re.IGNORECASE)
+# The only forms in which a symbol the matcher does not know is taken as one: "(NASDAQ: XYZ)", "($XYZ)"
+_DISCOVERY = re.compile(r"\((?:(?:NASDAQ|NYSE|AMEX|NYSEARCA|OTC)\s*:\s*|\$)([A-Z]{1,5}(?:\.[A-Z])?)\)")
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: one pass over the text reports every occurrence
+    of every pattern. Patterns can be added at any time; failure links are
+    recomputed on the next search.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[str]] = [[]]
+        self._fail: List[int] = [0]
+        self._dirty = False
+
+    def add(self, pattern: str):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._out.append([])
+                self._fail.append(0)
+            node = nxt
+        if pattern not in self._out[node]:
+            self._out[node].append(pattern)
+            self._dirty = True
+
+    def _build(self):
+        self._fail = [0] * len(self._goto)
+        # own outputs only; suffix outputs are followed through the failure links at search time
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+        self._dirty = False
+
+    def iter(self, text: str) -> Iterable[Tuple[int, str]]:
+        """(end index exclusive, pattern) for every match"""
+        if self._dirty:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node
+            while hit:
+                for pattern in out[hit]:
+                    yield i + 1, pattern
+                hit = fail[hit]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+def company_aliases(name: str) -> Set[str]:
+    """The company name plus the name without its legal suffix(es)"""
+    name = " ".join((name or "").split())
+    aliases = {name} if name else set()
+    stripped = name
+    while True:
+        shorter = _COMPANY_SUFFIX.sub("", stripped).strip(" ,")
+        if shorter == stripped or not shorter:
+            break
+        stripped = shorter
+        aliases.add(stripped)
+    return {a for a in aliases if len(a) >= 3}
+
+
+class TickerMatcher:
+    """
+    Ticker and company-name recognizer compiled from the symbol master CSV
+    (symbol,name,aliases) and the vetted rows of the tickers table: those
+    with a real company. Placeholder tickers the resolver creates for
+    symbols seen in text are left out, so a bad extraction is not learned.
+
+    Symbols match case-sensitively as whole words; symbols that are short or
+    common words only count with context ("$T", "(T)", "NYSE: T"). Company
+    names and aliases map to their symbol and only match capitalized, so
+    "apple pie" is not Apple; single-word aliases also need context or a
+    capital that is not just the start of a sentence ("Target will block"
+    is neither Target nor Block).
+    """
+
+    def __init__(self, master_path: Optional[str] = None, bare_min_len: Optional[int] = None):
+        self.master_path = master_path if master_path is not None else settings.TICKER_MASTER_PATH
+        self.bare_min_len = bare_min_len or settings.TICKER_BARE_MIN_LEN
+        self._lock = threading.Lock()
+        self._automaton = AhoCorasick()
+        self._symbols: Set[str] = set()
+        # lowercased pattern -> symbols it stands for
+        self._patterns: Dict[str, Set[str]] = {}
+        self._max_ticker_id = 0
+        self._master_loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._symbols)
+
+    def add(self, symbol: str, names: Iterable[str] = ()):
+        """Register a symbol and the company names / aliases that refer to it"""
+        symbol = (symbol or "").strip().upper()
+        if not symbol:
+            return
+        with self._lock:
+            self._add(symbol, names)
+
+    def _add(self, symbol: str, names: Iterable[str]):
+        self._symbols.add(symbol)
+        patterns = {symbol.lower()}
+        for name in names:
+            # placeholder companies are named after the symbol and add nothing
+            if name:
+                patterns.update(a.lower() for a in company_aliases(name) if a.lower() != symbol.lower())
+        for pattern in patterns:
+            self._patterns.setdefault(pattern, set()).add(symbol)
+            self._automaton.add(pattern)
+
+    def refresh(self, db: Session) -> int:
+        """Add vetted tickers created since the last refresh (all of them the first time)"""
+        if not self._master_loaded:
+            self._load_master()
+        rows = db.execute(
+            select(Ticker.id, Ticker.symbol, Company.name)
+            .outerjoin(Company, Company.id == Ticker.company_id)
+            .where(Ticker.id > self._max_ticker_id)
+            .order_by(Ticker.id)
+        ).all()
+        added = 0
+        with self._lock:
+            for ticker_id, symbol, company_name in rows:
+                self._max_ticker_id = max(self._max_ticker_id, ticker_id)
+                if not company_name or company_name == f"{symbol} Company":
+                    continue
+                self._add(symbol.upper(), [company_name])
+                added += 1
+        if added:
+            logger.info("Ticker matcher updated", added=added, symbols=len(self._symbols))
+        return added
+
+    def _load_master(self):
+        self._master_loaded = True
+        if not self.master_path or not os.path.exists(self.master_path):
+            return
+        count = 0
+        try:
+            with open(self.master_path, newline="", encoding="utf8") as f:
+                for row in csv.DictReader(f):
+                    aliases = [a for a in (row.get("aliases") or "").split("|") if a.strip()]
+                    self.add(row.get("symbol", ""), [row.get("name") or ""] + aliases)
+                    count += 1
+        except Exception as e:
+            logger.warning("ticker_master_load_failed", path=self.master_path, error=str(e))
+        logger.info("Loaded ticker master file", path=self.master_path, symbols=count)
+
+    def _has_context(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and text[start - 1] == "$":
+            return True
+        if start > 0 and text[start - 1] == "(" and end < len(text) and text[end] == ")":
+            return True
+        return bool(_EXCHANGE_PREFIX.search(text[max(0, start - 12):start]))
+
+    def _is_name_mention(self, text: str, start: int, end: int) -> bool:
+        if not text[start].isupper():
+            return False
+        if " " in text[start:end] or self._has_context(text, start, end):
+            return True
+        # a capital at the start of a sentence says nothing about a proper noun
+        before = text[:start].rstrip(" \t\"'\u201c\u2018")
+        return bool(before) and before[-1] not in ".!?:;\n"
+
+    def discover(self, text: str) -> List[str]:
+        """Symbols the matcher does not know, written as "(NASDAQ: XYZ)" or "($XYZ)", in order"""
+        with self._lock:
+            found = [m.group(1) for m in _DISCOVERY.finditer(text or "") if m.group(1) not in self._symbols]
+        return list(dict.fromkeys(found))
+
+    def find(self, text: str) -> List[str]:
+        """Symbols mentioned in `text`, in order of first mention"""
+        if not text:
+            return []
+        if not self._master_loaded:
+            self._load_master()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # lower() changed the length (rare non-ASCII case folding); keep offsets aligned
+            lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+        found: Dict[str, int] = {}
+        with self._lock:
+            for end, pattern in self._automaton.iter(lowered):
+                start = end - len(pattern)
+                if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                    continue
+                for symbol in self._patterns[pattern]:
+                    if pattern == symbol.lower():
+                        if text[start:end] != symbol:
+                            continue
+                        ambiguous = len(symbol) < self.bare_min_len or symbol in AMBIGUOUS_SYMBOLS
+                        if ambiguous and not self._has_context(text, start, end):
+                            continue
+                    elif not self._is_name_mention(text, start, end):
+                        continue
+                    found.setdefault(symbol, start)
+        return sorted(found, key=found.get)
+
+# Global instance
+ticker_matcher = TickerMatcher()
@@ -0,0 +1,151 @@
+import asyncio
+import importlib.util
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+import structlog
+
+from app import metrics
+from app.core.config import settings
+from app.services import ingest_events
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    text: Optional[str] = None
+    bytes: int = 0
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.text is not None
+
+
+class ArticleFetcher:
+    """
+    Long-lived article body downloader.
+    Reuses one connection pool across articles and bounds the number of
+    in-flight requests globally and per host.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        keepalive_expiry: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.ARTICLE_FETCH_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or settings.ARTICLE_FETCH_PER_HOST
+        self.timeout = timeout or settings.ARTICLE_FETCH_TIMEOUT
+        self.http2 = settings.ARTICLE_FETCH_HTTP2 if http2 is None else http2
+        self.keepalive_expiry = keepalive_expiry or settings.ARTICLE_FETCH_KEEPALIVE_EXPIRY
+        self.transport = transport
+
+        # Client and semaphores are bound to the loop that created them
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            http2 = self.http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("h2 package not installed, falling back to HTTP/1.1")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                follow_redirects=True,
+                transport=self.transport
+            )
+            self._loop = loop
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+            self._host_sems = {}
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).netloc or "").lower()
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_sems[host] = sem
+        return sem
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Download one article body; errors are reported on the result"""
+        client = self._ensure_client()
+        result = FetchResult(url=url)
+
+        # Host slot first: requests queued behind a busy host must not sit on global slots
+        async with self._host_semaphore(url), self._global_sem:
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(client.get(url), timeout=self.timeout)
+                result.status = response.status_code
+                result.bytes = len(response.content)
+                response.raise_for_status()
+                result.text = response.text
+            except asyncio.TimeoutError:
+                result.error = f"timed out after {self.timeout}s"
+            except Exception as e:
+                result.error = str(e) or e.__class__.__name__
+            result.latency_ms = (time.perf_counter() - started) * 1000
+
+        self._report(result)
+        return result
+
+    async def fetch_many(self, urls: List[str]) -> List[FetchResult]:
+        """Download many article bodies in parallel, preserving input order"""
+        return await asyncio.gather(*[self.fetch(u) for u in urls])
+
+    async def iter_fetched(self, urls: List[str]) -> AsyncIterator[FetchResult]:
+        """Yield results as soon as each download finishes"""
+        for fut in asyncio.as_completed([self.fetch(u) for u in urls]):
+            yield await fut
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def _report(self, result: FetchResult):
+        outcome = "ok" if result.ok else "error"
+        metrics.inc_counter("article_fetch_total", {"result": outcome})
+        metrics.inc_counter("article_fetch_bytes_total", amount=result.bytes)
+        metrics.inc_counter("article_fetch_latency_ms_total", amount=int(result.latency_ms))
+
+        ingest_events.publish_event({
+            "type": "fetch_progress",
+            "url": result.url,
+            "http_status": result.status,
+            "bytes": result.bytes,
+            "latency_ms": round(result.latency_ms, 1),
+            "error": result.error
+        })
+
+        if result.ok:
+            logger.info("article_fetched", url=result.url, status=result.status, bytes=result.bytes, latency_ms=round(result.latency_ms, 1))
+        else:
+            logger.warning("article_fetch_failed", url=result.url, status=result.status, error=result.error, latency_ms=round(result.latency_ms, 1))
+
+# Global instance
+article_fetcher = ArticleFetcher()
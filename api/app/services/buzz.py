@@ -0,0 +1,123 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Document, DocumentTicker, TickerMentionBucket
+from app.db.upsert import bulk_insert, upsert_increment
+from app.services.resolver import entity_resolver
+
+logger = structlog.get_logger()
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_counts(db: Session, docs: Iterable[Tuple[datetime, Sequence[str]]]) -> Dict[Tuple[int, datetime], int]:
+    docs = [(published_at, list(dict.fromkeys(t for t in tickers if t))) for published_at, tickers in docs]
+    ticker_ids = entity_resolver.ticker_ids(db, [t for _, tickers in docs for t in tickers])
+    counts: Counter = Counter()
+    for published_at, tickers in docs:
+        for symbol in tickers:
+            if symbol in ticker_ids:
+                counts[(ticker_ids[symbol], hour_bucket(published_at))] += 1
+    return counts
+
+
+def record_mentions(db: Session, docs: Iterable[Tuple[datetime, Sequence[str]]]):
+    """Count (published_at, tickers) documents into the hourly buckets, in the caller's transaction"""
+    counts = _bucket_counts(db, docs)
+    upsert_increment(db, TickerMentionBucket, [
+        {"ticker_id": ticker_id, "bucket_start": bucket, "mentions": n}
+        for (ticker_id, bucket), n in sorted(counts.items())
+    ], index_elements=["ticker_id", "bucket_start"], column="mentions")
+
+
+def rebuild_mention_buckets(db: Session, since: Optional[datetime] = None, batch_size: int = 5000) -> int:
+    """Recount the buckets from stored documents (all of them, or from `since`). Returns buckets written."""
+    since = hour_bucket(since) if since else None
+    stmt = select(Document.published_at, Document.meta).order_by(Document.id).execution_options(yield_per=batch_size)
+    cleanup = delete(TickerMentionBucket)
+    if since:
+        stmt = stmt.where(Document.published_at >= since)
+        cleanup = cleanup.where(TickerMentionBucket.bucket_start >= since)
+
+    counts: Counter = Counter()
+    chunk = []
+    for published_at, meta in db.execute(stmt):
+        chunk.append((published_at, (meta or {}).get("tickers") or []))
+        if len(chunk) >= batch_size:
+            counts.update(_bucket_counts(db, chunk))
+            chunk = []
+    counts.update(_bucket_counts(db, chunk))
+
+    db.execute(cleanup)
+    rows = [{"ticker_id": t, "bucket_start": b, "mentions": n} for (t, b), n in sorted(counts.items())]
+    for i in range(0, len(rows), batch_size):
+        bulk_insert(db, TickerMentionBucket, rows[i:i + batch_size])
+    db.commit()
+    logger.info("Rebuilt ticker mention buckets", since=since, buckets=len(rows))
+    return len(rows)
+
+
+def buzz_zscore(
+    db: Session,
+    ticker_id: Optional[int],
+    at: datetime,
+    window_hours: Optional[int] = None,
+    history_days: Optional[int] = None
+) -> float:
+    """
+    z-score of the mentions in the `window_hours` ending at `at` against the
+    mean and std of the preceding windows over `history_days`. Reads at most
+    (history_days * 24 / window_hours + 1) * window_hours buckets; None for all tickers.
+    The hour `at` falls in is counted from document_tickers up to `at`, since
+    its bucket also holds the mentions published after it.
+    """
+    window_hours = window_hours or settings.BUZZ_WINDOW_HOURS
+    history_days = history_days or settings.BUZZ_HISTORY_DAYS
+    windows = max(1, history_days * 24 // window_hours) + 1
+    end = hour_bucket(at)
+    start = end - timedelta(hours=windows * window_hours)
+
+    stmt = (
+        select(TickerMentionBucket.bucket_start, func.sum(TickerMentionBucket.mentions))
+        .where(TickerMentionBucket.bucket_start > start, TickerMentionBucket.bucket_start < end)
+        .group_by(TickerMentionBucket.bucket_start)
+    )
+    partial = (
+        select(func.count())
+        .select_from(DocumentTicker)
+        .where(DocumentTicker.published_at >= end, DocumentTicker.published_at <= at)
+    )
+    if ticker_id is not None:
+        stmt = stmt.where(TickerMentionBucket.ticker_id == ticker_id)
+        partial = partial.where(DocumentTicker.ticker_id == ticker_id)
+    rows = db.execute(stmt).all()
+
+    # window 0 is the current one, 1.. the history
+    counts = np.zeros(windows)
+    for bucket_start, mentions in rows:
+        counts[int((end - bucket_start).total_seconds() // 3600) // window_hours] += mentions
+    counts[0] += db.execute(partial).scalar() or 0
+    history = counts[1:]
+    std = max(float(history.std()), settings.BUZZ_MIN_STD)
+    return float((counts[0] - history.mean()) / std)
+
+
+if __name__ == "__main__":
+    import sys
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        since = datetime.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+        print(rebuild_mention_buckets(db, since))
+    finally:
+        db.close()
@@ -0,0 +1,187 @@
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Document
+
+logger = structlog.get_logger()
+
+# float32: vector(768), ~3 KB per row
+# halfvec: halfvec(768), 2 bytes per dimension; searchable and indexable in Postgres
+# int8:    bytea of a float32 scale followed by one signed byte per dimension (~4x smaller)
+STORAGE_MODES = ("float32", "halfvec", "int8")
+
+_SCALE = struct.Struct("<f")
+
+
+def storage_mode(mode: Optional[str] = None) -> str:
+    mode = (mode or settings.EMBEDDING_STORAGE).lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage mode: {mode}")
+    return mode
+
+
+def quantize_int8(embedding: Sequence[float]) -> bytes:
+    """Symmetric per-vector scalar quantization: x ~= scale * q, q in [-127, 127]"""
+    vec = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    codes = np.clip(np.rint(vec / scale), -127, 127).astype(np.int8)
+    return _SCALE.pack(scale) + codes.tobytes()
+
+
+def dequantize_int8(raw: bytes) -> np.ndarray:
+    (scale,) = _SCALE.unpack_from(raw)
+    return np.frombuffer(raw, dtype=np.int8, offset=_SCALE.size).astype(np.float32) * scale
+
+
+def embedding_values(embedding: Optional[Sequence[float]], mode: Optional[str] = None) -> Dict[str, Any]:
+    """Document column values for an embedding in the given (or configured) storage mode"""
+    values: Dict[str, Any] = {"embedding": None, "embedding_half": None, "embedding_int8": None}
+    if embedding is None:
+        return values
+    mode = storage_mode(mode)
+    if mode == "float32":
+        values["embedding"] = list(embedding)
+    elif mode == "halfvec":
+        values["embedding_half"] = list(embedding)
+    else:
+        values["embedding_int8"] = quantize_int8(embedding)
+    return values
+
+
+def _to_array(value) -> Optional[np.ndarray]:
+    if value is None:
+        return None
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
+def load_embedding(full=None, half=None, int8: Optional[bytes] = None) -> Optional[np.ndarray]:
+    """The most precise stored representation, as float32"""
+    if full is not None:
+        return _to_array(full)
+    if half is not None:
+        return _to_array(half)
+    if int8 is not None:
+        return dequantize_int8(int8)
+    return None
+
+
+def document_embedding(doc: Document) -> Optional[np.ndarray]:
+    return load_embedding(doc.embedding, doc.embedding_half, doc.embedding_int8)
+
+
+def stored_embedding(doc: Document) -> Optional[np.ndarray]:
+    """The embedding as the database returns it, also for a document not yet read back"""
+    if doc.embedding is None and doc.embedding_half is not None:
+        return _to_array(doc.embedding_half).astype(np.float16).astype(np.float32)
+    return document_embedding(doc)
+
+
+def cosine_matrix(matrix: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """(rows, queries) cosine similarities; 0 where either vector is zero"""
+    norms = np.linalg.norm(matrix, axis=1)[:, None] * np.linalg.norm(queries, axis=1)[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sims = (matrix @ queries.T) / norms
+    return np.nan_to_num(sims, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _cosine(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    return cosine_matrix(matrix, query[None, :])[:, 0]
+
+
+def _set_search_params(db: Session):
+    # ef_search bounds the HNSW candidate list; iterative scans (pgvector >= 0.8) keep
+    # reading the index until enough rows pass the WHERE filter, in exact distance order
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.VECTOR_EF_SEARCH)}"))
+    db.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+
+
+def similar_documents(
+    db: Session,
+    query: Sequence[float],
+    k: int = 10,
+    where: Sequence = (),
+    mode: Optional[str] = None
+) -> List[Tuple[int, float]]:
+    """
+    (document id, cosine similarity) of the `k` most similar documents matching
+    the `where` conditions, best first, ties broken by id.
+
+    On Postgres the rows come from the pgvector HNSW index on the compact
+    column. int8 (which Postgres cannot compare) and other databases scan the
+    matching rows in numpy instead, exactly. Similarities are computed from
+    the stored representation; no full-precision copy is kept to re-rank by.
+    """
+    mode = storage_mode(mode)
+    query_vec = np.asarray(query, dtype=np.float32)
+
+    columns = (Document.id, Document.embedding, Document.embedding_half, Document.embedding_int8)
+    column = {"float32": Document.embedding, "halfvec": Document.embedding_half, "int8": Document.embedding_int8}[mode]
+    if mode == "int8" or db.get_bind().dialect.name != "postgresql":
+        stmt = select(*columns).where(column.isnot(None), *where).order_by(Document.id)
+    else:
+        _set_search_params(db)
+        stmt = (
+            select(*columns)
+            .where(column.isnot(None), *where)
+            .order_by(column.cosine_distance(query_vec.tolist()), Document.id)
+            .limit(k)
+        )
+    rows = db.execute(stmt).all()
+    if not rows:
+        return []
+
+    matrix = np.stack([load_embedding(r.embedding, r.embedding_half, r.embedding_int8) for r in rows])
+    sims = _cosine(matrix, query_vec)
+    order = np.lexsort((np.array([r.id for r in rows]), -sims))[:k]
+    return [(rows[i].id, float(sims[i])) for i in order]
+
+
+def compact_embeddings(db: Session, mode: Optional[str] = None, batch_size: int = 500) -> int:
+    """
+    Rewrite stored embeddings into the given (or configured) storage mode and
+    clear the other representations, in id-ordered batches. Returns rows changed.
+    """
+    mode = storage_mode(mode)
+    target = {"float32": Document.embedding, "halfvec": Document.embedding_half, "int8": Document.embedding_int8}[mode]
+    others = [c for c in (Document.embedding, Document.embedding_half, Document.embedding_int8) if c is not target]
+    changed = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Document.id, Document.embedding, Document.embedding_half, Document.embedding_int8)
+            .where(Document.id > last_id, or_(*[c.isnot(None) for c in others]))
+            .order_by(Document.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            values = embedding_values(load_embedding(row.embedding, row.embedding_half, row.embedding_int8), mode)
+            params.append({"id": row.id, **values})
+        db.execute(update(Document), params)
+        db.commit()
+        changed += len(rows)
+        last_id = rows[-1].id
+        logger.info("Compacted embeddings", mode=mode, rows=changed)
+    return changed
+
+
+if __name__ == "__main__":
+    import sys
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(compact_embeddings(db, sys.argv[1] if len(sys.argv) > 1 else None))
+    finally:
+        db.close()
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.db.models import AuditLog, Document, DocumentEntity, DocumentTicker, Event
+from app.db.upsert import bulk_insert, upsert_increment
+from app.services.buzz import record_mentions
+from app.services.embedding_store import embedding_values
+from app.services.resolver import entity_resolver
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class PreparedDocument:
+    """A processed article ready to be written: NLP output, extracted events and snapshot"""
+    article: Dict
+    nlp_result: Dict
+    content_hash: str
+    snapshot_path: Optional[str] = None
+    events: List[Dict] = field(default_factory=list)
+
+
+def persist_documents(db: Session, prepared: List[PreparedDocument], actor: str = "ingest_flow") -> List[Document]:
+    """
+    Write a batch of processed documents with their entities, mentions, events
+    and audit rows in a handful of statements. Does not commit.
+    """
+    if not prepared:
+        return []
+
+    docs = []
+    for p in prepared:
+        article, nlp_result = p.article, p.nlp_result
+        docs.append(Document(
+            source=article["source"],
+            url=article["url"],
+            title=article["title"],
+            published_at=article["published"],
+            raw_text=article.get("content", ""),
+            html_snapshot_path=p.snapshot_path,
+            content_hash=p.content_hash,
+            lang="en",
+            **embedding_values(nlp_result["embedding"]),
+            sentiment=nlp_result["sentiment"],
+            sentiment_score=nlp_result["sentiment_score"],
+            meta={"tickers": nlp_result["tickers"]}
+        ))
+    db.add_all(docs)
+    db.flush()
+
+    # Entities: the first mention decides type and ticker link, as when inserted one by one
+    first_seen: Dict[str, Tuple[str, List[str]]] = {}
+    mentions: Dict[Tuple[int, str], int] = {}
+    for doc, p in zip(docs, prepared):
+        for entity_data in p.nlp_result["entities"]:
+            name = entity_data["text"]
+            first_seen.setdefault(name, (entity_data["type"], p.nlp_result["tickers"]))
+            mentions[(doc.id, name)] = mentions.get((doc.id, name), 0) + 1
+
+    # New organisations are linked to the first ticker of the document that mentioned them
+    entity_ids = entity_resolver.entity_ids(db, {
+        name: (entity_type, tickers[0] if entity_type == "ORG" and tickers else None)
+        for name, (entity_type, tickers) in first_seen.items()
+    })
+
+    upsert_increment(db, DocumentEntity, [
+        {
+            "document_id": doc_id,
+            "entity_id": entity_ids[name],
+            "mentions": count,
+            "relevance_score": 0.5
+        }
+        for (doc_id, name), count in mentions.items()
+    ], index_elements=["document_id", "entity_id"], column="mentions")
+
+    bulk_insert(db, Event, [
+        {
+            "document_id": doc.id,
+            "event_time": event_data["event_time"],
+            "event_type": event_data["event_type"],
+            "headline": event_data["headline"],
+            "confidence_extraction": event_data["confidence_extraction"],
+            "affected_ticker": event_data["affected_ticker"],
+            "payload": event_data["payload"]
+        }
+        for doc, p in zip(docs, prepared)
+        for event_data in p.events
+    ])
+
+    ticker_ids = entity_resolver.ticker_ids(db, [t for p in prepared for t in p.nlp_result["tickers"]])
+    bulk_insert(db, DocumentTicker, [
+        {"document_id": doc.id, "ticker_id": ticker_ids[symbol], "published_at": doc.published_at}
+        for doc, p in zip(docs, prepared)
+        for symbol in dict.fromkeys(p.nlp_result["tickers"])
+        if symbol in ticker_ids
+    ])
+    record_mentions(db, [(doc.published_at, p.nlp_result["tickers"]) for doc, p in zip(docs, prepared)])
+
+    bulk_insert(db, AuditLog, [
+        {
+            "actor": actor,
+            "action": "ingest_doc",
+            "target_type": "document",
+            "target_id": doc.id,
+            "payload": {"url": p.article["url"], "source": p.article["source"]}
+        }
+        for doc, p in zip(docs, prepared)
+    ])
+
+    logger.debug("Persisted document batch", documents=len(docs), entities=len(first_seen), mentions=len(mentions))
+    return docs
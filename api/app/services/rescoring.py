@@ -0,0 +1,264 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.core.config import settings
+from app.db.models import RescoreJob, Signal
+from app.services import ingest_events
+from app.services.fuse import SignalFuser
+
+logger = structlog.get_logger()
+
+
+def _job_dict(job: RescoreJob) -> Dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "processed": job.processed,
+        "total": job.total,
+        "last_signal_id": job.last_signal_id,
+        "error": job.error,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def _rescored_row(fuser: SignalFuser, row, confidence: float, base_score: float, components: Dict) -> Dict:
+    """Update parameters for one signal, with the label and alert fields ingest derives from the confidence"""
+    should_alert, alert_reason = fuser.should_alert(
+        confidence=confidence,
+        source_weight=components["source_weight"],
+        novelty=components["novelty"],
+        has_second_source=False
+    )
+    label = row.label
+    if "event_type" in row.meta:
+        # the label does not depend on the sentiment, which the signal does not keep
+        label = fuser.generate_signal_label(event_type=row.meta["event_type"], sentiment=None, confidence=confidence)
+    return {
+        "id": row.id,
+        "confidence": confidence,
+        "base_score": base_score,
+        "label": label,
+        "meta": {
+            **row.meta,
+            "components": components,
+            "alert_reason": alert_reason,
+            "requires_second_source": not should_alert or alert_reason == "Needs second source confirmation"
+        }
+    }
+
+
+class SignalRescorer:
+    """
+    Recomputes the confidence and base score of stored signals after the
+    fuser settings change, from the components kept in Signal.meta, and with
+    them the confidence qualifier of the label and the alert decision.
+
+    A job walks the signals table by id in chunks of RESCORE_CHUNK_SIZE and
+    commits each chunk's rows together with its cursor, so a restarted API
+    resumes where it stopped. Between chunks it sleeps long enough to stay
+    within RESCORE_DUTY_CYCLE of wall time. Starting a job supersedes the
+    running one; only the newest settings are ever applied.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def create_job(self, params: Dict) -> int:
+        """Record a job for `params` (fuser settings dict), superseding running jobs"""
+        db = self._session()
+        try:
+            # the row locks wait for a chunk in flight, so it cannot commit after the new job starts
+            running = db.execute(
+                select(RescoreJob).where(RescoreJob.status == "running").with_for_update()
+            ).scalars().all()
+            for job in running:
+                job.status = "superseded"
+                job.finished_at = datetime.utcnow()
+            total = db.execute(select(func.count(Signal.id))).scalar() or 0
+            job = RescoreJob(status="running", params=params, last_signal_id=0, processed=0, total=total)
+            db.add(job)
+            db.commit()
+            logger.info("Rescore job created", job_id=job.id, signals=total, superseded=len(running))
+            return job.id
+        finally:
+            db.close()
+
+    def load_fuser(self, job_id: int) -> Optional[SignalFuser]:
+        """Fuser configured with the job's settings; None unless the job is running"""
+        db = self._session()
+        try:
+            job = db.get(RescoreJob, job_id)
+            if job is None or job.status != "running":
+                return None
+            fuser = SignalFuser()
+            fuser.reload_from_dict(job.params)
+            return fuser
+        finally:
+            db.close()
+
+    def run_chunk(self, job_id: int, fuser: SignalFuser, chunk_size: Optional[int] = None) -> Optional[Dict]:
+        """Rescore the next chunk of the job; its state afterwards, None if it is no longer running"""
+        chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+        db = self._session()
+        try:
+            job = db.execute(
+                select(RescoreJob).where(RescoreJob.id == job_id).with_for_update()
+            ).scalar_one_or_none()
+            if job is None or job.status != "running":
+                return None
+
+            rows = db.execute(
+                select(Signal.id, Signal.label, Signal.meta)
+                .where(Signal.id > job.last_signal_id)
+                .order_by(Signal.id)
+                .limit(chunk_size)
+            ).all()
+            # signals without stored components cannot be rescored and keep their scores
+            scorable = [r for r in rows if (r.meta or {}).get("components")]
+            if scorable:
+                metas = [r.meta for r in scorable]
+                confidences, base_scores, components = fuser.rescore_batch(metas)
+                db.execute(update(Signal), [
+                    _rescored_row(fuser, r, float(confidences[i]), float(base_scores[i]), fuser.component_dict(components, i))
+                    for i, r in enumerate(scorable)
+                ])
+
+            if rows:
+                job.last_signal_id = rows[-1].id
+                job.processed += len(rows)
+            if len(rows) < chunk_size:
+                job.status = "completed"
+                job.finished_at = datetime.utcnow()
+            job.updated_at = datetime.utcnow()
+            db.commit()
+            metrics.inc_counter("signals_rescored_total", amount=len(scorable))
+            return _job_dict(job)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def fail_job(self, job_id: int, error: str) -> Optional[Dict]:
+        db = self._session()
+        try:
+            job = db.get(RescoreJob, job_id)
+            if job is None or job.status != "running":
+                return None
+            job.status = "failed"
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return _job_dict(job)
+        finally:
+            db.close()
+
+    async def run(self, job_id: int):
+        """Rescore chunks until the job completes, is superseded or fails"""
+        fuser = await asyncio.to_thread(self.load_fuser, job_id)
+        if fuser is None:
+            return
+        duty = min(max(settings.RESCORE_DUTY_CYCLE, 0.01), 1.0)
+        while True:
+            started = time.perf_counter()
+            try:
+                state = await asyncio.to_thread(self.run_chunk, job_id, fuser)
+            except Exception as e:
+                logger.error("Rescore job failed", job_id=job_id, error=str(e))
+                state = await asyncio.to_thread(self.fail_job, job_id, str(e))
+            if state is None:
+                logger.info("Rescore job stopped", job_id=job_id)
+                return
+            ingest_events.publish_event({"type": "rescore_progress", "final": state["status"] != "running", **state})
+            if state["status"] != "running":
+                logger.info("Rescore job finished", **state)
+                return
+            # throttle: work at most `duty` of the time so the API keeps its database connections and CPU
+            await asyncio.sleep((time.perf_counter() - started) * (1 / duty - 1))
+
+    def _launch(self, job_id: int):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.create_task(self.run(job_id))
+
+    async def start(self, params: Dict) -> int:
+        """Create a job for `params` and run it in the background of the current event loop"""
+        job_id = await asyncio.to_thread(self.create_job, params)
+        self._launch(job_id)
+        return job_id
+
+    async def resume(self) -> Optional[int]:
+        """Continue the newest running job left by a previous process, if any"""
+        job_id = await asyncio.to_thread(self._latest_running)
+        if job_id is not None:
+            logger.info("Resuming rescore job", job_id=job_id)
+            self._launch(job_id)
+        return job_id
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def _latest_running(self) -> Optional[int]:
+        db = self._session()
+        try:
+            return db.execute(
+                select(RescoreJob.id).where(RescoreJob.status == "running").order_by(RescoreJob.id.desc()).limit(1)
+            ).scalar()
+        finally:
+            db.close()
+
+    def status(self) -> Optional[Dict]:
+        """State of the newest job"""
+        db = self._session()
+        try:
+            job = db.execute(select(RescoreJob).order_by(RescoreJob.id.desc()).limit(1)).scalar_one_or_none()
+            return _job_dict(job) if job else None
+        finally:
+            db.close()
+
+# Global instance
+signal_rescorer = SignalRescorer()
+
+
+if __name__ == "__main__":
+    from app.services.fuse import signal_fuser
+
+    async def _main():
+        # resume an interrupted job, or rescore everything with the saved settings
+        if await signal_rescorer.resume() is None:
+            await signal_rescorer.start({
+                "weights": {
+                    "W_SRC": signal_fuser.w_src,
+                    "W_NOVEL": signal_fuser.w_novel,
+                    "W_EVT": signal_fuser.w_evt,
+                    "W_BUZZ": signal_fuser.w_buzz,
+                    "K_CONS": signal_fuser.k_cons,
+                    "K_UNC": signal_fuser.k_unc,
+                    "TAU": signal_fuser.tau
+                },
+                "source_weights": signal_fuser.source_weights,
+                "event_priors": signal_fuser.event_priors
+            })
+        await signal_rescorer.wait()
+        print(signal_rescorer.status())
+
+    asyncio.run(_main())
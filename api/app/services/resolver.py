@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Company, Entity, Ticker
+from app.db.upsert import dialect_insert
+
+logger = structlog.get_logger()
+
+
+class _LRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, int]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[int]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: int):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class EntityResolver:
+    """
+    In-process cache of ticker symbol -> ticker id and entity name -> entity id.
+
+    Misses are resolved with INSERT ... ON CONFLICT DO NOTHING RETURNING in a
+    short transaction of their own, so concurrent ingest workers never create
+    duplicates, and ids are only cached once the rows are committed.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.RESOLVER_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._tickers = _LRU(self.max_size)
+        self._entities = _LRU(self.max_size)
+        self._warmed = False
+
+    def warm(self, db: Session, force: bool = False):
+        """Preload the cache from the tickers and entities tables, once per process"""
+        if self._warmed and not force:
+            return
+        tickers = db.execute(select(Ticker.symbol, Ticker.id).limit(self.max_size)).all()
+        entities = db.execute(select(Entity.name, Entity.id).order_by(Entity.id.desc()).limit(self.max_size)).all()
+        with self._lock:
+            for symbol, ticker_id in tickers:
+                self._tickers.put(symbol, ticker_id)
+            for name, entity_id in reversed(entities):
+                self._entities.put(name, entity_id)
+            self._warmed = True
+        logger.info("Warmed resolver cache", tickers=len(tickers), entities=len(entities))
+
+    def clear(self):
+        with self._lock:
+            self._tickers.clear()
+            self._entities.clear()
+            self._warmed = False
+
+    def _cached(self, cache: _LRU, keys: List[str]) -> Tuple[Dict[str, int], List[str]]:
+        with self._lock:
+            found = {}
+            for key in keys:
+                value = cache.get(key)
+                if value is not None:
+                    found[key] = value
+        return found, [k for k in keys if k not in found]
+
+    def ticker_ids(self, db: Session, symbols: Iterable[str]) -> Dict[str, int]:
+        """Ticker ids by symbol, creating placeholder companies and tickers for unknown symbols"""
+        symbols = list(dict.fromkeys(s for s in symbols if s))
+        found, missing = self._cached(self._tickers, symbols)
+        if not missing:
+            return found
+
+        with db.get_bind().begin() as conn:
+            # The ticker is claimed first; only the worker whose insert wins creates its company
+            stmt = dialect_insert(db, Ticker).values([
+                {"symbol": symbol, "exchange": "NASDAQ", "is_active": True} for symbol in missing
+            ]).on_conflict_do_nothing(index_elements=["symbol"]).returning(Ticker.symbol, Ticker.id)
+            created = dict(conn.execute(stmt).all())
+
+            for symbol, ticker_id in created.items():
+                company_id = conn.execute(
+                    dialect_insert(db, Company).values(
+                        name=f"{symbol} Company",
+                        sector="Technology",  # Default, would be looked up in production
+                        industry="Software"
+                    ).returning(Company.id)
+                ).scalar_one()
+                conn.execute(update(Ticker).where(Ticker.id == ticker_id).values(company_id=company_id))
+
+            rest = [s for s in missing if s not in created]
+            if rest:
+                created.update(conn.execute(select(Ticker.symbol, Ticker.id).where(Ticker.symbol.in_(rest))).all())
+
+        with self._lock:
+            for symbol, ticker_id in created.items():
+                self._tickers.put(symbol, ticker_id)
+        found.update(created)
+        return found
+
+    def ticker_id(self, db: Session, symbol: str) -> Optional[int]:
+        if not symbol:
+            return None
+        return self.ticker_ids(db, [symbol]).get(symbol)
+
+    def lookup_ticker_id(self, db: Session, symbol: str) -> Optional[int]:
+        """Ticker id of a known symbol, None for an unknown one; never creates rows, for read paths"""
+        if not symbol:
+            return None
+        found, _ = self._cached(self._tickers, [symbol])
+        if symbol in found:
+            return found[symbol]
+        ticker_id = db.execute(select(Ticker.id).where(Ticker.symbol == symbol)).scalar()
+        if ticker_id is not None:
+            with self._lock:
+                self._tickers.put(symbol, ticker_id)
+        return ticker_id
+
+    def entity_ids(self, db: Session, entities: Dict[str, Tuple[str, Optional[str]]]) -> Dict[str, int]:
+        """
+        Entity ids by name. `entities` maps name -> (entity type, ticker symbol
+        to link if the entity has to be created).
+        """
+        found, missing = self._cached(self._entities, list(entities))
+        if not missing:
+            return found
+
+        ticker_ids = self.ticker_ids(db, [entities[name][1] for name in missing if entities[name][1]])
+        with db.get_bind().begin() as conn:
+            stmt = dialect_insert(db, Entity).values([
+                {
+                    "name": name,
+                    "entity_type": entities[name][0],
+                    "ticker_id": ticker_ids.get(entities[name][1]),
+                    "meta": {}
+                }
+                for name in missing
+            ]).on_conflict_do_nothing(index_elements=["name"]).returning(Entity.name, Entity.id)
+            created = dict(conn.execute(stmt).all())
+
+            rest = [n for n in missing if n not in created]
+            if rest:
+                created.update(conn.execute(select(Entity.name, Entity.id).where(Entity.name.in_(rest))).all())
+
+        with self._lock:
+            for name, entity_id in created.items():
+                self._entities.put(name, entity_id)
+        found.update(created)
+        return found
+
+# Global instance
+entity_resolver = EntityResolver()
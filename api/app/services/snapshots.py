@@ -5,16 +5,21 @@ from datetime import datetime
 from typing import Optional
 import structlog
 
+from app.core.config import settings
+
 logger = structlog.get_logger()
 
 class SnapshotService:
     def __init__(self):
-        self.base_path = Path("/data/snapshots")
-        self.ensure_directory()
+        self.base_path = Path(settings.SNAPSHOT_DIR)
+        # Created on first write, so constructing the service never touches the disk
+        self._directory_ready = False
     
     def ensure_directory(self):
         """Ensure snapshot directory exists"""
-        self.base_path.mkdir(parents=True, exist_ok=True)
+        if not self._directory_ready:
+            self.base_path.mkdir(parents=True, exist_ok=True)
+            self._directory_ready = True
     
     def save_html_snapshot(
         self,
@@ -34,6 +39,7 @@ class SnapshotService:
         filename = f"{source}_{date_str}_{url_hash}.html"
         
         # Create source-specific subdirectory
+        self.ensure_directory()
         source_dir = self.base_path / source.lower()
         source_dir.mkdir(exist_ok=True)
         
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.services.resolver import entity_resolver
+
+
+@pytest.fixture
+def db_engine():
+    """In-memory SQLite with the full schema, shared across threads and sessions"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    entity_resolver.clear()
+    yield engine
+    entity_resolver.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def db_sessionmaker(db_engine):
+    return sessionmaker(bind=db_engine)
+
+
+@pytest.fixture
+def db(db_sessionmaker):
+    session = db_sessionmaker()
+    yield session
+    session.close()
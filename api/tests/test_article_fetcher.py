@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import ingest_events
+from app.services.article_fetcher import ArticleFetcher
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_respects_per_host_cap(monkeypatch):
+    events = []
+    monkeypatch.setattr(ingest_events, "publish_event", events.append)
+    in_flight = {}
+    peak = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, text=f"<html>{request.url.path}</html>")
+
+    fetcher = ArticleFetcher(
+        max_concurrency=8,
+        per_host_concurrency=2,
+        transport=httpx.MockTransport(handler)
+    )
+    urls = [f"https://a.test/{i}" for i in range(6)] + [f"https://b.test/{i}" for i in range(6)]
+    try:
+        results = await fetcher.fetch_many(urls)
+    finally:
+        await fetcher.aclose()
+
+    assert [r.url for r in results] == urls
+    assert all(r.ok for r in results)
+    assert results[0].text == "<html>/0</html>"
+    assert results[0].bytes == len("<html>/0</html>")
+    assert peak == {"a.test": 2, "b.test": 2}
+    assert len(events) == len(urls)
+    assert all(e["type"] == "fetch_progress" and e["http_status"] == 200 for e in events)
+
+
+@pytest.mark.asyncio
+async def test_busy_host_does_not_block_other_hosts(monkeypatch):
+    monkeypatch.setattr(ingest_events, "publish_event", lambda event: None)
+    started = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.append(request.url.host)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, text="ok")
+
+    fetcher = ArticleFetcher(
+        max_concurrency=2,
+        per_host_concurrency=1,
+        transport=httpx.MockTransport(handler)
+    )
+    urls = [f"https://a.test/{i}" for i in range(4)] + ["https://b.test/0"]
+    try:
+        await fetcher.fetch_many(urls)
+    finally:
+        await fetcher.aclose()
+
+    # b.test takes the second global slot while a.test is still draining its queue
+    assert started.index("b.test") == 1
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app.db.models import Document, DocumentTicker, Ticker, TickerMentionBucket
+from app.nlp.novelty import NoveltyCalculator
+from app.services.buzz import buzz_zscore, rebuild_mention_buckets, record_mentions
+from app.services.resolver import entity_resolver
+
+
+def test_buckets_and_zscore(db):
+    now = datetime(2024, 3, 1, 12, 30)
+    docs = []
+    # two mentions a day for a month, then a burst of ten in the last day
+    for day in range(1, 31):
+        docs += [now - timedelta(days=day, hours=h) for h in (1, 5)]
+    docs += [now - timedelta(minutes=20 * i) for i in range(10)]
+    acme = entity_resolver.ticker_id(db, "ACME")
+    for i, published_at in enumerate(docs):
+        doc = Document(source="test", url=f"https://example.com/{i}", content_hash=f"hash-{i}",
+                       published_at=published_at, meta={"tickers": ["ACME"]})
+        db.add(doc)
+        db.flush()
+        db.add(DocumentTicker(document_id=doc.id, ticker_id=acme, published_at=published_at))
+    record_mentions(db, [(p, ["ACME", "ACME"]) for p in docs])
+    db.commit()
+
+    assert sum(b.mentions for b in db.query(TickerMentionBucket)) == len(docs)
+    z = buzz_zscore(db, acme, now)
+    assert z > 5
+    assert abs(buzz_zscore(db, acme, now - timedelta(days=10))) < 1
+
+    # a rebuild from the documents reproduces the incremental counts
+    before = {(b.ticker_id, b.bucket_start): b.mentions for b in db.query(TickerMentionBucket)}
+    rebuild_mention_buckets(db)
+    assert {(b.ticker_id, b.bucket_start): b.mentions for b in db.query(TickerMentionBucket)} == before
+    assert buzz_zscore(db, acme, now) == z
+
+    # mentions later in the same hour are not yet known at `now`
+    later = now + timedelta(minutes=20)
+    doc = Document(source="test", url="https://example.com/later", content_hash="hash-later",
+                   published_at=later, meta={"tickers": ["ACME"]})
+    db.add(doc)
+    db.flush()
+    db.add(DocumentTicker(document_id=doc.id, ticker_id=acme, published_at=later))
+    record_mentions(db, [(later, ["ACME"])])
+    db.commit()
+    assert buzz_zscore(db, acme, now) == z
+    assert buzz_zscore(db, acme, later) > z
+
+
+def test_buzz_score_reads_do_not_create_tickers(db):
+    assert entity_resolver.lookup_ticker_id(db, "NOPE") is None
+    assert NoveltyCalculator().calculate_buzz_score("NOPE", datetime(2024, 3, 1), db) == 0.5
+    assert db.query(Ticker).count() == 0
+    acme = entity_resolver.ticker_id(db, "ACME")
+    entity_resolver.clear()
+    assert entity_resolver.lookup_ticker_id(db, "ACME") == acme
@@ -0,0 +1,29 @@
+from app.ingestion.dedup import NearDuplicateIndex
+
+STORY = (
+    "Acme Corp raised its full-year revenue guidance on Tuesday after third-quarter "
+    "sales of its cloud software beat analyst estimates, sending shares up 8 percent "
+    "in after-hours trading. The company now expects annual revenue of 4.2 billion "
+    "dollars, compared with a previous forecast of 4.0 billion dollars, and said "
+    "demand from enterprise customers remained strong across all regions."
+)
+
+
+def test_near_duplicate_window_and_persistence(tmp_path):
+    path = str(tmp_path / "near_dup.pkl")
+    index = NearDuplicateIndex(path=path, window_hours=72, threshold=0.8)
+    now = 1_700_000_000.0
+    index.add("doc-1", index.signature(STORY), now=now)
+
+    rewrite = STORY + " Shares of Acme have gained 20 percent this year."
+    unrelated = "Globex announced a new chief executive officer and a restructuring of its retail arm."
+    assert index.query(index.signature(rewrite), now=now + 60) == "doc-1"
+    assert index.query(index.signature(unrelated), now=now + 60) is None
+
+    index.save()
+    reloaded = NearDuplicateIndex(path=path, window_hours=72, threshold=0.8)
+    assert reloaded.query(reloaded.signature(rewrite), now=now + 3600) == "doc-1"
+
+    # entries older than the window are evicted
+    assert reloaded.query(reloaded.signature(rewrite), now=now + 73 * 3600) is None
+    assert len(reloaded) == 0
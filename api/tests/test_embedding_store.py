@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.db.models import Document
+from app.services.embedding_store import (
+    compact_embeddings, dequantize_int8, document_embedding, embedding_values,
+    load_embedding, quantize_int8, similar_documents
+)
+
+
+def _cos(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_compact_representations_keep_cosine():
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(2, 768)).astype(np.float32)
+    b = a + 0.5 * b  # correlated, like two stories about the same event
+
+    raw = quantize_int8(a)
+    assert len(raw) == 4 + 768  # a quarter of the float32 size
+    half = load_embedding(half=embedding_values(a, "halfvec")["embedding_half"])
+    for decoded in (dequantize_int8(raw), half):
+        assert abs(_cos(decoded, b) - _cos(a, b)) < 5e-3
+
+
+def test_int8_search_and_compaction(db):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(20, 768)).astype(np.float32)
+    for i, vec in enumerate(vectors):
+        db.add(Document(
+            source="test", url=f"https://example.com/{i}", published_at=datetime(2024, 1, 1),
+            content_hash=f"hash-{i}", **embedding_values(vec, "float32")
+        ))
+    db.commit()
+
+    assert compact_embeddings(db, "int8") == 20
+    doc = db.query(Document).filter_by(content_hash="hash-3").one()
+    assert doc.embedding is None and doc.embedding_int8 is not None
+    assert _cos(document_embedding(doc), vectors[3]) > 0.999
+
+    query = vectors[3] + 0.1 * vectors[7]
+    hits = similar_documents(db, query, k=2, mode="int8")
+    assert [db.get(Document, doc_id).content_hash for doc_id, _ in hits] == ["hash-3", "hash-7"]
+    assert abs(hits[0][1] - _cos(query, vectors[3])) < 5e-3
@@ -1,29 +1,101 @@
 import json
 from pathlib import Path
 
-from app.nlp.events import event_extractor, CONFIG_PATH
+from app.nlp import events
+from app.nlp.events import event_extractor
 
 
-def test_reload_and_save(tmp_path):
+def test_reload_and_save(tmp_path, monkeypatch):
     orig = dict(event_extractor.event_patterns)
+    # point CONFIG_PATH to a temp file, so the real config is never overwritten
+    p = tmp_path / "event_patterns.json"
+    monkeypatch.setattr(events, "CONFIG_PATH", p)
     try:
         # write a minimal pattern
         data = {"test_event": ["testpattern\\s+value"]}
-        p = tmp_path / "event_patterns.json"
         p.write_text(json.dumps(data, indent=2))
+        assert event_extractor.reload_patterns()
+        assert "test_event" in event_extractor.event_patterns
 
-        # point the CONFIG_PATH to our temp file for the test
-        # monkeypatch would be nicer but keep simple
-        old = CONFIG_PATH
-        try:
-            # replace the file by copying
-            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            CONFIG_PATH.write_text(json.dumps(data))
-            assert event_extractor.reload_patterns()
-            assert "test_event" in event_extractor.event_patterns
-        finally:
-            pass
+        event_extractor.save_patterns()
+        assert json.loads(p.read_text()) == data
     finally:
         # restore original
         event_extractor.event_patterns = orig
         event_extractor._compile_patterns()
+
+
+def test_prefilter_matches_full_scan():
+    from datetime import datetime
+    from app.nlp.events import EventExtractor
+
+    extractor = EventExtractor()
+    extractor.event_patterns = dict(extractor.event_patterns)
+    extractor.event_patterns["custom"] = [
+        r"(?:raise[sd]?|lift(?:s|ed)?)\s+(?:its\s+)?target",
+        r"\bq[1-4]\b.{0,20}record",
+        r"(?i)ﬁling|proxy",
+        r"\d+%\s+stake",
+    ]
+    extractor._compile_patterns()
+    texts = [
+        "Acme Corp (ACME) raised its full-year guidance and beat estimates. The company also "
+        "announced a $2 billion share repurchase program and agreed to acquire Widget Inc.",
+        "SHARES FELL AFTER THE COMPANY LOWERED GUIDANCE AND DISCLOSED AN SEC INVESTIGATION.",
+        "Analysts lifted their target after a Q3 quarterly record; the fund took a 5% stake.",
+        "Nothing to see here.",
+        "ſettle ınvestigation dıvidend increase",
+    ]
+
+    full = EventExtractor()
+    full.event_patterns = extractor.event_patterns
+    full._compile_patterns()
+    # no required literals: every pattern runs, as before the prefilter
+    full._required = {key: None for key in full._required}
+
+    now = datetime(2024, 1, 2)
+    for text in texts:
+        assert extractor.extract_events(text, now, ["ACME"]) == full.extract_events(text, now, ["ACME"])
+
+
+def test_windowed_scan_matches_full_scan():
+    import random
+    from datetime import datetime
+    from app.nlp.events import EventExtractor
+
+    extractor = EventExtractor()
+    extractor.event_patterns = {
+        "bounded": [
+            r"\bguid(?:ance)?\s+(?:raised|cut)\b",
+            r"(?:raise[sd]?|lift(?:s|ed)?)\s+(?:its\s+)?target",
+            r"\bq[1-4]\b.{0,20}record",
+            r"stake$",
+            r"ab+a",
+        ],
+        "lookaround": [r"buyback(?= program)", r"(?<!its )target\s+\w+", r"(\w+) \1"],
+        # literals only after an unbounded prefix fall back to scanning the whole text
+        "unbounded": [r"(?<=the )deal\s+\w+", r"\w+\s+approved", r"merger.*approved"],
+    }
+    extractor._compile_patterns()
+    assert extractor._offsets[("bounded", 0)] == (0, 0) and extractor._offsets[("bounded", 2)] == (2, 22)
+    assert extractor._offsets[("unbounded", 1)] is None
+
+    full = EventExtractor()
+    full.event_patterns = extractor.event_patterns
+    full._compile_patterns()
+    full._required = {key: None for key in full._required}
+
+    words = ["guidance", "guid", "raised", "cut", "raises", "lifted", "its", "target", "q3", "q9", "record",
+             "stake", "the", "deal", "closed", "buyback", "program", "merger", "approved", "abba", "abbba", "x"]
+    rng = random.Random(7)
+    now = datetime(2024, 1, 2)
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 60)))
+        assert extractor.extract_events(text, now) == full.extract_events(text, now), text
+
+
+def test_event_benchmark_agrees_with_full_scan():
+    from app.nlp.benchmarks import benchmark_events
+
+    report = benchmark_events(n_docs=20)
+    assert all(r["same_events"] for r in report["extractors"].values())
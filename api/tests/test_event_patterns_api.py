@@ -1,15 +1,60 @@
 import json
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app.api import event_patterns as event_patterns_api
 from app.main import app
+from app.nlp import events
+from app.nlp.events import event_extractor
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def isolated_patterns(tmp_path, monkeypatch):
+    # never write the real configs/event_patterns.json; restore the live patterns afterwards
+    path = tmp_path / "event_patterns.json"
+    monkeypatch.setattr(event_patterns_api, "CONFIG_PATH", path)
+    monkeypatch.setattr(events, "CONFIG_PATH", path)
+    orig = dict(event_extractor.event_patterns)
+    yield path
+    event_extractor.event_patterns = orig
+    event_extractor._compile_patterns()
+
+
 def test_invalid_pattern_rejected():
     payload = {"foo": ["(unclosed"]}
     resp = client.put('/event-patterns', json=payload)
     assert resp.status_code == 400
     body = resp.json()
     assert 'validation_errors' in body.get('detail', {})
+
+
+def test_backtracking_pattern_rejected():
+    payload = {"foo": ["(a+)+$"]}
+    resp = client.put('/event-patterns', json=payload)
+    assert resp.status_code == 400
+    errors = resp.json()['detail']['validation_errors']['foo']
+    assert 'Timed out' in errors[0] or 'Super-linear' in errors[0]
+
+
+def test_pattern_stats():
+    from datetime import datetime
+
+    event_extractor.event_patterns = {"guidance_up": [r"raises?\s+(?:full-year\s+)?guidance"]}
+    event_extractor._compile_patterns()
+    event_extractor.extract_events("Acme raises full-year guidance", datetime(2024, 1, 2))
+    stats = client.get('/event-patterns/stats').json()['patterns']
+    row = next(r for r in stats if r['pattern'] == event_extractor.event_patterns['guidance_up'][0])
+    assert row['runs'] >= 1 and row['matches'] >= 1
+    assert 'event_pattern_matches_total' in client.get('/metrics').text
+
+
+def test_accepted_patterns_written_to_config(isolated_patterns):
+    payload = {"buyback": [r"announces?\s+(?:buyback|repurchase)"]}
+    resp = client.put('/event-patterns', json=payload)
+    assert resp.status_code == 200
+    assert json.loads(isolated_patterns.read_text()) == payload
+    assert event_extractor.event_patterns == payload
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from app.ingestion import extraction
+
+
+def _slow(html):
+    time.sleep(5)
+    return html
+
+
+@pytest.mark.asyncio
+async def test_extraction_runs_in_pool_with_time_budget():
+    html = "<html><body><nav>menu</nav><p>" + "Acme Corp raises full-year guidance. " * 20 + "</p></body></html>"
+    try:
+        text = await extraction.extract_text_async(html)
+        assert "raises full-year guidance" in text
+
+        started = time.perf_counter()
+        assert await extraction.run_extraction(_slow, html, timeout=0.5) is None
+        assert time.perf_counter() - started < 3
+
+        # the pool is recycled after a timeout and keeps working
+        assert "raises full-year guidance" in await extraction.extract_text_async(html)
+    finally:
+        extraction.shutdown_extract_executor(kill=True)
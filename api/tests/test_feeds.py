@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.ingestion.feeds import fetch_all_feeds
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>Acme raises guidance</title><link>https://example.com/a</link></item>
+</channel></rss>"""
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_feeds_bounds_slow_feeds():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            await asyncio.sleep(5)
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, content=RSS)
+
+    urls = ["https://feeds.test/a", "https://feeds.test/slow", "https://feeds.test/missing", "https://feeds.test/b"]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await fetch_all_feeds(urls, timeout=0.2, client=client)
+        elapsed = loop.time() - started
+
+    assert [r.url for r in results] == urls
+    assert elapsed < 2
+    assert results[0].ok and results[3].ok
+    assert results[0].feed.entries[0].link == "https://example.com/a"
+    assert not results[1].ok and "timed out" in results[1].error
+    assert not results[2].ok and results[2].status == 404
+
+
+@pytest.mark.asyncio
+async def test_conditional_polling_skips_unchanged_and_seen(tmp_path):
+    from app.ingestion.feed_state import FeedStateStore
+
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS, headers={"ETag": '"v1"'})
+
+    path = str(tmp_path / "feed_state.json")
+    url = "https://feeds.test/a"
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        state = FeedStateStore(path=path)
+        [first] = await fetch_all_feeds([url], client=client, state=state)
+        assert len(first.entries) == 1
+        state.commit(url, first.entries, etag=first.etag, last_modified=first.last_modified)
+        state.save()
+
+        # a fresh store reads the persisted validators and sends a conditional request
+        state = FeedStateStore(path=path)
+        [second] = await fetch_all_feeds([url], client=client, state=state)
+        assert second.ok and second.not_modified and second.entries == []
+        assert requests[-1]["if-none-match"] == '"v1"'
+
+        # the feed changed validators but not content: the entry was already seen
+        state.commit(url, [], etag=None, complete=False)
+        [third] = await fetch_all_feeds([url], client=client, state=state)
+        assert third.status == 200 and third.entries == []
+
+
+def test_failed_entries_stay_unseen_and_drop_validators(tmp_path):
+    from app.ingestion.feed_state import FeedPoll, FeedStateStore
+
+    url = "https://feeds.test/a"
+    entries = [{"link": "https://example.com/a"}, {"link": "https://example.com/b"}]
+    state = FeedStateStore(path=str(tmp_path / "feed_state.json"))
+
+    state.commit_polls([FeedPoll(url, entries, etag='"v1"')], failed={"https://example.com/b"})
+    assert state.unseen(url, entries) == [entries[1]]
+    # the feed is downloaded in full next time so the failed entry is retried
+    assert state.conditional_headers(url) == {}
+
+    state.commit_polls([FeedPoll(url, entries[1:], etag='"v2"')])
+    assert state.unseen(url, entries) == []
+    assert state.conditional_headers(url) == {"If-None-Match": '"v2"'}
+    assert FeedStateStore(path=state.path).unseen(url, entries) == []
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.fuse import SignalFuser
+
+
+def test_batch_matches_scalar():
+    fuser = SignalFuser()
+    rng = np.random.default_rng(0)
+    now = datetime(2024, 3, 1, 12, 0, 0)
+    n = 200
+    sources = rng.choice(["Reuters", "dj", "bloomberg", "blog", "", None], size=n).tolist()
+    event_types = rng.choice(["guidance_up", "mna", "sentiment_signal", None], size=n).tolist()
+    novelty = rng.random(n)
+    buzz = rng.normal(0, 3, n)
+    contra = rng.integers(-1, 2, n)
+    uncertainty = rng.random(n) * 0.5
+    times = [now - timedelta(seconds=int(s), microseconds=int(u))
+             for s, u in zip(rng.integers(0, 200000, n), rng.integers(0, 10**6, n))]
+    times[3] = None
+
+    confidences, base_scores, components = fuser.calculate_confidence_batch(
+        sources, novelty, event_types, buzz,
+        insider_contra=contra, model_uncertainty=uncertainty,
+        signal_times=times, current_time=now
+    )
+
+    # np.exp and math.exp may differ in the last bit, so the stated tolerance is 1e-15
+    for i in range(n):
+        confidence, base_score, row = fuser.calculate_confidence(
+            sources[i], float(novelty[i]), event_types[i], float(buzz[i]),
+            insider_contra=int(contra[i]), model_uncertainty=float(uncertainty[i]),
+            signal_time=times[i], current_time=now
+        )
+        assert abs(confidences[i] - confidence) <= 1e-15
+        assert abs(base_scores[i] - base_score) <= 1e-15
+        batch_row = fuser.component_dict(components, i)
+        assert batch_row["weights"] == row.pop("weights")
+        for name, value in row.items():
+            assert abs(batch_row[name] - value) <= 1e-15, name
+    assert components["time_decay"][3] == 1.0
+
+
+def test_batch_lookups_and_empty():
+    fuser = SignalFuser()
+    _, _, components = fuser.calculate_confidence_batch(
+        np.array(["REUTERS", "unknown"]), [0.5, 0.5], np.array(["mna", "other"]), 0.0
+    )
+    assert components["source_weight"].tolist() == [fuser.source_weights["reuters"], fuser.source_weights["default"]]
+    assert components["event_prior"].tolist() == [fuser.event_priors["mna"], fuser.event_priors["default"]]
+    assert (components["time_decay"] == 1.0).all()
+
+    confidences, base_scores, _ = fuser.calculate_confidence_batch([], [], [], [])
+    assert confidences.shape == (0,) and base_scores.shape == (0,)
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous on purpose: catches a heavy dependency creeping back into import
+# time (torch alone costs several seconds), not small regressions.
+IMPORT_BUDGET_SECONDS = 10.0
+
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "spacy", "onnxruntime", "trafilatura", "datasketch"]
+
+SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+import app.flows.ingest
+elapsed = time.perf_counter() - started
+from app.api import auth
+print(json.dumps({
+    "seconds": elapsed,
+    "heavy": [m for m in %r if m in sys.modules],
+    "redis_client": auth._redis is not None,
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_api_and_flow_import_lazily_within_budget(tmp_path):
+    snapshot_dir = tmp_path / "snapshots"
+    env = dict(os.environ, SNAPSHOT_DIR=str(snapshot_dir))
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=Path(__file__).resolve().parents[1],
+        env=env, capture_output=True, text=True, timeout=120
+    )
+    assert out.returncode == 0, out.stderr
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert report["heavy"] == []
+    assert not report["redis_client"]
+    assert not snapshot_dir.exists()
+    assert report["seconds"] < IMPORT_BUDGET_SECONDS, report
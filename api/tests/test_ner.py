@@ -0,0 +1,25 @@
+import pytest
+
+spacy = pytest.importorskip("spacy")
+if not spacy.util.is_package("en_core_web_sm"):
+    pytest.skip("en_core_web_sm is not installed", allow_module_level=True)
+
+from app.nlp import ner
+from app.nlp.benchmarks import benchmark_ner
+
+
+def test_ner_only_pipeline_matches_full_pipeline():
+    report = benchmark_ner(n_docs=20, n_process=2, batch_size=8)
+    for name, result in report["pipelines"].items():
+        assert result["same_entities"], name
+
+    trimmed = ner.load_ner(ner_only=True)
+    assert trimmed.pipe_names == ["ner"]
+
+
+def test_token_budget_keeps_offsets():
+    nlp = ner.load_ner(ner_only=True)
+    text = "Apple Inc. raised guidance. " + "Filler words follow here. " * 50 + "Microsoft Corp. fell."
+    entities = ner.entities_from_doc(nlp(ner.apply_budget(nlp, text, max_tokens=10)))
+    assert all(text[e["start"]:e["end"]] == e["text"] for e in entities)
+    assert not any("Microsoft" in e["text"] for e in entities)
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+pytest.importorskip("sentence_transformers")
+
+from app.core.config import settings
+from app.nlp import backends
+
+WORDS = "acme corp raises full year revenue guidance after record sales globex shares plunge misses earnings".split()
+
+
+def _tiny_models(tmp_path):
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertForSequenceClassification, BertModel, BertTokenizerFast
+
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+    config = BertConfig(
+        vocab_size=len(WORDS) + 5, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=37, max_position_embeddings=128, num_labels=3,
+        id2label={0: "positive", 1: "negative", 2: "neutral"}, label2id={"positive": 0, "negative": 1, "neutral": 2}
+    )
+
+    classifier_dir = tmp_path / "classifier"
+    BertForSequenceClassification(config).save_pretrained(classifier_dir)
+    tokenizer.save_pretrained(classifier_dir)
+
+    encoder_dir = tmp_path / "encoder"
+    BertModel(config).save_pretrained(encoder_dir)
+    tokenizer.save_pretrained(encoder_dir)
+    transformer = models.Transformer(str(encoder_dir), max_seq_length=64)
+    embedder_dir = tmp_path / "embedder"
+    SentenceTransformer(modules=[transformer, models.Pooling(32), models.Normalize()]).save(str(embedder_dir))
+    return str(classifier_dir), str(embedder_dir)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_onnx_backends_match_torch(tmp_path, monkeypatch, quantize):
+    classifier, embedder = _tiny_models(tmp_path)
+    monkeypatch.setattr(settings, "ONNX_CACHE_DIR", str(tmp_path / "onnx"))
+    monkeypatch.setattr(settings, "ONNX_QUANTIZE", quantize)
+    monkeypatch.setattr(settings, "ONNX_INTRA_OP_THREADS", 1)
+
+    sentiment = backends.load_sentiment_backend(classifier, backend="onnx")
+    embedding = backends.load_embedding_backend(embedder, backend="onnx")
+    assert isinstance(sentiment, backends.OnnxSentimentBackend)
+    assert isinstance(embedding, backends.OnnxEmbeddingBackend)
+
+    assert backends.sentiment_parity(backends.TorchSentimentBackend(classifier), sentiment)
+    assert backends.embedding_parity(backends.TorchEmbeddingBackend(embedder), embedding)
+
+    # the cached export is reused without touching the torch model
+    assert isinstance(backends.load_sentiment_backend(classifier, backend="onnx"), backends.OnnxSentimentBackend)
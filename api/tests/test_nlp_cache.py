@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.core.config import settings
+from app.nlp.cache import NLPResultCache
+
+
+def _result(seed):
+    rng = np.random.default_rng(seed)
+    return {
+        "entities": [{"text": "Acme Corp", "type": "ORG", "start": 0, "end": 9}],
+        "tickers": ["ACME"],
+        "sentiment": "positive",
+        "sentiment_score": 0.91,
+        "embedding": rng.standard_normal(768).astype(np.float32).tolist(),
+    }
+
+
+def test_cache_round_trip_model_keying_and_eviction(tmp_path, monkeypatch):
+    cache = NLPResultCache(path=str(tmp_path / "nlp.sqlite"), max_bytes=40_000, use_redis=False)
+    texts = [f"story {i}" for i in range(3)]
+    results = [_result(i) for i in range(3)]
+
+    assert cache.get_many(texts) == [None, None, None]
+    cache.put_many(texts[:2], results[:2])
+    assert cache.get_many(texts) == [results[0], results[1], None]
+
+    # results from another model never match
+    monkeypatch.setattr(settings, "EMBED_MODEL", "another/model")
+    assert cache.get(texts[0]) is None
+    monkeypatch.undo()
+
+    # persisted across instances
+    cache.close()
+    reopened = NLPResultCache(path=str(tmp_path / "nlp.sqlite"), max_bytes=40_000, use_redis=False)
+    assert reopened.get(texts[1]) == results[1]
+
+    # each entry is ~4KB of embedding; the budget keeps only the most recently used ones
+    for i in range(20):
+        reopened.put(f"filler {i}", _result(100 + i))
+    assert reopened._size <= 40_000
+    assert reopened.get("filler 19") is not None
+    assert reopened.get(texts[0]) is None
+
+
+def test_onnx_quantization_is_part_of_the_key(monkeypatch):
+    from app.nlp.cache import model_fingerprint
+
+    monkeypatch.setattr(settings, "FINBERT_BACKEND", "onnx")
+    monkeypatch.setattr(settings, "ONNX_QUANTIZE", True)
+    quantized = model_fingerprint()
+    monkeypatch.setattr(settings, "ONNX_QUANTIZE", False)
+    assert model_fingerprint() != quantized
+
+    # irrelevant when neither model runs on ONNX
+    monkeypatch.setattr(settings, "FINBERT_BACKEND", "torch")
+    monkeypatch.setattr(settings, "EMBED_BACKEND", "torch")
+    unquantized = model_fingerprint()
+    monkeypatch.setattr(settings, "ONNX_QUANTIZE", True)
+    assert model_fingerprint() == unquantized
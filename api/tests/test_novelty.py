@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db.models import Document
+from app.nlp.novelty import NoveltyCalculator
+from app.services.embedding_store import embedding_values
+
+
+def test_novelty_uses_nearest_neighbours_in_window(db):
+    rng = np.random.default_rng(2)
+    now = datetime(2024, 3, 1)
+    query = rng.normal(size=768).astype(np.float32)
+    vectors = rng.normal(size=(30, 768)).astype(np.float32)
+    vectors[5] = query + 0.05 * vectors[5]  # a near duplicate
+    for i, vec in enumerate(vectors):
+        db.add(Document(
+            source="test", url=f"https://example.com/{i}", content_hash=f"hash-{i}",
+            published_at=now - timedelta(days=1 + i), **embedding_values(vec, "halfvec")
+        ))
+    db.commit()
+
+    calc = NoveltyCalculator()
+    calc.top_k = 5
+    novelty = calc.calculate_novelty("text", None, now, db, embedding=query)
+    assert novelty < 0.5
+    assert calc.calculate_novelty("text", None, now, db, embedding=query) == novelty
+
+    # the near duplicate is 6 days old; a 3-day lookback excludes it
+    calc.lookback_days = 3
+    assert calc.calculate_novelty("text", None, now, db, embedding=query) > 0.7
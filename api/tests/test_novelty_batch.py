@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db.models import Document, DocumentTicker
+from app.nlp.novelty import NoveltyCalculator
+from app.services.embedding_store import embedding_values
+from app.services.resolver import entity_resolver
+
+
+def test_batch_matches_per_document(db):
+    ticker_ids = entity_resolver.ticker_ids(db, ["ACME", "XYZ"])
+
+    rng = np.random.default_rng(4)
+    now = datetime(2024, 3, 1)
+    vectors = rng.normal(size=(60, 768)).astype(np.float32)
+    for i, vec in enumerate(vectors[:50]):
+        published_at = now - timedelta(hours=17 * i)
+        ticker = "ACME" if i % 3 else "XYZ"
+        doc = Document(
+            source="test", url=f"https://example.com/{i}", content_hash=f"hash-{i}",
+            published_at=published_at, meta={"tickers": [ticker]}, **embedding_values(vec, "halfvec")
+        )
+        db.add(doc)
+        db.flush()
+        db.add(DocumentTicker(document_id=doc.id, ticker_id=ticker_ids[ticker], published_at=published_at))
+    db.commit()
+
+    calc = NoveltyCalculator()
+    calc.top_k = 5
+    queries = [vectors[50 + j] + vectors[j * 4] for j in range(10)]
+    times = [now - timedelta(days=j * 3) for j in range(10)]
+
+    expected = [calc.calculate_novelty("", None, t, db, embedding=q) for q, t in zip(queries, times)]
+    batch = calc.calculate_novelty_batch([(q, None, t) for q, t in zip(queries, times)], db)
+    assert np.allclose(batch, expected, atol=1e-6)
+
+    # per-ticker groups; the in-process index is not warmed, so both use the database
+    items = [(q, "ACME" if j % 2 else "XYZ", t) for j, (q, t) in enumerate(zip(queries, times))]
+    expected = [calc.calculate_novelty("", ticker, t, db, embedding=q) for q, ticker, t in items]
+    assert np.allclose(calc.calculate_novelty_batch(items, db), expected, atol=1e-6)
+    assert len(set(np.round(expected, 6))) > 5
+
+    # tickers and no ticker in one batch; an unknown ticker has nothing to compare with
+    items = items[:4] + [(queries[4], None, times[4]), (queries[5], "NEW", times[5])]
+    expected = [calc.calculate_novelty("", ticker, t, db, embedding=q) for q, ticker, t in items]
+    assert np.allclose(calc.calculate_novelty_batch(items, db), expected, atol=1e-6)
+    assert expected[-1] == 1.0
+    # scoring reads only; the unknown ticker is not created
+    assert entity_resolver.lookup_ticker_id(db, "NEW") is None
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import metrics
+from app.core.config import settings
+from app.db.models import Document, DocumentTicker
+from app.nlp import novelty
+from app.nlp.novelty_index import NoveltyIndex
+from app.services.resolver import entity_resolver
+from app.services.embedding_store import embedding_values, similar_documents
+
+
+def test_index_matches_database_path(db):
+    rng = np.random.default_rng(3)
+    now = datetime(2024, 3, 1)
+    vectors = rng.normal(size=(40, 768)).astype(np.float32)
+    for i, vec in enumerate(vectors[:30]):
+        db.add(Document(
+            source="test", url=f"https://example.com/{i}", content_hash=f"hash-{i}",
+            published_at=now - timedelta(hours=10 * i), meta={"tickers": ["ACME"]},
+            **embedding_values(vec, "halfvec")
+        ))
+    db.commit()
+
+    index = NoveltyIndex(lookback_days=30)
+    assert index.similarities("ACME", vectors[0], now - timedelta(days=30), now, 5) is None
+    assert index.warm(db, now=now) == 30
+
+    # a document written after warm-up is appended, as ingest does
+    new = Document(
+        source="test", url="https://example.com/new", content_hash="hash-new",
+        published_at=now + timedelta(hours=1), meta={"tickers": ["ACME"]}, **embedding_values(vectors[30], "halfvec")
+    )
+    db.add(new)
+    db.commit()
+    index.add_documents([new])
+
+    query = vectors[31] + vectors[4]
+    since, until = now - timedelta(days=5), now + timedelta(hours=2)
+    expected = [s for _, s in similar_documents(
+        db, query, k=5, where=[Document.published_at >= since, Document.published_at < until]
+    )]
+    assert np.allclose(index.similarities("ACME", query, since, until, 5), expected, atol=1e-5)
+
+    assert index.similarities("OTHER", query, since, until, 5) == []
+    assert index.similarities("ACME", query, now - timedelta(days=40), until, 5) is None
+
+    index.discard([new.id])
+    assert len(index.similarities("ACME", query, now, until, 5)) == 1  # only the one at `now`
+
+    index.max_bytes = 1
+    index.add_documents([new])
+    assert index.similarities("ACME", query, since, until, 5) is None
+
+
+def test_article_published_before_warm_up_is_served_from_the_index(db, monkeypatch):
+    rng = np.random.default_rng(5)
+    now = datetime(2024, 3, 1)
+    acme = entity_resolver.ticker_id(db, "ACME")
+    vectors = rng.normal(size=(41, 768)).astype(np.float32)
+    for i, vec in enumerate(vectors[:40]):
+        published_at = now - timedelta(hours=20 * i)
+        doc = Document(
+            source="test", url=f"https://example.com/{i}", content_hash=f"hash-{i}",
+            published_at=published_at, meta={"tickers": ["ACME"]}, **embedding_values(vec, "halfvec")
+        )
+        db.add(doc)
+        db.flush()
+        db.add(DocumentTicker(document_id=doc.id, ticker_id=acme, published_at=published_at))
+    db.commit()
+
+    index = NoveltyIndex(lookback_days=30, max_article_age_days=7)
+    index.warm(db, now=now)
+    monkeypatch.setattr(novelty, "novelty_index", index)
+    calc = novelty.NoveltyCalculator()
+    calc.top_k = 5
+
+    # a feed item published two days before the worker started, ingested now
+    published_at = now - timedelta(days=2)
+    query = vectors[40] + vectors[10]
+    fallback_key = ("novelty_index_total", (("result", "fallback"),))
+    fallbacks = metrics._counters.get(fallback_key, 0)
+    monkeypatch.setattr(settings, "NOVELTY_INDEX_ENABLED", True)
+    from_index = calc.calculate_novelty("", "ACME", published_at, db, embedding=query)
+    assert metrics._counters.get(fallback_key, 0) == fallbacks
+
+    monkeypatch.setattr(settings, "NOVELTY_INDEX_ENABLED", False)
+    assert abs(calc.calculate_novelty("", "ACME", published_at, db, embedding=query) - from_index) < 1e-5
+
+    # older than the accepted article age: the database answers
+    monkeypatch.setattr(settings, "NOVELTY_INDEX_ENABLED", True)
+    calc.calculate_novelty("", "ACME", now - timedelta(days=8), db, embedding=query)
+    assert metrics._counters.get(fallback_key, 0) == fallbacks + 1
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from app.db.models import AuditLog, Document, DocumentEntity, DocumentTicker, Entity, Event, Ticker
+from app.services.persistence import PreparedDocument, persist_documents
+
+
+def _prepared(n, entities, tickers, events=()):
+    return PreparedDocument(
+        article={
+            "source": "Reuters",
+            "url": f"https://example.com/{n}",
+            "title": f"Story {n}",
+            "published": datetime(2024, 1, 1, 12, n),
+            "content": f"story body {n}",
+        },
+        nlp_result={
+            "entities": [{"text": name, "type": kind} for name, kind in entities],
+            "tickers": tickers,
+            "sentiment": "positive",
+            "sentiment_score": 0.7,
+            "embedding": [0.0] * 768,
+        },
+        content_hash=f"hash-{n}",
+        events=list(events),
+    )
+
+
+def test_persist_documents_bulk_writes_match_per_row_semantics(db):
+    event = {
+        "event_time": datetime(2024, 1, 1, 12, 0),
+        "event_type": "guidance_up",
+        "headline": "Acme raises guidance",
+        "confidence_extraction": 0.8,
+        "affected_ticker": "ACME",
+        "payload": {},
+    }
+    docs = persist_documents(db, [
+        _prepared(0, [("Acme Corp", "ORG"), ("Acme Corp", "ORG"), ("Paris", "GPE")], ["ACME"], [event]),
+        _prepared(1, [("Acme Corp", "ORG"), ("Globex", "ORG")], ["GLBX", "ACME"]),
+    ])
+    db.commit()
+
+    assert [d.id for d in docs] == [d.id for d in db.query(Document).order_by(Document.id)]
+    entities = {e.name: e for e in db.query(Entity)}
+    assert set(entities) == {"Acme Corp", "Paris", "Globex"}
+    tickers = {t.id: t.symbol for t in db.query(Ticker)}
+    assert tickers[entities["Acme Corp"].ticker_id] == "ACME"
+    assert tickers[entities["Globex"].ticker_id] == "GLBX"
+    assert entities["Paris"].ticker_id is None
+
+    mentions = {(de.document_id, de.entity_id): de.mentions for de in db.query(DocumentEntity)}
+    assert mentions[(docs[0].id, entities["Acme Corp"].id)] == 2
+    assert mentions[(docs[1].id, entities["Acme Corp"].id)] == 1
+    assert len(mentions) == 4
+    assert db.query(Event).filter(Event.document_id == docs[0].id).count() == 1
+    assert db.query(AuditLog).filter(AuditLog.action == "ingest_doc").count() == 2
+    assert {(dt.document_id, tickers[dt.ticker_id]) for dt in db.query(DocumentTicker)} == {
+        (docs[0].id, "ACME"), (docs[1].id, "GLBX"), (docs[1].id, "ACME")
+    }
+
+    # a later batch reuses stored entities instead of inserting them again
+    persist_documents(db, [_prepared(2, [("Globex", "ORG")], [])])
+    db.commit()
+    assert db.query(Entity).count() == 3
@@ -0,0 +1,89 @@
+import numpy as np
+
+from app.core.config import settings
+from app.nlp import ner
+from app.nlp.pipeline import NLPPipeline
+
+
+class StubSentiment:
+    """Scores depend on the exact text received, so truncation and order show up"""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, texts, batch_size=None):
+        self.batches.append(list(texts))
+        labels = ["positive", "negative", "neutral"]
+        return [{"label": labels[len(t) % 3].upper(), "score": len(t) / 10000 + t.count("a") / 1e6} for t in texts]
+
+
+class StubEmbedder:
+    def encode(self, texts, batch_size=None):
+        return np.array([[len(t), t.count("e"), sum(map(ord, t)) % 997] for t in texts], dtype=np.float32)
+
+
+def _stub_entities(text):
+    return [{"text": w, "type": "ORG", "start": text.index(w), "end": text.index(w) + len(w)}
+            for w in dict.fromkeys(text.split()) if w.istitle()][:3]
+
+
+def _pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "NLP_CACHE_ENABLED", False)
+    monkeypatch.setattr(ner, "extract_entities", lambda nlp, text: _stub_entities(text))
+    monkeypatch.setattr(ner, "extract_entities_batch",
+                        lambda nlp, texts, n_process=None: [_stub_entities(t) for t in texts])
+    pipeline = NLPPipeline()
+    pipeline.finbert = StubSentiment()
+    pipeline.embedder = StubEmbedder()
+    pipeline._initialized = True
+    return pipeline
+
+
+def test_batched_results_match_per_document_in_input_order(monkeypatch):
+    pipeline = _pipeline(monkeypatch)
+    texts = [
+        "Acme (ACME) raises guidance " + "and beats estimates " * 200,  # past both truncation limits
+        "Globex misses",
+        "",
+        "Initech (INTC) names a new CEO and announces a $2 billion buyback",
+        "Acme (ACME) raises guidance " + "and beats estimates " * 300,  # differs only after the cut
+        "short",
+    ]
+
+    batched = pipeline.process_documents(texts)
+    # length bucketing reorders the model batch, but not the results
+    assert [len(t) for t in pipeline.finbert.batches[0]] == sorted(len(t[:2000]) for t in texts)
+
+    singles = [pipeline.process_document(t) for t in texts]
+    assert batched == singles
+    assert [r["embedding"][0] for r in batched] == [float(min(len(t), 5000)) for t in texts]
+    assert batched[0]["sentiment_score"] == batched[4]["sentiment_score"]
+    assert batched[0]["embedding"] != batched[4]["embedding"]
+
+
+def test_sentiment_batch_matches_single_calls(monkeypatch):
+    pipeline = _pipeline(monkeypatch)
+    texts = ["a" * n for n in (2500, 3, 2000, 17, 0, 1999)]
+    assert pipeline.analyze_sentiment_batch(texts) == [pipeline.analyze_sentiment(t) for t in texts]
+
+
+def test_failed_sentiment_batch_falls_back_for_that_batch_only(monkeypatch):
+    pipeline = _pipeline(monkeypatch)
+    monkeypatch.setattr(settings, "FINBERT_BATCH_SIZE", 2)
+    stub = pipeline.finbert
+    predict = stub.predict
+
+    def flaky(texts, batch_size=None):
+        if len(texts) == 2 and any("b" in t for t in texts):
+            stub.batches.append(list(texts))
+            raise RuntimeError("CUDA out of memory")
+        return predict(texts, batch_size)
+
+    stub.predict = flaky
+    texts = ["a" * 10, "b" * 30, "a" * 20, "b" * 40, "a" * 5]
+    expected = [pipeline._map_sentiment(r) for r in predict(texts)]
+    stub.batches.clear()
+
+    assert pipeline.analyze_sentiment_batch(texts) == expected
+    # batches by length; only the failed one is retried a document at a time
+    assert stub.batches == [["a" * 5, "a" * 10], ["a" * 20, "b" * 30], ["a" * 20], ["b" * 30], ["b" * 40]]
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.models import RescoreJob, Signal, Ticker
+from app.services import ingest_events
+from app.services.fuse import SignalFuser
+from app.services.rescoring import SignalRescorer
+
+NEW_PARAMS = {
+    "weights": {"W_SRC": 0.1, "W_NOVEL": 0.5, "W_EVT": 0.2, "W_BUZZ": 0.2, "K_CONS": 0.3, "K_UNC": 0.1, "TAU": 3600.0},
+    "source_weights": {"reuters": 0.4},
+    "event_priors": {"mna": 0.3}
+}
+
+
+def _setup(Session, n=7):
+    db = Session()
+    ticker = Ticker(symbol="ACME")
+    db.add(ticker)
+    db.flush()
+
+    fuser = SignalFuser()
+    now = datetime(2024, 3, 1)
+    sources = ["reuters", "dj", None, "blog", "Reuters", "dj", "wsj"][:n]
+    event_types = ["mna", "buyback", None, "mna", "other", "guidance_up", "mna"][:n]
+    novelty = np.linspace(0.1, 0.9, n)
+    buzz = np.linspace(-2, 2, n)
+    times = [now - timedelta(minutes=37 * i) for i in range(n)]
+    confidences, base_scores, components = fuser.calculate_confidence_batch(
+        sources, novelty, event_types, buzz, signal_times=times, current_time=now
+    )
+    for i in range(n):
+        confidence, stored = float(confidences[i]), fuser.component_dict(components, i)
+        should_alert, alert_reason = fuser.should_alert(confidence, stored["source_weight"], novelty[i], False)
+        db.add(Signal(
+            ticker_id=ticker.id, signal_time=times[i], base_score=float(base_scores[i]), confidence=confidence,
+            label=fuser.generate_signal_label(event_types[i], "positive", confidence),
+            meta={
+                "components": stored, "source": sources[i], "event_type": event_types[i],
+                "alert_reason": alert_reason, "requires_second_source": not should_alert
+            }
+        ))
+    # a signal without stored components is left alone
+    db.add(Signal(ticker_id=ticker.id, signal_time=now, base_score=0.5, confidence=0.5, meta={}))
+    db.commit()
+    db.close()
+    return (sources, novelty, event_types, buzz, times, now)
+
+
+def test_rescore_matches_fresh_scores(monkeypatch, db_sessionmaker):
+    monkeypatch.setattr(settings, "RESCORE_CHUNK_SIZE", 3)
+    monkeypatch.setattr(settings, "RESCORE_DUTY_CYCLE", 1.0)
+    Session = db_sessionmaker
+    sources, novelty, event_types, buzz, times, now = _setup(Session)
+    db = Session()
+    before = [(s.label, s.meta.get("alert_reason")) for s in db.query(Signal).order_by(Signal.id)]
+    db.close()
+    rescorer = SignalRescorer(Session)
+
+    events = asyncio.Queue()
+
+    async def run():
+        ingest_events._subscribers.add(events)
+        try:
+            job_id = await rescorer.start(NEW_PARAMS)
+            await rescorer.wait()
+            return job_id
+        finally:
+            ingest_events._subscribers.discard(events)
+
+    job_id = asyncio.run(run())
+
+    fuser = SignalFuser()
+    fuser.reload_from_dict(NEW_PARAMS)
+    expected, expected_base, _ = fuser.calculate_confidence_batch(
+        sources, novelty, event_types, buzz, signal_times=times, current_time=now
+    )
+    db = Session()
+    signals = db.query(Signal).order_by(Signal.id).all()
+    assert [s.confidence for s in signals[:-1]] == expected.tolist()
+    assert [s.base_score for s in signals[:-1]] == expected_base.tolist()
+    assert signals[0].meta["components"]["weights"]["w_src"] == 0.1
+    assert signals[-1].confidence == 0.5
+
+    # the label qualifier and the alert decision follow the new confidence
+    labels = [fuser.generate_signal_label(e, None, c) for e, c in zip(event_types, expected.tolist())]
+    assert [s.label for s in signals[:-1]] == labels
+    assert labels != [label for label, _ in before[:-1]]
+    for signal, novel, confidence in zip(signals, novelty, expected.tolist()):
+        should_alert, alert_reason = fuser.should_alert(confidence, signal.meta["components"]["source_weight"], novel, False)
+        assert signal.meta["alert_reason"] == alert_reason
+        assert signal.meta["requires_second_source"] == (not should_alert or alert_reason == "Needs second source confirmation")
+    assert [s.meta["alert_reason"] for s in signals[:-1]] != [reason for _, reason in before[:-1]]
+
+    job = db.get(RescoreJob, job_id)
+    assert job.status == "completed" and job.processed == job.total == 8
+    progress = [events.get_nowait() for _ in range(events.qsize())]
+    assert [e["type"] for e in progress] == ["rescore_progress"] * 3
+    assert progress[-1]["final"] and progress[-1]["processed"] == 8
+
+
+def test_rescore_resumes_and_supersedes(monkeypatch, db_sessionmaker):
+    monkeypatch.setattr(settings, "RESCORE_CHUNK_SIZE", 3)
+    monkeypatch.setattr(settings, "RESCORE_DUTY_CYCLE", 1.0)
+    Session = db_sessionmaker
+    _setup(Session)
+    rescorer = SignalRescorer(Session)
+
+    first = rescorer.create_job(NEW_PARAMS)
+    # a process stops after one chunk; a new one picks the job up where it stopped
+    assert rescorer.run_chunk(first, rescorer.load_fuser(first))["last_signal_id"] == 3
+
+    resumed = SignalRescorer(Session)
+    assert asyncio.run(_resume_and_wait(resumed)) == first
+    assert resumed.status()["status"] == "completed"
+    assert resumed.status()["processed"] == 8
+
+    second = rescorer.create_job(NEW_PARAMS)
+    third = rescorer.create_job(NEW_PARAMS)
+    db = Session()
+    assert db.get(RescoreJob, second).status == "superseded"
+    assert rescorer.run_chunk(second, rescorer.load_fuser(third)) is None
+    assert db.get(RescoreJob, third).status == "running"
+
+
+async def _resume_and_wait(rescorer):
+    job_id = await rescorer.resume()
+    await rescorer.wait()
+    return job_id
@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+from app.db.models import Company, Entity, Ticker
+from app.services.resolver import EntityResolver
+
+
+def test_resolver_upserts_without_duplicates_and_serves_hits_from_memory(db_engine, db):
+    # two workers with their own caches resolving the same names
+    first, second = EntityResolver(max_size=2), EntityResolver(max_size=2)
+    ids = first.ticker_ids(db, ["ACME", "GLBX"])
+    assert second.ticker_ids(db, ["GLBX", "ACME"]) == ids
+    assert db.query(Ticker).count() == 2
+    assert db.query(Company).count() == 2
+    assert all(t.company_id for t in db.query(Ticker))
+
+    entity_ids = first.entity_ids(db, {"Acme Corp": ("ORG", "ACME"), "Paris": ("GPE", None)})
+    assert second.entity_ids(db, {"Acme Corp": ("ORG", "ACME")}) == {"Acme Corp": entity_ids["Acme Corp"]}
+    assert db.query(Entity).count() == 2
+    assert db.query(Entity).filter_by(name="Acme Corp").one().ticker_id == ids["ACME"]
+
+    statements = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert first.ticker_id(db, "ACME") == ids["ACME"]
+    assert statements == []
+
+    # LRU bound: a third symbol evicts the least recently used one
+    first.ticker_ids(db, ["INIT"])
+    assert len(first._tickers) == 2
+
+    warmed = EntityResolver()
+    warmed.warm(db)
+    statements.clear()
+    assert warmed.ticker_ids(db, ["ACME", "GLBX", "INIT"])["INIT"]
+    assert statements == []
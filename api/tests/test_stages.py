@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.ingestion import stages as stages_module
+from app.ingestion.stages import Stage, StagedPipeline
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_batches_and_applies_backpressure(monkeypatch):
+    monkeypatch.setattr(stages_module.ingest_events, "publish_event", lambda event: None)
+    in_flight = {"now": 0, "max": 0}
+    batches = []
+
+    async def fetch(n):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0)
+        return n
+
+    async def analyze(items):
+        batches.append(len(items))
+        await asyncio.sleep(0.01)
+        return [n * 10 for n in items]
+
+    async def store(n):
+        in_flight["now"] -= 1
+        return None if n == 30 else n
+
+    pipeline = StagedPipeline("test", [
+        Stage("fetch", fetch, concurrency=4, queue_size=2),
+        Stage("nlp", analyze, batch_size=4, batch_linger=0.05, queue_size=2),
+        Stage("store", store, queue_size=2),
+    ], progress_interval=60)
+    results = await pipeline.run(range(20))
+
+    assert sorted(results) == [n * 10 for n in range(20) if n != 3]
+    assert max(batches) <= 4 and sum(batches) == 20
+    # bounded queues cap how far fetching can run ahead of storage
+    assert in_flight["max"] <= 4 + 2 + 4 + 2 + 1 + 2
+    assert pipeline.stats["fetch"].processed == 20
+    assert pipeline.stats["store"].emitted == 19
+
+
+@pytest.mark.asyncio
+async def test_pipeline_counts_stage_errors(monkeypatch):
+    monkeypatch.setattr(stages_module.ingest_events, "publish_event", lambda event: None)
+
+    async def flaky(n):
+        if n % 2:
+            raise ValueError("boom")
+        return n
+
+    pipeline = StagedPipeline("test", [Stage("only", flaky, concurrency=2)], progress_interval=60)
+    results = await pipeline.run(range(6))
+
+    assert sorted(results) == [0, 2, 4]
+    assert pipeline.stats["only"].errors == 3
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from app.core.deps import get_db_session
+from app.db.models import Document, DocumentTicker, Ticker
+from app.main import app
+
+
+def test_pages_through_documents_sharing_a_timestamp(db_sessionmaker):
+    db = db_sessionmaker()
+    ticker = Ticker(symbol="ACME")
+    db.add(ticker)
+    db.flush()
+    # feed items often carry the same timestamp
+    times = [datetime(2024, 1, 2, 9)] * 5 + [datetime(2024, 1, 1, 9)] * 2
+    for i, published_at in enumerate(times):
+        doc = Document(source="test", url=f"https://example.com/{i}", content_hash=f"h{i}", published_at=published_at)
+        db.add(doc)
+        db.flush()
+        db.add(DocumentTicker(document_id=doc.id, ticker_id=ticker.id, published_at=published_at))
+    db.commit()
+    db.close()
+
+    def override():
+        session = db_sessionmaker()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db_session] = override
+    try:
+        client = TestClient(app)
+        seen = []
+        params = {"limit": 2}
+        while True:
+            body = client.get("/tickers/acme/documents", params=params).json()
+            seen += [d["id"] for d in body["documents"]]
+            if not body["next_cursor"]:
+                break
+            params = {"limit": 2, **body["next_cursor"]}
+        assert seen == [5, 4, 3, 2, 1, 7, 6]
+
+        assert client.get("/tickers/acme/documents", params={"limit": 0}).status_code == 422
+        assert client.get("/tickers/acme/documents", params={"limit": -5}).status_code == 422
+    finally:
+        app.dependency_overrides.pop(get_db_session, None)
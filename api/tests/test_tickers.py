@@ -0,0 +1,83 @@
+from app.db.models import Company, Ticker
+from app.nlp.tickers import AhoCorasick, TickerMatcher, company_aliases
+from app.services.resolver import entity_resolver
+
+
+def test_automaton_reports_overlapping_matches_after_incremental_adds():
+    ac = AhoCorasick()
+    for p in ["he", "she", "his"]:
+        ac.add(p)
+    assert sorted(ac.iter("ushers")) == [(4, "he"), (4, "she")]
+    ac.add("hers")
+    assert sorted(ac.iter("ushers")) == [(4, "he"), (4, "she"), (6, "hers")]
+
+
+def test_company_aliases_strip_legal_suffixes():
+    assert company_aliases("Apple Inc.") == {"Apple Inc.", "Apple"}
+    assert "Alphabet" in company_aliases("Alphabet Holdings Corp")
+
+
+def test_matcher_from_tables_with_aliases_context_and_refresh(tmp_path, db):
+    master = tmp_path / "master.csv"
+    master.write_text("symbol,name,aliases\nGOOGL,Alphabet Inc.,Google|Alphabet Class A\n")
+
+    apple = Company(name="Apple Inc.")
+    att = Company(name="AT&T Inc.")
+    db.add_all([apple, att])
+    db.flush()
+    db.add_all([Ticker(symbol="AAPL", company_id=apple.id), Ticker(symbol="T", company_id=att.id)])
+    db.commit()
+
+    matcher = TickerMatcher(master_path=str(master))
+    assert matcher.refresh(db) == 2
+
+    text = "Shares of Apple rose while Google slipped. T is a letter, but NYSE: T reported. AAPLX is not a ticker."
+    assert matcher.find(text) == ["AAPL", "GOOGL", "T"]
+    assert matcher.find("The CEO said IT spending is up.") == []
+
+    # only new rows are read on the next refresh
+    msft = Company(name="Microsoft Corporation")
+    db.add(msft)
+    db.flush()
+    db.add(Ticker(symbol="MSFT", company_id=msft.id))
+    db.commit()
+    assert matcher.refresh(db) == 1
+    assert matcher.find("Shares of Microsoft and $AAPL rose") == ["MSFT", "AAPL"]
+
+
+def test_common_word_aliases_need_a_proper_noun_mention(tmp_path, db):
+    master = tmp_path / "master.csv"
+    master.write_text(
+        "symbol,name,aliases\n"
+        "TGT,Target Corporation,Target\n"
+        "SQ,Block Inc.,Block\n"
+        "GPS,Gap Inc.,Gap\n"
+        "AAPL,Apple Inc.,Apple\n"
+    )
+    matcher = TickerMatcher(master_path=str(master))
+    matcher.refresh(db)
+
+    assert matcher.find("The company missed its target and will block the deal; apple pie sales rose.") == []
+    assert matcher.find("The gap widened.") == []
+    # sentence-initial capitals are not enough on their own
+    assert matcher.find("Target will block the deal. Apple pie sales rose.") == []
+    assert matcher.find("Shares of Target fell after Block Inc. and NYSE: GPS reported.") == ["TGT", "SQ", "GPS"]
+    assert matcher.find("Gap (GPS) and Apple Inc. both rose.") == ["GPS", "AAPL"]
+
+
+def test_placeholder_tickers_are_not_learned_and_unknown_symbols_need_explicit_form(tmp_path, db):
+    # the resolver creates a placeholder company for a symbol it only saw in text
+    entity_resolver.ticker_ids(db, ["WHO", "ZZZZ"])
+    apple = Company(name="Apple Inc.")
+    db.add(apple)
+    db.flush()
+    db.add(Ticker(symbol="AAPL", company_id=apple.id))
+    db.commit()
+
+    matcher = TickerMatcher(master_path=str(tmp_path / "missing.csv"))
+    assert matcher.refresh(db) == 1
+    assert matcher.find("The WHO said ZZZZ was fine; AAPL rose.") == ["AAPL"]
+
+    text = "Acme Corp (NASDAQ: ACME) and Zeta ($ZETA) rose with Apple (AAPL). THE CEO of IBM said (EPS) rose."
+    assert matcher.discover(text) == ["ACME", "ZETA"]
+    assert matcher.find(text) == ["AAPL"]
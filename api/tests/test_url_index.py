@@ -0,0 +1,40 @@
+import time
+
+from app.ingestion.url_index import UrlDedupIndex, ScalableBloomFilter
+
+
+def test_scalable_bloom_grows_without_false_negatives():
+    sbf = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    keys = [f"https://example.com/story/{i}" for i in range(1000)]
+    for k in keys:
+        sbf.add(k)
+    assert len(sbf.filters) > 1
+    assert all(k in sbf for k in keys)
+    false_positives = sum(f"https://example.com/other/{i}" in sbf for i in range(2000))
+    assert false_positives < 60
+
+
+def test_url_index_window_persistence_and_confirm(tmp_path):
+    path = str(tmp_path / "url_index.bin")
+    index = UrlDedupIndex(path=path, window_hours=72)
+    now = time.time()
+    index.add("https://example.com/a?utm_source=rss", now=now)
+    index.save()
+
+    index = UrlDedupIndex(path=path, window_hours=72)
+    assert index.might_contain("https://example.com/a", now=now + 3600)
+    assert not index.might_contain("https://example.com/a", now=now + 100 * 3600)
+
+    index = UrlDedupIndex(path=path, window_hours=72)
+    articles = [
+        {"url": "https://example.com/a?utm_campaign=x"},
+        {"url": "https://example.com/b"},
+        {"url": "https://example.com/b?utm_medium=y"},
+    ]
+    # index hits the database does not know about are false positives and kept
+    assert [a["url"] for a in index.filter_new(articles, confirm=lambda urls: [])] == [
+        "https://example.com/a?utm_campaign=x", "https://example.com/b"
+    ]
+    assert [a["url"] for a in index.filter_new(articles, confirm=lambda urls: ["https://example.com/a"])] == [
+        "https://example.com/b"
+    ]